@@ -2,51 +2,128 @@ from __future__ import annotations
 import os
 import logging
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
-from .config import USE_STUB
+import numpy as np
+from .config import (
+    USE_STUB,
+    SUMMARIZER_MODEL,
+    SUMMARY_MODE,
+    SUMMARY_SENTENCES,
+    SUMMARY_CHUNK_TOKENS,
+    SUMMARY_BATCH_SIZE,
+    SUMMARY_WORKERS,
+    VAD_ENABLED,
+    VAD_MAX_SPEECH_RATIO,
+    TRANSCRIBE_CHUNK_SECONDS,
+)
+from .registry import registry
+from .lazy import installed, optional_import
+from .asr import get_transcriber
+from .extract import extract_category, extract_highlights
+from .textrank import extractive_summary
+from .audio import SAMPLE_RATE
+from .segments import Transcript
+from .diarization import assign_speakers
+from .vad import detect_speech, compact, speech_ratio
 
 logger = logging.getLogger(__name__)
 
-# Optional heavy imports guarded at runtime
-try:
-    import whisper  # type: ignore
-    logger.info("Whisper module loaded successfully")
-except Exception as e:
-    whisper = None
-    logger.warning(f"Whisper not available: {e}")
+# transformers (and torch behind it) is only imported when the summarizer is first loaded
+SUMMARIZER_AVAILABLE = installed("transformers")
 
-try:
-    from transformers import pipeline  # type: ignore
-    logger.info("Transformers module loaded successfully")
-except Exception as e:
-    pipeline = None
-    logger.warning(f"Transformers not available: {e}")
+SUMMARIZER_KEY = f"summarizer:{SUMMARIZER_MODEL}"
 
-# Pyannote is complex to configure; keep stub-friendly
-# from pyannote.audio import Pipeline  # optional
 
+def _load_summarizer():
+    transformers = optional_import("transformers")
+    if transformers is None:
+        raise RuntimeError("Transformers not available")
+    return transformers.pipeline("summarization", model=SUMMARIZER_MODEL, device=-1)
 
-def transcribe(file_path: str) -> str:
-    """Transcribe audio file to text using Whisper or return stub data."""
+
+if SUMMARIZER_AVAILABLE:
+    registry.register(SUMMARIZER_KEY, _load_summarizer)
+
+
+def _speech_chunks(regions: List[tuple], max_seconds: float) -> List[List[tuple]]:
+    """Group consecutive speech regions into chunks of at most about ``max_seconds`` of speech."""
+    limit = max_seconds * SAMPLE_RATE
+    chunks, current, size = [], [], 0
+    for start, end in regions:
+        if current and size + end - start > limit:
+            chunks.append(current)
+            current, size = [], 0
+        current.append((start, end))
+        size += end - start
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def transcribe(audio, prompt: str | None = None, progress=None, model: str | None = None) -> Transcript:
+    """Transcribe an audio file path or decoded 16 kHz waveform to timestamped segments
+    with the TRANSCRIBE_BACKEND engine or return stub data. ``prompt`` is preceding text
+    for context; ``progress`` (a ProgressReporter) receives seconds of speech transcribed;
+    ``model`` is a model size overriding WHISPER_MODEL."""
     if USE_STUB:
         logger.info("Using STUB mode for transcription")
-        return (
-            "Welcome everyone to the Q4 planning meeting. We will review the budget and assign action items. "
-            "Marketing spend adjustments and deadlines will be discussed."
-        )
-    
-    if whisper is None:
-        logger.error("Whisper not installed. Install with: pip install openai-whisper torch")
-        raise RuntimeError("Whisper not available. Please install dependencies or set USE_STUB=1")
+        stub = Transcript()
+        stub.append(0.0, 4.5, "Welcome everyone to the Q4 planning meeting.")
+        stub.append(4.5, 8.0, "Let's review the budget and action items.")
+        stub.append(8.0, 11.5, "We may reduce marketing spend by 10%.")
+        return stub
     
+    try:
+        backend = get_transcriber(model)
+    except RuntimeError as e:
+        logger.error(f"{e}. Install with: pip install openai-whisper torch (or faster-whisper)")
+        raise
+
     # Real whisper transcription
     try:
-        logger.info(f"Loading Whisper model...")
-        model = whisper.load_model("base")
-        logger.info(f"Transcribing {file_path}...")
-        result = model.transcribe(file_path, language="en", fp16=False)
-        transcript = result.get("text", "").strip()
-        logger.info(f"Transcription completed: {len(transcript)} characters")
+        if isinstance(audio, str) or not VAD_ENABLED:
+            logger.info(f"Transcribing {audio if isinstance(audio, str) else 'decoded audio'} with {backend.key}...")
+            result = backend.transcribe(audio, prompt)
+            transcript = Transcript.from_whisper(result)
+            logger.info(f"Transcription completed: {len(transcript)} segments, {len(transcript.text)} characters")
+            return transcript
+
+        regions = detect_speech(audio)
+        if not regions:
+            logger.info("No speech detected")
+            return Transcript()
+        ratio = speech_ratio(regions, len(audio))
+        trim = ratio < VAD_MAX_SPEECH_RATIO
+        if trim:
+            # Only the speech regions go through Whisper
+            logger.info(f"VAD kept {ratio:.0%} of the audio in {len(regions)} regions")
+
+        # Chunks end at pauses, so no word is cut and progress can be reported between them
+        chunks = _speech_chunks(regions, TRANSCRIBE_CHUNK_SECONDS)
+        total = sum(end - start for start, end in regions)
+        done = 0
+        transcript = Transcript()
+        logger.info(f"Transcribing decoded audio in {len(chunks)} chunks with {backend.key}...")
+        for chunk in chunks:
+            if trim:
+                piece, time_map = compact(audio, chunk)
+            else:
+                # Mostly speech: keep the pauses, only cut at chunk edges
+                start, end = chunk[0][0], chunk[-1][1]
+                piece = audio[start:end]
+                time_map = ([0.0, (end - start) / SAMPLE_RATE], [start / SAMPLE_RATE, end / SAMPLE_RATE])
+            result = backend.transcribe(piece, prompt)
+            part = Transcript.from_whisper(result)
+            part.remap_times(lambda times: np.interp(times, *time_map))
+            transcript.extend(part)
+            # The end of this chunk gives Whisper context for the next one
+            prompt = " ".join(part.texts[-3:]) or prompt
+            done += sum(end - start for start, end in chunk)
+            if progress is not None:
+                progress.update("transcription", round(done / SAMPLE_RATE, 1), round(total / SAMPLE_RATE, 1))
+        logger.info(f"Transcription completed: {len(transcript)} segments, {len(transcript.text)} characters")
         return transcript
     except FileNotFoundError as e:
         logger.error(f"FFmpeg not found: {e}")
@@ -61,82 +138,230 @@ def transcribe(file_path: str) -> str:
         raise RuntimeError(f"Transcription failed: {str(e)}")
 
 
-def diarize_transcript(transcript: str) -> tuple[str, list[str]]:
-    """Add speaker labels to transcript. Uses stub mode or simple single-speaker format."""
+def diarize_transcript(transcript: Transcript, turns=None) -> tuple[str, list[str]]:
+    """Label transcript segments with speakers in place and return the tagged text.
+    Uses stub mode, speaker turns from diarization.diarize_audio, or simple single-speaker format."""
     if USE_STUB:
         logger.info("Using STUB mode for diarization")
-        speakers = ["Speaker 1", "Speaker 2"]
-        tagged = (
-            "Speaker 1: Welcome everyone to the Q4 planning meeting.\n"
-            "Speaker 2: Let's review the budget and action items.\n"
-            "Speaker 1: We may reduce marketing spend by 10%."
-        )
-        return tagged, speakers
+        for i in range(len(transcript)):
+            transcript.set_speaker(i, "Speaker 2" if i % 2 else "Speaker 1")
+        return transcript.tagged(), transcript.speakers
     
-    # Placeholder for real diarization. Implement with pyannote pipeline and align to transcript.
-    # For now, return single-speaker tagged text if not stub but diarization not configured.
-    logger.info("Using simple single-speaker diarization (pyannote not configured)")
-    return f"Speaker 1: {transcript}", ["Speaker 1"]
+    if turns:
+        assign_speakers(transcript, turns)
+        return transcript.tagged(), transcript.speakers
+
+    # No speaker turns (diarization disabled or failed): single-speaker tagged text
+    logger.info("Using simple single-speaker diarization (no speaker turns available)")
+    for i in range(len(transcript)):
+        transcript.set_speaker(i, "Speaker 1")
+    return transcript.tagged(), transcript.speakers
 
 
 def extract_action_items(transcript: str) -> List[str]:
     """Extract action items from transcript using keyword patterns."""
-    action_items = []
-    
-    # Patterns that indicate action items
-    action_patterns = [
-        r"(?:will|should|need to|have to|must|going to|plan to)\s+([^.!?]+)",
-        r"(?:action item|task|todo|to-do):\s*([^.!?]+)",
-        r"([A-Z][a-z]+)\s+(?:will|should|needs to|has to)\s+([^.!?]+)",
-        r"(?:implement|develop|create|build|design|prepare|draft)\s+([^.!?]+)",
-    ]
-    
-    for pattern in action_patterns:
-        matches = re.finditer(pattern, transcript, re.IGNORECASE)
-        for match in matches:
-            item = match.group(0).strip()
-            if len(item) > 20 and len(item) < 150:  # Reasonable length
-                # Clean up the item
-                item = item.capitalize()
-                if not item.endswith('.'):
-                    item += '.'
-                if item not in action_items:
-                    action_items.append(item)
-    
-    # Limit to top 5 most relevant
-    return action_items[:5] if action_items else ["No specific action items identified"]
+    return extract_category(transcript, "action_items")
 
 
 def extract_decisions(transcript: str) -> List[str]:
     """Extract decisions from transcript using keyword patterns."""
-    decisions = []
-    
-    # Patterns that indicate decisions
-    decision_patterns = [
-        r"(?:decided|agreed|determined|concluded)\s+(?:to|that)\s+([^.!?]+)",
-        r"(?:decision|choice|resolution):\s*([^.!?]+)",
-        r"(?:we will|we'll|team will)\s+([^.!?]+)",
-        r"(?:approved|selected|chosen)\s+([^.!?]+)",
-    ]
-    
-    for pattern in decision_patterns:
-        matches = re.finditer(pattern, transcript, re.IGNORECASE)
-        for match in matches:
-            item = match.group(0).strip()
-            if len(item) > 20 and len(item) < 150:  # Reasonable length
-                # Clean up the item
-                item = item.capitalize()
-                if not item.endswith('.'):
-                    item += '.'
-                if item not in decisions:
-                    decisions.append(item)
-    
-    # Limit to top 5 most relevant
-    return decisions[:5] if decisions else ["No specific decisions identified"]
+    return extract_category(transcript, "decisions")
+
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+def _split_units(text: str) -> List[str]:
+    """Split text into speaker turns (lines), then sentences."""
+    units = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            units.extend(u for u in _SENTENCE_BOUNDARY.split(line) if u)
+    return units
+
+
+def _token_lengths(units: List[str], tokenizer=None) -> List[int]:
+    """Token count per unit, using the model tokenizer when available."""
+    if not units:
+        return []
+    if tokenizer is None:
+        # Roughly 1.3 BPE tokens per English word
+        return [int(len(u.split()) * 1.3) + 1 for u in units]
+    return [len(ids) for ids in tokenizer(units, add_special_tokens=False)["input_ids"]]
 
 
-def summarize(transcript: str) -> Dict:
-    """Generate summary with overview, decisions, and action items."""
+def chunk_transcript(text: str, max_tokens: int, tokenizer=None) -> List[str]:
+    """Pack sentences/speaker turns into chunks of at most ``max_tokens`` tokens."""
+    units = _split_units(text)
+    lengths = _token_lengths(units, tokenizer)
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for unit, n_tokens in zip(units, lengths):
+        if n_tokens > max_tokens:
+            # A single runaway sentence: cut it into word windows of the right size
+            words = unit.split()
+            step = max(1, len(words) * max_tokens // n_tokens)
+            pieces = [" ".join(words[i:i + step]) for i in range(0, len(words), step)]
+            piece_lengths = [max_tokens] * len(pieces)
+        else:
+            pieces, piece_lengths = [unit], [n_tokens]
+
+        for piece, piece_tokens in zip(pieces, piece_lengths):
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _summarize_batches(summarizer, chunks: List[str], max_length: int, min_length: int, on_batch=None) -> List[str]:
+    """Run chunks through the pipeline in batches, optionally on several threads.
+    ``on_batch(done, total)`` is called as batches complete."""
+    batches = [chunks[i:i + SUMMARY_BATCH_SIZE] for i in range(0, len(chunks), SUMMARY_BATCH_SIZE)]
+
+    def run(batch: List[str]) -> List[str]:
+        outputs = summarizer(
+            batch,
+            max_length=max_length,
+            min_length=min_length,
+            do_sample=False,
+            truncation=True,
+            batch_size=len(batch),
+        )
+        return [o["summary_text"] for o in outputs]
+
+    results = []
+    if SUMMARY_WORKERS > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=SUMMARY_WORKERS) as executor:
+            for summaries in executor.map(run, batches):
+                results.append(summaries)
+                if on_batch is not None:
+                    on_batch(len(results), len(batches))
+    else:
+        for batch in batches:
+            results.append(run(batch))
+            if on_batch is not None:
+                on_batch(len(results), len(batches))
+    return [summary for batch in results for summary in batch]
+
+
+def summarize_long(summarizer, transcript: str, partial_summaries: List[str] | None = None, progress=None) -> str:
+    """Map-reduce summarization: summarize chunks, then summarize the partial summaries.
+
+    When ``partial_summaries`` of the whole transcript are already known (live
+    sessions build them incrementally) the map step is skipped. ``progress``
+    receives the batches done at each level.
+    """
+    tokenizer = getattr(summarizer, "tokenizer", None)
+    started = time.perf_counter()
+
+    if partial_summaries:
+        chunks = chunk_transcript("\n".join(partial_summaries), SUMMARY_CHUNK_TOKENS, tokenizer)
+    else:
+        chunks = chunk_transcript(transcript, SUMMARY_CHUNK_TOKENS, tokenizer)
+    level = 0
+
+    def on_batch(done: int, total: int) -> None:
+        if progress is not None:
+            progress.update("summarization", done, total, level=level)
+
+    while len(chunks) > 1:
+        level += 1
+        logger.info(f"Summarizing {len(chunks)} chunks (level {level})...")
+        partials = _summarize_batches(summarizer, chunks, max_length=120, min_length=20, on_batch=on_batch)
+        next_chunks = chunk_transcript("\n".join(partials), SUMMARY_CHUNK_TOKENS, tokenizer)
+        if len(next_chunks) >= len(chunks):
+            # Partial summaries stopped shrinking; let the final pass truncate
+            chunks = ["\n".join(partials)]
+            break
+        chunks = next_chunks
+
+    text = chunks[0] if chunks else transcript
+    overview = summarizer(text, max_length=180, min_length=60, do_sample=False, truncation=True)[0]["summary_text"]
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Map-reduce summary of {len(transcript)} characters in {elapsed:.2f}s "
+        f"({level} levels, {len(transcript) / elapsed if elapsed else 0:.0f} chars/s)"
+    )
+    return overview
+
+
+def summarize_long_many(summarizer, transcripts: List[str], on_batch=None) -> List[str]:
+    """Map-reduce summarization of several transcripts at once.
+
+    Chunks of all transcripts share summarizer batches at every level (and in
+    the final pass), so batches stay full even when each meeting only has a
+    chunk or two left. ``on_batch(done, total, level)`` is called as batches complete.
+    """
+    tokenizer = getattr(summarizer, "tokenizer", None)
+    started = time.perf_counter()
+    chunks = [chunk_transcript(t, SUMMARY_CHUNK_TOKENS, tokenizer) for t in transcripts]
+    level = 0
+
+    while True:
+        active = [i for i, c in enumerate(chunks) if len(c) > 1]
+        if not active:
+            break
+        level += 1
+        flat = [chunk for i in active for chunk in chunks[i]]
+        logger.info(f"Summarizing {len(flat)} chunks of {len(active)} transcripts (level {level})...")
+        partials = _summarize_batches(
+            summarizer, flat, max_length=120, min_length=20,
+            on_batch=on_batch and (lambda done, total: on_batch(done, total, level)),
+        )
+        offset = 0
+        for i in active:
+            count = len(chunks[i])
+            own = partials[offset:offset + count]
+            offset += count
+            next_chunks = chunk_transcript("\n".join(own), SUMMARY_CHUNK_TOKENS, tokenizer)
+            # Partial summaries that stopped shrinking go to the final pass as one (truncated) text
+            chunks[i] = ["\n".join(own)] if len(next_chunks) >= count else next_chunks
+
+    texts = [c[0] if c else t for c, t in zip(chunks, transcripts)]
+    overviews = _summarize_batches(summarizer, texts, max_length=180, min_length=60)
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Map-reduce summary of {len(transcripts)} transcripts ({sum(map(len, transcripts))} characters) "
+        f"in {elapsed:.2f}s ({level} levels)"
+    )
+    return overviews
+
+
+def _fallback_overview(transcript: str, sentences: int = SUMMARY_SENTENCES) -> str:
+    """Extractive (TextRank) overview, used in extractive mode and when no summarizer is available."""
+    return extractive_summary(transcript, sentences)
+
+
+def _use_summarizer() -> bool:
+    return SUMMARIZER_AVAILABLE and SUMMARY_MODE != "extractive"
+
+
+def summarize_chunk(text: str) -> str:
+    """Short summary of one piece of a transcript (e.g. the latest minutes of a live meeting)."""
+    if USE_STUB or not _use_summarizer() or len(text) < 50:
+        return _fallback_overview(text, 3)
+    try:
+        summarizer = registry.get(SUMMARIZER_KEY)
+        return summarizer(text, max_length=120, min_length=20, do_sample=False, truncation=True)[0]["summary_text"]
+    except Exception as e:
+        logger.warning(f"Chunk summarization failed: {e}. Using rule-based extraction.")
+        return _fallback_overview(text)
+
+
+def summarize(transcript: str, partial_summaries: List[str] | None = None, progress=None) -> Dict:
+    """Generate summary with overview, decisions, and action items.
+    ``partial_summaries`` covering the whole transcript shortcut the map-reduce step;
+    ``progress`` receives map-reduce batch progress."""
     if USE_STUB:
         logger.info("Using STUB mode for summarization")
         return {
@@ -151,24 +376,22 @@ def summarize(transcript: str) -> Dict:
     
     # Extract decisions and action items from transcript
     logger.info("Extracting decisions and action items...")
-    decisions = extract_decisions(transcript)
-    action_items = extract_action_items(transcript)
+    action_items, decisions = extract_highlights(transcript)
     
-    if pipeline is None:
-        logger.warning("Transformers not installed. Using rule-based extraction.")
-        # Create a better overview from first few sentences
-        sentences = transcript.split('.')[:3]
-        overview = '. '.join(s.strip() for s in sentences if s.strip()) + '.'
+    if not _use_summarizer():
+        if SUMMARIZER_AVAILABLE:
+            logger.info("Extractive summary mode")
+        else:
+            logger.warning("Transformers not installed. Using rule-based extraction.")
         return {
-            "overview": overview if len(overview) < 500 else overview[:500] + "...",
+            "overview": _fallback_overview(transcript),
             "decisions": decisions,
             "action_items": action_items,
         }
     
     # Real summarization using BART or T5
     try:
-        logger.info(f"Loading summarization model...")
-        summarizer = pipeline("summarization", model="facebook/bart-large-cnn", device=-1)
+        summarizer = registry.get(SUMMARIZER_KEY)
         
         # Chunk transcript if long; here we keep simple.
         if len(transcript) < 50:
@@ -180,10 +403,13 @@ def summarize(transcript: str) -> Dict:
             }
         
         logger.info(f"Summarizing transcript ({len(transcript)} characters)...")
-        # Limit input length for BART
-        max_input = 1024
-        transcript_chunk = transcript[:max_input] if len(transcript) > max_input else transcript
-        sum_text = summarizer(transcript_chunk, max_length=180, min_length=60, do_sample=False)[0]["summary_text"]
+        if SUMMARY_MODE == "truncate":
+            # Legacy behaviour: only the beginning of the transcript is summarized
+            max_input = 1024
+            transcript_chunk = transcript[:max_input] if len(transcript) > max_input else transcript
+            sum_text = summarizer(transcript_chunk, max_length=180, min_length=60, do_sample=False)[0]["summary_text"]
+        else:
+            sum_text = summarize_long(summarizer, transcript, partial_summaries, progress)
         logger.info(f"Summarization completed")
         
         return {
@@ -193,11 +419,39 @@ def summarize(transcript: str) -> Dict:
         }
     except Exception as e:
         logger.warning(f"Summarization failed: {e}. Using rule-based extraction.")
-        # Create overview from first few sentences
-        sentences = transcript.split('.')[:3]
-        overview = '. '.join(s.strip() for s in sentences if s.strip()) + '.'
         return {
-            "overview": overview if len(overview) < 500 else overview[:500] + "...",
+            "overview": _fallback_overview(transcript),
             "decisions": decisions,
             "action_items": action_items,
         }
+
+
+def summarize_many(transcripts: List[str], progress=None) -> List[Dict]:
+    """Summaries of several transcripts (batch ingestion), like ``summarize`` applied to each,
+    with the summarizer's batches shared across them. ``progress`` is an optional list of
+    ProgressReporters, one per transcript."""
+    if USE_STUB or not _use_summarizer() or SUMMARY_MODE == "truncate" or len(transcripts) < 2:
+        return [summarize(t, progress=p) for t, p in zip(transcripts, progress or [None] * len(transcripts))]
+
+    logger.info(f"Extracting decisions and action items of {len(transcripts)} transcripts...")
+    highlights = [extract_highlights(t) for t in transcripts]
+    # Too short to summarize: the transcript is its own overview
+    overviews = {i: t for i, t in enumerate(transcripts) if len(t) < 50}
+    pending = [i for i in range(len(transcripts)) if i not in overviews]
+
+    def on_batch(done: int, total: int, level: int) -> None:
+        for reporter in progress or []:
+            reporter.update("summarization", done, total, level=level)
+
+    try:
+        summarizer = registry.get(SUMMARIZER_KEY)
+        texts = summarize_long_many(summarizer, [transcripts[i] for i in pending], on_batch)
+        overviews.update(zip(pending, texts))
+    except Exception as e:
+        logger.warning(f"Batch summarization failed: {e}. Using rule-based extraction.")
+        overviews.update((i, _fallback_overview(transcripts[i])) for i in pending)
+
+    return [
+        {"overview": overviews[i], "decisions": decisions, "action_items": action_items}
+        for i, (action_items, decisions) in enumerate(highlights)
+    ]
@@ -0,0 +1,68 @@
+from __future__ import annotations
+import logging
+import os
+import subprocess
+from contextlib import contextmanager
+from typing import Iterator, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+def decode_audio(file_path: str, out_path: Optional[str] = None, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode the first audio stream of any ffmpeg-readable file to mono float32 PCM.
+
+    ffmpeg writes raw samples straight to ``out_path`` (video, subtitle and
+    data streams are skipped, not decoded) and the result is memory-mapped, so
+    the waveform never sits in Python memory as bytes and is shared, without
+    copies, by every stage that receives the array. The mapping is
+    copy-on-write: stages may scribble on it without touching the file.
+    """
+    out_path = out_path or f"{file_path}.pcm"
+    cmd = [
+        "ffmpeg", "-nostdin", "-y", "-threads", "0", "-i", file_path,
+        "-map", "0:a:0", "-vn", "-sn", "-dn",
+        "-ac", "1", "-ar", str(sample_rate), "-acodec", "pcm_f32le", "-f", "f32le", out_path,
+    ]
+    try:
+        subprocess.run(cmd, capture_output=True, check=True)
+    except FileNotFoundError:
+        raise RuntimeError(
+            "FFmpeg is required but not found. "
+            "Install it from: https://www.gyan.dev/ffmpeg/builds/ "
+            "Or set USE_STUB=1 in .env to use test data"
+        )
+    except subprocess.CalledProcessError as e:
+        _remove(out_path)
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')[-500:]}") from e
+
+    if os.path.getsize(out_path) == 0:
+        audio = np.zeros(0, dtype=np.float32)
+    else:
+        audio = np.memmap(out_path, dtype=np.float32, mode="c")
+    logger.info(f"Decoded {file_path}: {len(audio) / sample_rate:.1f}s of audio")
+    return audio
+
+
+@contextmanager
+def open_audio(file_path: str, sample_rate: int = SAMPLE_RATE) -> Iterator[np.ndarray]:
+    """Decode once for the duration of a pipeline run and delete the PCM file afterwards."""
+    out_path = f"{file_path}.pcm"
+    audio = decode_audio(file_path, out_path, sample_rate)
+    try:
+        yield audio
+    finally:
+        # On POSIX the mapping stays valid after unlinking and the disk space is
+        # reclaimed once the last view of the array is released
+        _remove(out_path)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Failed to remove decoded audio {path}: {e}")
@@ -0,0 +1,106 @@
+"""Batch ingestion: many recordings queued as one job batch (``POST /upload/batch`` and ingest.py)."""
+from __future__ import annotations
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+from bson import ObjectId
+from .db import get_db
+from .models import MeetingCreate
+from .jobs import job_queue, new_job_id
+from .executor import AdmissionError
+from .cache import result_cache
+from .transcripts import STORED_FIELDS, store_result
+from .storage import SavedUpload, remove_upload
+from .metrics import stage_seconds, stage_errors
+
+logger = logging.getLogger(__name__)
+
+
+async def ingest_batch(files: List[Tuple[str, SavedUpload]], model: Optional[str] = None) -> dict:
+    """Create meetings for saved recordings and queue the uncached ones as one batch.
+
+    ``files`` pairs original filenames with saved uploads. Recordings whose
+    result is cached are stored right away; all meetings are inserted with one
+    ``insert_many``. ``model`` is the transcription model size for all of
+    them (default WHISPER_MODEL). Raises an AdmissionError when the job queue cannot take the
+    batch (QueueFullError) or store it; the caller then removes the saved files.
+    """
+    cached = [await result_cache.get(saved.sha256, model) for _, saved in files]
+    job_queue.check_room(sum(1 for result in cached if result is None))
+
+    created = datetime.utcnow()
+    oids = [ObjectId() for _ in files]
+    temp_ids = [new_job_id() for _ in files]
+    docs = []
+    for (filename, saved), result, temp_id in zip(files, cached, temp_ids):
+        docs.append(MeetingCreate(
+            **{"transcript": "", "speakers": [], "summary": {}, **(result or {})},
+            filename=filename,
+            temp_id=temp_id,
+            file_size=saved.size,
+            sha256=saved.sha256,
+            createdAt=created,
+            status="done" if result is not None else "processing",
+        ).model_dump())
+
+    db = await get_db()
+    meeting_ids: List[str | None] = [None] * len(files)
+    try:
+        with stage_seconds.time(stage="db_insert"):
+            stored_docs = []
+            for oid, doc, result in zip(oids, docs, cached):
+                stored_doc = {"_id": oid, **{k: v for k, v in doc.items() if k not in STORED_FIELDS}}
+                if result is not None:
+                    stored_doc.update(await store_result(oid, result))
+                stored_docs.append(stored_doc)
+            await db.meetings.insert_many(stored_docs, ordered=False)
+        meeting_ids = [str(oid) for oid in oids]
+        logger.info(f"Saved {len(files)} meetings to the database")
+    except Exception as e:
+        stage_errors.inc(stage="db_insert")
+        logger.warning(f"Failed to save batch to database: {e}")
+        # The jobs still run; their results are served from the job records instead
+
+    items = []
+    for (filename, saved), result, temp_id, meeting_id in zip(files, cached, temp_ids, meeting_ids):
+        if result is not None:
+            remove_upload(saved.path)
+            if meeting_id is None:
+                # Nothing else holds the result; /summary/{temp_id} serves it from the job record
+                job_queue.record_result(temp_id, filename, result, sha256=saved.sha256, model=model)
+            continue
+        items.append({
+            "job_id": temp_id,
+            "file_path": saved.path,
+            "filename": filename,
+            "meeting_id": meeting_id,
+            "sha256": saved.sha256,
+            "model": model,
+        })
+    try:
+        jobs = await job_queue.submit_batch(items) if items else []
+    except AdmissionError as e:
+        # The queue filled up (or the job store failed) while the meetings were being inserted
+        queued_ids = [ObjectId(item["meeting_id"]) for item in items if item["meeting_id"] is not None]
+        if queued_ids:
+            await db.meetings.update_many(
+                {"_id": {"$in": queued_ids}}, {"$set": {"status": "failed", "error": str(e)}}
+            )
+        raise
+
+    return {
+        "batch_id": jobs[0]["batch_id"] if jobs else None,
+        "items": [
+            {
+                "_id": meeting_id or temp_id,
+                "temp_id": temp_id,
+                "job_id": temp_id if result is None else None,
+                "filename": filename,
+                "file_size": saved.size,
+                "sha256": saved.sha256,
+                "status": ("done" if meeting_id else "temporary") if result is not None else "processing",
+                "cached": result is not None,
+            }
+            for (filename, saved), result, temp_id, meeting_id in zip(files, cached, temp_ids, meeting_ids)
+        ],
+    }
@@ -0,0 +1,181 @@
+from __future__ import annotations
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+from .db import get_db
+from .asr import resolve_backend
+from . import diarization
+from .transcripts import STORED_FIELDS, transcript_store
+from .config import (
+    USE_STUB,
+    WHISPER_MODEL,
+    FASTER_WHISPER_COMPUTE_TYPE,
+    FASTER_WHISPER_BEAM_SIZE,
+    TRANSCRIBE_CHUNK_SECONDS,
+    VAD_ENABLED,
+    VAD_MIN_SILENCE,
+    VAD_MIN_SPEECH,
+    VAD_PADDING,
+    VAD_MAX_SPEECH_RATIO,
+    DIARIZATION_NUM_SPEAKERS,
+    DIARIZATION_MAX_SPEAKERS,
+    PYANNOTE_MODEL,
+    SUMMARIZER_MODEL,
+    SUMMARY_MODE,
+    SUMMARY_SENTENCES,
+    SUMMARY_CHUNK_TOKENS,
+    RESULT_CACHE_ENABLED,
+    RESULT_CACHE_SIZE,
+    RESULT_CACHE_VERSION,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def pipeline_version() -> str:
+    """Fingerprint of everything that changes pipeline output for the same audio.
+
+    Transcription and diarization backends are the ones actually used: with
+    "auto" they depend on which packages are installed (and, for pyannote, on
+    HUGGINGFACE_TOKEN). VAD settings change which audio is transcribed, and
+    diarization settings change the speaker labels.
+    """
+    backend = resolve_backend()
+    if backend == "faster-whisper":
+        backend += f"/{FASTER_WHISPER_COMPUTE_TYPE}/beam{FASTER_WHISPER_BEAM_SIZE}"
+    diarizer = diarization.resolve_backend()
+    if diarizer == "pyannote":
+        diarizer += f"/{PYANNOTE_MODEL}"
+    vad = f"{VAD_MIN_SILENCE}:{VAD_MIN_SPEECH}:{VAD_PADDING}:{VAD_MAX_SPEECH_RATIO}" if VAD_ENABLED else "off"
+    parts = [
+        RESULT_CACHE_VERSION,
+        f"stub={USE_STUB}",
+        f"transcribe={backend}:{WHISPER_MODEL}:{TRANSCRIBE_CHUNK_SECONDS}",
+        f"vad={vad}",
+        f"diarization={diarizer}:{DIARIZATION_NUM_SPEAKERS}:{DIARIZATION_MAX_SPEAKERS}",
+        f"summarizer={SUMMARIZER_MODEL}",
+        f"summary={SUMMARY_MODE}:{SUMMARY_CHUNK_TOKENS}:{SUMMARY_SENTENCES}",
+    ]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+
+
+class ResultCache:
+    """Pipeline results keyed by audio SHA-256 and pipeline version.
+
+    A bounded in-memory LRU sits in front of the ``result_cache`` MongoDB
+    collection, so repeated uploads skip transcription and summarization even
+    after a restart or on another instance.
+
+    Entries hold the summary, speakers and other small fields plus the id of
+    the meeting whose ``transcript_chunks`` hold the transcript and segments,
+    so transcripts are stored once, compressed, and an entry never approaches
+    MongoDB's document size limit. ``get`` loads them back from there.
+    """
+
+    def __init__(self, max_entries: int, enabled: bool = True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.version = pipeline_version()
+        self._memory: "OrderedDict[str, dict]" = OrderedDict()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def key(self, sha256: str, model: Optional[str] = None) -> str:
+        """Cache key; results of a non-default transcription model are kept apart."""
+        if model and model != WHISPER_MODEL:
+            return f"{sha256}:{self.version}:{model}"
+        return f"{sha256}:{self.version}"
+
+    async def get(self, sha256: str, model: Optional[str] = None) -> Optional[dict]:
+        if not self.enabled or not sha256:
+            return None
+        key = self.key(sha256, model)
+
+        entry = self._memory.get(key)
+        in_memory = entry is not None
+        if in_memory:
+            self._memory.move_to_end(key)
+        else:
+            try:
+                db = await get_db()
+                doc = await db.result_cache.find_one({"_id": key})
+            except Exception as e:
+                logger.warning(f"Result cache lookup failed: {e}")
+                doc = None
+            if doc is not None:
+                entry = doc["result"]
+                self._remember(key, entry)
+
+        result = await self._with_transcript(key, entry) if entry is not None else None
+        if result is None:
+            self.misses += 1
+        elif in_memory:
+            self.memory_hits += 1
+        else:
+            self.db_hits += 1
+        return result
+
+    async def _with_transcript(self, key: str, entry: dict) -> Optional[dict]:
+        """The full result of an entry, its transcript and segments loaded from the source meeting."""
+        if "meeting_id" not in entry:
+            # Entries written before transcripts were referenced carry them inline
+            return entry
+        try:
+            transcript = await transcript_store.load(entry["meeting_id"], "transcript")
+            segments = await transcript_store.load_segments(entry["meeting_id"])
+        except Exception as e:
+            logger.warning(f"Loading the cached transcript of {entry['meeting_id']} failed: {e}")
+            transcript = None
+        if transcript is None:
+            # Without its transcript the entry is useless
+            self._memory.pop(key, None)
+            return None
+        result = {k: v for k, v in entry.items() if k != "meeting_id"}
+        result["transcript"] = transcript.decode("utf-8")
+        result["segments"] = segments
+        return result
+
+    async def put(self, sha256: str, result: dict, meeting_id, model: Optional[str] = None) -> None:
+        """Cache a result whose transcript and segments are stored for ``meeting_id``."""
+        if not self.enabled or not sha256 or meeting_id is None:
+            return
+        key = self.key(sha256, model)
+        entry = {k: v for k, v in result.items() if k not in STORED_FIELDS and k != "transcript_stored"}
+        entry["meeting_id"] = str(meeting_id)
+        self._remember(key, entry)
+        try:
+            db = await get_db()
+            await db.result_cache.replace_one(
+                {"_id": key},
+                {"_id": key, "sha256": sha256, "version": self.version, "result": entry,
+                 "createdAt": datetime.utcnow()},
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning(f"Result cache store failed: {e}")
+
+    def _remember(self, key: str, result: dict) -> None:
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        hits = self.memory_hits + self.db_hits
+        return {
+            "enabled": self.enabled,
+            "version": self.version,
+            "memory_entries": len(self._memory),
+            "max_memory_entries": self.max_entries,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+result_cache = ResultCache(max_entries=RESULT_CACHE_SIZE, enabled=RESULT_CACHE_ENABLED)
@@ -10,6 +10,136 @@ USE_STUB: bool = os.getenv("USE_STUB", "1") == "1"
 OPENAI_API_KEY: str | None = os.getenv("OPENAI_API_KEY")
 HUGGINGFACE_DEVICE: str = os.getenv("HUGGINGFACE_DEVICE", "cpu")
 
+# Models
+WHISPER_MODEL: str = os.getenv("WHISPER_MODEL", "base")
+# Speech-to-text engine: "auto" (faster-whisper when installed, else whisper), "whisper",
+# "whisper-int8" (torch dynamic int8 quantization) or "faster-whisper" (CTranslate2)
+TRANSCRIBE_BACKEND: str = os.getenv("TRANSCRIBE_BACKEND", "auto")
+# Model sizes a request may choose with ?model= (WHISPER_MODEL is always allowed)
+TRANSCRIBE_MODELS: list[str] = [m.strip() for m in os.getenv("TRANSCRIBE_MODELS", "tiny,base,small").split(",") if m.strip()]
+# CTranslate2 weight type for faster-whisper: "int8", "int8_float32", "float32"...
+FASTER_WHISPER_COMPUTE_TYPE: str = os.getenv("FASTER_WHISPER_COMPUTE_TYPE", "int8")
+FASTER_WHISPER_BEAM_SIZE: int = int(os.getenv("FASTER_WHISPER_BEAM_SIZE", "5"))
+SUMMARIZER_MODEL: str = os.getenv("SUMMARIZER_MODEL", "facebook/bart-large-cnn")
+# Comma-separated registry names to load at startup, e.g. "faster-whisper:base,summarizer:facebook/bart-large-cnn".
+# Transcription models are "<backend>:<size>" with the backend TRANSCRIBE_BACKEND resolves to
+# (whisper, whisper-int8 or faster-whisper; "auto" is faster-whisper when installed, else whisper)
+PRELOAD_MODELS: list[str] = [m.strip() for m in os.getenv("PRELOAD_MODELS", "").split(",") if m.strip()]
+# Upper bound for resident models; least recently used ones are evicted beyond it (0 = unlimited)
+MODEL_MEMORY_BUDGET_MB: float = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+
+# Voice activity detection ahead of Whisper
+VAD_ENABLED: bool = os.getenv("VAD_ENABLED", "1") == "1"
+# Pauses shorter than this (seconds) stay inside a speech region
+VAD_MIN_SILENCE: float = float(os.getenv("VAD_MIN_SILENCE", "0.6"))
+# Speech bursts shorter than this (seconds) are ignored
+VAD_MIN_SPEECH: float = float(os.getenv("VAD_MIN_SPEECH", "0.25"))
+# Context kept around each region (seconds)
+VAD_PADDING: float = float(os.getenv("VAD_PADDING", "0.2"))
+# Skip VAD trimming when speech covers more than this fraction of the audio
+VAD_MAX_SPEECH_RATIO: float = float(os.getenv("VAD_MAX_SPEECH_RATIO", "0.9"))
+# Speech (seconds) sent to Whisper per call; chunks are cut at pauses found by the VAD
+TRANSCRIBE_CHUNK_SECONDS: float = float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "600"))
+
+# Diarization
+# "auto" (pyannote when installed and HUGGINGFACE_TOKEN is set, else energy), "pyannote", "energy" or "none"
+DIARIZATION_BACKEND: str = os.getenv("DIARIZATION_BACKEND", "auto")
+# Fixed number of speakers (0 = estimate up to DIARIZATION_MAX_SPEAKERS)
+DIARIZATION_NUM_SPEAKERS: int = int(os.getenv("DIARIZATION_NUM_SPEAKERS", "0"))
+DIARIZATION_MAX_SPEAKERS: int = int(os.getenv("DIARIZATION_MAX_SPEAKERS", "6"))
+PYANNOTE_MODEL: str = os.getenv("PYANNOTE_MODEL", "pyannote/speaker-diarization-3.1")
+HUGGINGFACE_TOKEN: str | None = os.getenv("HUGGINGFACE_TOKEN")
+
+# Summarization
+# "mapreduce" summarizes the whole transcript in chunks; "truncate" only its first 1024 characters;
+# "extractive" never loads the summarizer and picks sentences with TextRank (CPU-only, for heavy load)
+SUMMARY_MODE: str = os.getenv("SUMMARY_MODE", "mapreduce")
+# Sentences in an extractive overview (also used when no summarizer is available)
+SUMMARY_SENTENCES: int = int(os.getenv("SUMMARY_SENTENCES", "5"))
+# Token budget per chunk fed to the summarizer (BART accepts 1024 including special tokens)
+SUMMARY_CHUNK_TOKENS: int = int(os.getenv("SUMMARY_CHUNK_TOKENS", "900"))
+SUMMARY_BATCH_SIZE: int = int(os.getenv("SUMMARY_BATCH_SIZE", "4"))
+# Threads submitting batches to the summarizer concurrently
+SUMMARY_WORKERS: int = int(os.getenv("SUMMARY_WORKERS", "1"))
+
+# Live (WebSocket) transcription
+# New audio (seconds) that triggers the next transcription window
+LIVE_STEP_SECONDS: float = float(os.getenv("LIVE_STEP_SECONDS", "5"))
+# Longest window re-transcribed before segments are committed regardless
+LIVE_WINDOW_SECONDS: float = float(os.getenv("LIVE_WINDOW_SECONDS", "30"))
+# Segments ending closer than this to the live edge may still change
+LIVE_STABLE_SECONDS: float = float(os.getenv("LIVE_STABLE_SECONDS", "3"))
+# Committed characters summarized into one rolling partial summary
+LIVE_SUMMARY_CHARS: int = int(os.getenv("LIVE_SUMMARY_CHARS", "3000"))
+# Threads running live transcription and summaries (inference never runs on the event loop)
+LIVE_WORKERS: int = int(os.getenv("LIVE_WORKERS", "2"))
+# Live inference calls allowed to wait for a thread; beyond it windows are skipped until one frees up
+LIVE_MAX_PENDING: int = int(os.getenv("LIVE_MAX_PENDING", "4"))
+# Concurrent /live sessions; further connections are closed with code 1013 (try again later)
+LIVE_MAX_SESSIONS: int = int(os.getenv("LIVE_MAX_SESSIONS", "8"))
+
+# Job queue
+# Worker processes running the AI pipeline (0 = threads inside the API process)
+JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "1"))
+# Jobs executed at once; defaults to the number of workers
+JOB_CONCURRENCY: int = int(os.getenv("JOB_CONCURRENCY", "0"))
+# Pending jobs accepted before /upload starts rejecting requests
+JOB_QUEUE_DEPTH: int = int(os.getenv("JOB_QUEUE_DEPTH", "16"))
+# Recordings accepted by one /upload/batch request
+BATCH_MAX_FILES: int = int(os.getenv("BATCH_MAX_FILES", "50"))
+# Finished jobs kept in memory for the status endpoint
+JOB_HISTORY_LIMIT: int = int(os.getenv("JOB_HISTORY_LIMIT", "1000"))
+# "memory" (queue inside each API process) or "mongo" (durable jobs collection leased by any
+# number of API processes and `python -m app.worker` processes; UPLOAD_DIR must be shared by all)
+JOB_STORE: str = os.getenv("JOB_STORE", "memory")
+# With JOB_STORE=mongo, whether API processes run jobs too (0 = dedicated workers only)
+API_RUNS_JOBS: bool = os.getenv("API_RUNS_JOBS", "1") == "1"
+# Lease taken on a job, renewed every JOB_HEARTBEAT_SECONDS; a job whose worker stops renewing is run again
+JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_HEARTBEAT_SECONDS: float = float(os.getenv("JOB_HEARTBEAT_SECONDS", "10"))
+# Attempts per job; failed attempts are retried after a backoff doubling from JOB_RETRY_BACKOFF_SECONDS
+JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF_SECONDS: float = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "10"))
+JOB_RETRY_BACKOFF_MAX_SECONDS: float = float(os.getenv("JOB_RETRY_BACKOFF_MAX_SECONDS", "300"))
+# How often idle workers look for jobs (and API processes refresh queue counts)
+JOB_POLL_SECONDS: float = float(os.getenv("JOB_POLL_SECONDS", "1"))
+# Finished job documents are deleted after this many hours
+JOB_RETENTION_HOURS: float = float(os.getenv("JOB_RETENTION_HOURS", "168"))
+
+# Result cache (keyed by audio SHA-256 + pipeline version)
+RESULT_CACHE_ENABLED: bool = os.getenv("RESULT_CACHE_ENABLED", "1") == "1"
+# Entries kept in the in-memory tier in front of MongoDB
+RESULT_CACHE_SIZE: int = int(os.getenv("RESULT_CACHE_SIZE", "128"))
+# Bump to invalidate cached results after pipeline changes
+RESULT_CACHE_VERSION: str = os.getenv("RESULT_CACHE_VERSION", "1")
+
+# Profiling
+# Fraction of pipeline runs profiled with cProfile (0 = never, 1 = every job)
+PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+# Where .prof files of sampled runs are written (one per job and concurrent stage)
+PROFILE_DIR: str = os.getenv("PROFILE_DIR", "backend/profiles")
+
+# Transcript storage (compressed, outside the meeting documents)
+# "zstd" (needs the zstandard package, falls back to gzip) or "gzip"
+TRANSCRIPT_CODEC: str = os.getenv("TRANSCRIPT_CODEC", "zstd")
+# Compressed bytes per stored chunk document (well under MongoDB's 16 MB limit)
+TRANSCRIPT_CHUNK_BYTES: int = int(os.getenv("TRANSCRIPT_CHUNK_BYTES", str(4 * 1024 * 1024)))
+
+# API responses
+# JSON bodies at least this large are sent gzip- or brotli-compressed to clients that accept it
+RESPONSE_COMPRESS_MIN_BYTES: int = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+# How long browsers may reuse a finished meeting's /summary response without revalidating
+SUMMARY_CACHE_SECONDS: int = int(os.getenv("SUMMARY_CACHE_SECONDS", "86400"))
+
 # Storage
 UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "backend/uploads")
+# Largest accepted upload in bytes (0 = unlimited)
+MAX_UPLOAD_BYTES: int = int(os.getenv("MAX_UPLOAD_BYTES", str(500 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+# Chunk size of resumable upload sessions (POST /uploads)
+UPLOAD_SESSION_CHUNK_BYTES: int = int(os.getenv("UPLOAD_SESSION_CHUNK_BYTES", str(8 * 1024 * 1024)))
+# Unfinished upload sessions and their partial files are removed after this long
+UPLOAD_SESSION_TTL_HOURS: float = float(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+# Keep recordings on disk after processing instead of deleting them
+KEEP_UPLOADS: bool = os.getenv("KEEP_UPLOADS", "0") == "1"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
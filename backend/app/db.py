@@ -1,5 +1,6 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from .config import MONGODB_URI, MONGODB_DB
+from .config import MONGODB_URI, MONGODB_DB, JOB_RETENTION_HOURS
+from .search import ensure_search_indexes
 
 _client: AsyncIOMotorClient | None = None
 _db = None
@@ -10,3 +11,20 @@ async def get_db():
         _client = AsyncIOMotorClient(MONGODB_URI)
         _db = _client[MONGODB_DB]
     return _db
+
+async def ensure_indexes():
+    """Create the indexes used by /history pagination, temp_id lookups, transcript storage, /search,
+    upload session expiry and job leasing."""
+    db = await get_db()
+    await db.meetings.create_index([("createdAt", -1), ("_id", -1)], name="createdAt_id")
+    await db.meetings.create_index("temp_id", name="temp_id", sparse=True)
+    await db.transcript_chunks.create_index([("meeting_id", 1), ("kind", 1), ("seq", 1)], name="meeting_kind_seq")
+    await db.upload_sessions.create_index("expires_at", name="expires_at")
+    await db.jobs.create_index([("status", 1), ("available_at", 1)], name="status_available_at")
+    await db.jobs.create_index([("status", 1), ("lease_expires", 1)], name="status_lease_expires")
+    await db.jobs.create_index("batch_id", name="batch_id")
+    # Finished jobs (and batch counters) expire; unfinished ones have no finishedAt
+    retention = int(JOB_RETENTION_HOURS * 3600)
+    await db.jobs.create_index("finishedAt", name="finishedAt_ttl", expireAfterSeconds=retention)
+    await db.job_batches.create_index("createdAt", name="createdAt_ttl", expireAfterSeconds=retention)
+    await ensure_search_indexes(db)
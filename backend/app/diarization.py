@@ -0,0 +1,286 @@
+"""Speaker diarization backends and alignment of speaker turns to transcript segments."""
+from __future__ import annotations
+import logging
+from typing import List, Optional, Tuple
+import numpy as np
+from .audio import SAMPLE_RATE
+from .config import (
+    DIARIZATION_BACKEND,
+    DIARIZATION_MAX_SPEAKERS,
+    DIARIZATION_NUM_SPEAKERS,
+    PYANNOTE_MODEL,
+    HUGGINGFACE_TOKEN,
+)
+from .registry import registry
+from .lazy import installed, optional_import
+from .segments import Transcript
+
+logger = logging.getLogger(__name__)
+
+# pyannote.audio (and torch) is only imported when its pipeline is first loaded
+PYANNOTE_INSTALLED = installed("pyannote.audio")
+
+# (start seconds, end seconds, speaker label)
+Turn = Tuple[float, float, str]
+
+PYANNOTE_KEY = f"pyannote:{PYANNOTE_MODEL}"
+
+
+def _load_pyannote():
+    pyannote_audio = optional_import("pyannote.audio")
+    if pyannote_audio is None:
+        raise RuntimeError("pyannote.audio not available")
+    return pyannote_audio.Pipeline.from_pretrained(PYANNOTE_MODEL, use_auth_token=HUGGINGFACE_TOKEN)
+
+
+if PYANNOTE_INSTALLED:
+    registry.register(PYANNOTE_KEY, _load_pyannote)
+
+
+class PyannoteBackend:
+    name = "pyannote"
+
+    def diarize(self, audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> List[Turn]:
+        import torch  # available whenever pyannote is
+
+        pipeline = registry.get(PYANNOTE_KEY)
+        options = {}
+        if DIARIZATION_NUM_SPEAKERS:
+            options["num_speakers"] = DIARIZATION_NUM_SPEAKERS
+        else:
+            options["max_speakers"] = DIARIZATION_MAX_SPEAKERS
+        annotation = pipeline({"waveform": torch.from_numpy(audio)[None], "sample_rate": sample_rate}, **options)
+        return _relabel([(t.start, t.end, label) for t, _, label in annotation.itertracks(yield_label=True)])
+
+
+class EnergyClusterBackend:
+    """CPU-only fallback: log-mel window embeddings clustered with spherical k-means.
+
+    Frames below an adaptive energy threshold are treated as silence. Each
+    1.5 s window of speech is described by the mean and spread of its log-mel
+    bands; windows are clustered and neighbouring labels smoothed into turns.
+    """
+
+    name = "energy"
+
+    frame_seconds = 0.025
+    hop_seconds = 0.010
+    window_frames = 150  # 1.5 s
+    window_hop = 75
+    n_mels = 24
+    n_fft = 512
+
+    def diarize(self, audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> List[Turn]:
+        log_mel, log_energy = self._frame_features(audio, sample_rate)
+        if len(log_mel) < self.window_frames:
+            return [(0.0, len(audio) / sample_rate, "Speaker 1")] if len(audio) else []
+
+        speech = log_energy > self._energy_threshold(log_energy)
+        starts = np.arange(0, len(log_mel) - self.window_frames + 1, self.window_hop)
+        embeddings, kept = [], []
+        log_mel = log_mel - log_mel[speech].mean(axis=0) if speech.any() else log_mel
+        for i, s in enumerate(starts):
+            mask = speech[s:s + self.window_frames]
+            if mask.mean() < 0.5:
+                continue
+            frames = log_mel[s:s + self.window_frames][mask]
+            embeddings.append(np.concatenate([frames.mean(axis=0), frames.std(axis=0)]))
+            kept.append(i)
+        if not embeddings:
+            return []
+
+        X = np.asarray(embeddings, dtype=np.float32)
+        X /= np.linalg.norm(X, axis=1, keepdims=True) + 1e-8
+        labels = self._cluster(X)
+        labels = self._smooth(labels)
+
+        hop = self.window_hop * self.hop_seconds
+        turns: List[Turn] = []
+        for idx, label in zip(kept, labels):
+            start = idx * hop
+            end = start + self.window_frames * self.hop_seconds
+            if turns and turns[-1][2] == label and start <= turns[-1][1]:
+                turns[-1] = (turns[-1][0], end, label)
+            else:
+                if turns and start < turns[-1][1]:
+                    # Overlapping windows: split the difference
+                    middle = (start + turns[-1][1]) / 2
+                    turns[-1] = (turns[-1][0], middle, turns[-1][2])
+                    start = middle
+                turns.append((start, end, label))
+        return _relabel(turns)
+
+    def _mel_filters(self, sample_rate: int) -> np.ndarray:
+        def hz_to_mel(f):
+            return 2595 * np.log10(1 + f / 700)
+
+        def mel_to_hz(m):
+            return 700 * (10 ** (m / 2595) - 1)
+
+        mels = np.linspace(hz_to_mel(60), hz_to_mel(sample_rate / 2 - 200), self.n_mels + 2)
+        bins = np.floor((self.n_fft + 1) * mel_to_hz(mels) / sample_rate).astype(int)
+        filters = np.zeros((self.n_mels, self.n_fft // 2 + 1), dtype=np.float32)
+        for m in range(1, self.n_mels + 1):
+            left, center, right = bins[m - 1], bins[m], bins[m + 1]
+            if center > left:
+                filters[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+            if right > center:
+                filters[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+        return filters
+
+    def _frame_features(self, audio: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, np.ndarray]:
+        frame = int(self.frame_seconds * sample_rate)
+        hop = int(self.hop_seconds * sample_rate)
+        if len(audio) < frame:
+            return np.zeros((0, self.n_mels), np.float32), np.zeros(0, np.float32)
+        n_frames = 1 + (len(audio) - frame) // hop
+        window = np.hanning(frame).astype(np.float32)
+        filters = self._mel_filters(sample_rate)
+        log_mel = np.empty((n_frames, self.n_mels), dtype=np.float32)
+        log_energy = np.empty(n_frames, dtype=np.float32)
+
+        # Process a minute of frames at a time to keep the spectrogram small
+        block = 6000
+        for b in range(0, n_frames, block):
+            count = min(block, n_frames - b)
+            segment = audio[b * hop:(b + count - 1) * hop + frame]
+            frames = np.lib.stride_tricks.sliding_window_view(segment, frame)[::hop][:count]
+            power = np.abs(np.fft.rfft(frames * window, n=self.n_fft)) ** 2
+            log_mel[b:b + count] = np.log(power @ filters.T + 1e-10)
+            log_energy[b:b + count] = np.log(power.sum(axis=1) + 1e-10)
+        return log_mel, log_energy
+
+    @staticmethod
+    def _energy_threshold(log_energy: np.ndarray) -> float:
+        noise = np.percentile(log_energy, 10)
+        peak = np.percentile(log_energy, 95)
+        return noise + 0.3 * (peak - noise)
+
+    def _cluster(self, X: np.ndarray) -> np.ndarray:
+        if DIARIZATION_NUM_SPEAKERS:
+            return _kmeans(X, min(DIARIZATION_NUM_SPEAKERS, len(X)))
+        best_labels = np.zeros(len(X), dtype=int)
+        best_score = 0.1  # below this silhouette, assume a single speaker
+        rng = np.random.default_rng(0)
+        sample = rng.choice(len(X), size=min(len(X), 1000), replace=False)
+        for k in range(2, min(DIARIZATION_MAX_SPEAKERS, len(X) - 1) + 1):
+            labels = _kmeans(X, k)
+            score = _silhouette(X[sample], labels[sample])
+            if score > best_score:
+                best_score, best_labels = score, labels
+        return best_labels
+
+    @staticmethod
+    def _smooth(labels: np.ndarray) -> list:
+        """Replace isolated single-window labels with their neighbours' label."""
+        smoothed = list(labels)
+        for i in range(1, len(smoothed) - 1):
+            if smoothed[i - 1] == smoothed[i + 1] != smoothed[i]:
+                smoothed[i] = smoothed[i - 1]
+        return smoothed
+
+
+def _kmeans(X: np.ndarray, k: int, iterations: int = 30) -> np.ndarray:
+    """Spherical k-means with farthest-point initialisation (deterministic)."""
+    centers = [X[0]]
+    for _ in range(1, k):
+        similarity = np.max(X @ np.asarray(centers).T, axis=1)
+        centers.append(X[int(np.argmin(similarity))])
+    centers = np.asarray(centers)
+    labels = np.zeros(len(X), dtype=int)
+    for iteration in range(iterations):
+        new_labels = np.argmax(X @ centers.T, axis=1)
+        if iteration > 0 and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for j in range(k):
+            members = X[labels == j]
+            if len(members):
+                center = members.mean(axis=0)
+                centers[j] = center / (np.linalg.norm(center) + 1e-8)
+    return labels
+
+
+def _silhouette(X: np.ndarray, labels: np.ndarray) -> float:
+    """Mean silhouette coefficient using cosine distance."""
+    clusters = np.unique(labels)
+    if len(clusters) < 2:
+        return 0.0
+    distances = 1 - X @ X.T
+    per_cluster = np.stack([distances[:, labels == c].mean(axis=1) for c in clusters], axis=1)
+    own = per_cluster[np.arange(len(X)), np.searchsorted(clusters, labels)]
+    per_cluster[np.arange(len(X)), np.searchsorted(clusters, labels)] = np.inf
+    other = per_cluster.min(axis=1)
+    return float(np.mean((other - own) / np.maximum(np.maximum(own, other), 1e-8)))
+
+
+def _relabel(turns: List[Turn]) -> List[Turn]:
+    """Rename raw labels to "Speaker N" in order of first appearance."""
+    names: dict = {}
+    relabeled = []
+    for start, end, label in sorted(turns, key=lambda t: t[0]):
+        if label not in names:
+            names[label] = f"Speaker {len(names) + 1}"
+        relabeled.append((float(start), float(end), names[label]))
+    return relabeled
+
+
+def resolve_backend(name: str = DIARIZATION_BACKEND) -> str:
+    """Backend actually used for a DIARIZATION_BACKEND value: "pyannote", "energy" or "none"."""
+    if name == "auto":
+        return "pyannote" if PYANNOTE_INSTALLED and HUGGINGFACE_TOKEN else "energy"
+    if name == "pyannote" and not PYANNOTE_INSTALLED:
+        logger.warning("pyannote.audio not installed; falling back to energy diarization")
+        return "energy"
+    return name if name in ("pyannote", "energy") else "none"
+
+
+def get_backend():
+    """Diarization backend selected by DIARIZATION_BACKEND, or None when disabled."""
+    choice = resolve_backend()
+    if choice == "pyannote":
+        return PyannoteBackend()
+    if choice == "energy":
+        return EnergyClusterBackend()
+    return None
+
+
+def diarize_audio(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> Optional[List[Turn]]:
+    """Speaker turns for decoded audio, or None when diarization is disabled or fails."""
+    backend = get_backend()
+    if backend is None:
+        return None
+    try:
+        logger.info(f"Diarizing {len(audio) / sample_rate:.1f}s of audio with {backend.name} backend...")
+        turns = backend.diarize(audio, sample_rate)
+        logger.info(f"Diarization found {len({t[2] for t in turns})} speakers in {len(turns)} turns")
+        return turns
+    except Exception as e:
+        logger.warning(f"Diarization with {backend.name} failed: {e}")
+        return None
+
+
+def assign_speakers(transcript: Transcript, turns: List[Turn]) -> None:
+    """Label each segment with the speaker whose turns overlap it the most.
+
+    Segments and turns are both sorted by time, so a single forward sweep
+    suffices. Segments that overlap no turn take the nearest preceding one.
+    """
+    if not turns:
+        return
+    first = 0
+    for i, seg in enumerate(transcript):
+        while first < len(turns) and turns[first][1] <= seg.start:
+            first += 1
+        overlap: dict = {}
+        j = first
+        while j < len(turns) and turns[j][0] < seg.end:
+            start, end, speaker = turns[j]
+            if end > seg.start:
+                overlap[speaker] = overlap.get(speaker, 0.0) + min(end, seg.end) - max(start, seg.start)
+            j += 1
+        if overlap:
+            speaker = max(overlap, key=overlap.get)
+        else:
+            speaker = turns[first - 1][2] if first > 0 else turns[0][2]
+        transcript.set_speaker(i, speaker)
@@ -0,0 +1,92 @@
+"""Bounded executors for blocking inference called from request handlers."""
+from __future__ import annotations
+import asyncio
+import functools
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from .config import LIVE_WORKERS, LIVE_MAX_PENDING
+from .metrics import inference_in_flight, rejected_requests
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionError(Exception):
+    """Raised when an executor already has as many calls waiting as it admits."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def retry_after_seconds(waiting: int, slots: int, mean_seconds: Optional[float], default: int = 30) -> int:
+    """Seconds a rejected client should wait: the time to work off ``waiting`` calls on ``slots``."""
+    if mean_seconds is None:
+        return default
+    return max(1, min(300, round(mean_seconds * (waiting + 1) / max(slots, 1))))
+
+
+class BoundedExecutor:
+    """A dedicated thread pool with an admission limit.
+
+    At most ``concurrency`` calls run at once and at most ``max_pending`` more
+    wait for a thread; further calls raise AdmissionError right away (with a
+    Retry-After estimate from recent run times) instead of piling up behind
+    the others. Calls made with ``admit=False`` are always accepted (work that
+    must finish, such as closing a live session).
+    """
+
+    def __init__(self, name: str, concurrency: int, max_pending: int):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.max_pending = max_pending
+        self.in_flight = 0
+        self.rejected = 0
+        self._durations: deque = deque(maxlen=50)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=name)
+
+    def mean_seconds(self) -> Optional[float]:
+        return sum(self._durations) / len(self._durations) if self._durations else None
+
+    def waiting(self) -> int:
+        return max(0, self.in_flight - self.concurrency)
+
+    def retry_after(self) -> int:
+        return retry_after_seconds(self.waiting(), self.concurrency, self.mean_seconds())
+
+    async def run(self, fn, *args, admit: bool = True, **kwargs):
+        if admit and self.in_flight >= self.concurrency + self.max_pending:
+            self.rejected += 1
+            rejected_requests.inc(reason=f"{self.name}_busy")
+            raise AdmissionError(f"{self.name} executor is busy ({self.in_flight} calls in flight)", self.retry_after())
+        self.in_flight += 1
+        inference_in_flight.set(self.in_flight, executor=self.name)
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            self._durations.append(time.perf_counter() - started)
+            self.in_flight -= 1
+            inference_in_flight.set(self.in_flight, executor=self.name)
+
+    def stats(self) -> dict:
+        mean = self.mean_seconds()
+        return {
+            "concurrency": self.concurrency,
+            "max_pending": self.max_pending,
+            "running": min(self.in_flight, self.concurrency),
+            "waiting": self.waiting(),
+            "rejected": self.rejected,
+            "mean_seconds": round(mean, 3) if mean is not None else None,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Transcription windows, rolling summaries and final passes of /live sessions
+live_executor = BoundedExecutor("live", LIVE_WORKERS, LIVE_MAX_PENDING)
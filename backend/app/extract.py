@@ -0,0 +1,202 @@
+"""Single-pass extraction of action items and decisions from transcripts."""
+from __future__ import annotations
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Patterns that indicate action items
+ACTION_PATTERNS = [
+    r"(?:will|should|need to|have to|must|going to|plan to)\s+([^.!?]+)",
+    r"(?:action item|task|todo|to-do):\s*([^.!?]+)",
+    r"([A-Z][a-z]+)\s+(?:will|should|needs to|has to)\s+([^.!?]+)",
+    r"(?:implement|develop|create|build|design|prepare|draft)\s+([^.!?]+)",
+]
+
+# Patterns that indicate decisions
+DECISION_PATTERNS = [
+    r"(?:decided|agreed|determined|concluded)\s+(?:to|that)\s+([^.!?]+)",
+    r"(?:decision|choice|resolution):\s*([^.!?]+)",
+    r"(?:we will|we'll|team will)\s+([^.!?]+)",
+    r"(?:approved|selected|chosen)\s+([^.!?]+)",
+]
+
+# Every match of every pattern starts with one of these words, or (the named-owner
+# action pattern) with the word right before "will", "should", "needs to" or "has to"
+_TRIGGER_WORDS = [
+    "will", "should", "need to", "needs to", "have to", "has to", "must", "going to", "plan to",
+    "action item", "task", "todo", "to-do", "implement", "develop", "create", "build",
+    "design", "prepare", "draft", "decided", "agreed", "determined", "concluded",
+    "decision", "choice", "resolution", "we will", "we'll", "team will", "approved", "selected", "chosen",
+]
+
+
+def _trie(words: List[str]) -> str:
+    """Alternation of ``words`` factored by common prefix (``d(?:e(?:cided|sign)|raft)``).
+
+    The regex engine tries one branch per character instead of every word at
+    every position of the transcript.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word.lower():
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+_TRIGGER = _trie(_TRIGGER_WORDS) + r"|(?<![a-z])[a-z]{2,}\s+(?:will|should|needs to|has to)"
+
+# Relevance signals used for ranking; all but _OWNER are matched against the lowercased candidate
+_EXPLICIT = re.compile(r"\b(?:action item|task|todo|to-do|decision|resolution)\s*:|\b(?:decided|agreed|approved)\b")
+_STRONG = re.compile(r"\b(?:must|need to|needs to|have to|has to)\b")
+_DEADLINE = re.compile(
+    r"\b(?:by|before|until|due)\s+(?:the\s+)?(?:end of|next|monday|tuesday|wednesday|thursday|friday|"
+    r"saturday|sunday|tomorrow|tonight|today|eod|eow|\d)|\b(?:tomorrow|next week|this week|deadline)\b"
+)
+_OWNER = re.compile(
+    r"\b(?!(?:We|I|You|They|He|She|It|This|That|Someone|Everyone|Speaker)\b)[A-Z][a-z]+\s+"
+    r"(?:will|should|needs to|has to|is going to)\b"
+)
+_HEDGE = re.compile(r"\b(?:maybe|might|perhaps|possibly|probably|not sure)\b")
+
+MIN_LENGTH = 20
+MAX_LENGTH = 150
+
+
+def _clean(item: str) -> str:
+    item = item.strip().capitalize()
+    if not item.endswith('.'):
+        item += '.'
+    return item
+
+
+def _score(raw: str, mentions: int) -> float:
+    """Relevance of a candidate's original (not recased) text."""
+    lowered = raw.lower()
+    score = 1.0
+    if _EXPLICIT.search(lowered):
+        score += 2.0
+    if _DEADLINE.search(lowered):
+        score += 1.5
+    if _OWNER.search(raw):
+        score += 1.0
+    if _STRONG.search(lowered):
+        score += 0.5
+    if _HEDGE.search(lowered):
+        score -= 1.0
+    # Repeated mentions and a bit of detail both suggest importance
+    score += 0.5 * (mentions - 1)
+    score += min(len(raw), 100) / 200
+    return score
+
+
+def _scanner(categories: Dict[str, List[str]]) -> Tuple["re.Pattern[str]", "re.Pattern[str]", Dict[str, str]]:
+    """Regexes combining all patterns of ``categories``, and the category of each of their groups.
+
+    They match (zero-width) wherever a trigger word starts, and each pattern is
+    a case-insensitive lookahead in its own named group there, so one position
+    can start a hit of several patterns. The first regex runs on lowercased
+    ASCII text: its trigger is case-sensitive, which lets the regex engine
+    skip ahead to the first letters of the trigger words. The second is fully
+    case-insensitive, for any other text.
+    """
+    groups = {}
+    branches = []
+    for name, patterns in categories.items():
+        for i, pattern in enumerate(patterns):
+            group = f"{name}_{i}"
+            groups[group] = name
+            branches.append(f"(?:(?=(?P<{group}>{pattern}))|)")
+    body = "".join(branches)
+    lowered = re.compile(f"(?=(?:{_TRIGGER}))(?i:{body})")
+    unicode = re.compile(f"(?=(?:{_TRIGGER})){body}", re.IGNORECASE)
+    return lowered, unicode, groups
+
+
+class Extractor:
+    """Compiled extraction engine shared by all requests.
+
+    All patterns of all categories are combined into one regex, so the
+    transcript is scanned once; each hit reports, through its named groups,
+    which patterns match there. Hits of one pattern that overlap its previous
+    hit are dropped, which gives exactly the candidates of the original
+    per-pattern ``re.finditer``. Candidates are deduplicated with a dict and
+    ranked by relevance; only the ranking differs from the original, which
+    kept the first five in match order.
+    """
+
+    def __init__(self, categories: Dict[str, List[str]], limit: int = 5):
+        self.limit = limit
+        self.categories = list(categories)
+        # The scanner of all categories, plus one per category for callers that need only that one
+        self.scanners = {None: _scanner(categories)}
+        if len(categories) > 1:
+            self.scanners.update({name: _scanner({name: patterns}) for name, patterns in categories.items()})
+
+    def candidates(self, transcript: str, category: Optional[str] = None) -> Dict[str, Dict[str, list]]:
+        """Unranked candidates per category: ``{item: [item, raw text, first position, mentions]}``."""
+        lowered, unicode, groups = self.scanners[category if len(self.scanners) > 1 else None]
+        # Lowercasing ASCII keeps every offset, so hits map straight back to the transcript
+        if transcript.isascii():
+            scanner, text = lowered, transcript.lower()
+        else:
+            scanner, text = unicode, transcript
+        found: Dict[str, Dict[str, list]] = {name: {} for name in set(groups.values())}
+        spans = [(scanner.groupindex[group], found[name]) for group, name in groups.items()]
+        ends = [0] * len(spans)
+        for match in scanner.finditer(text):
+            for i, (index, items) in enumerate(spans):
+                start, end = match.span(index)
+                # Not this pattern, or inside its previous hit (finditer never overlaps its own matches)
+                if start < ends[i]:
+                    continue
+                ends[i] = end
+                raw = transcript[start:end].strip()
+                if not MIN_LENGTH < len(raw) < MAX_LENGTH:
+                    continue
+                item = _clean(raw)
+                entry = items.get(item)
+                if entry is None:
+                    items[item] = [item, raw, start, 1]
+                else:
+                    entry[3] += 1
+        return found
+
+    def extract(self, transcript: str, category: Optional[str] = None) -> Dict[str, List[str]]:
+        ranked = {}
+        for name, candidates in self.candidates(transcript, category).items():
+            entries = sorted(candidates.values(), key=lambda e: (-_score(e[1], e[3]), e[2]))
+            ranked[name] = [e[0] for e in entries[:self.limit]]
+        return ranked
+
+
+extractor = Extractor({"action_items": ACTION_PATTERNS, "decisions": DECISION_PATTERNS})
+
+# Shown instead of an empty list
+NONE_FOUND = {
+    "action_items": "No specific action items identified",
+    "decisions": "No specific decisions identified",
+}
+
+
+def extract_highlights(transcript: str) -> Tuple[List[str], List[str]]:
+    """Return ``(action_items, decisions)`` from a single scan of the transcript."""
+    result = extractor.extract(transcript)
+    return (result["action_items"] or [NONE_FOUND["action_items"]],
+            result["decisions"] or [NONE_FOUND["decisions"]])
+
+
+def extract_category(transcript: str, category: str) -> List[str]:
+    """Items of one category, scanning for that category's patterns only.
+
+    Callers that need both categories should use extract_highlights instead.
+    """
+    return extractor.extract(transcript, category)[category] or [NONE_FOUND[category]]
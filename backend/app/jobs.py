@@ -0,0 +1,772 @@
+from __future__ import annotations
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import socket
+import sys
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from .db import get_db
+from .config import (
+    JOB_WORKERS,
+    JOB_CONCURRENCY,
+    JOB_QUEUE_DEPTH,
+    JOB_HISTORY_LIMIT,
+    JOB_STORE,
+    JOB_POLL_SECONDS,
+    JOB_HEARTBEAT_SECONDS,
+    PRELOAD_MODELS,
+    USE_STUB,
+)
+from .pipeline import init_worker, warmup, run_pipeline, summarize_batch, report_model_loads
+from .registry import registry
+from .storage import remove_upload
+from .cache import result_cache
+from .progress import progress_hub, TERMINAL_EVENTS
+from .transcripts import STORED_FIELDS, store_result, transcript_store
+from .leases import FINAL_STATUSES, JobStore, LeaseLostError
+from .executor import AdmissionError, retry_after_seconds
+from .metrics import observe_event, queue_depth, jobs_running, rejected_requests, stage_seconds, stage_errors
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(AdmissionError):
+    """Raised when the job queue has reached JOB_QUEUE_DEPTH."""
+
+
+def new_job_id() -> str:
+    """ID of an upload's job; it doubles as the meeting's temporary ID (``temp_id``)."""
+    return "temp_" + uuid.uuid4().hex[:12]
+
+
+class JobQueue:
+    """Bounded queue of pipeline jobs executed on a worker pool.
+
+    Jobs are pulled by ``concurrency`` consumer tasks which hand the CPU-bound
+    pipeline to a process pool (or to threads when ``workers`` is 0), so the
+    event loop stays free to serve other requests. Each job updates the
+    ``status`` of its meeting document when it finishes.
+
+    Jobs submitted as a batch stop before summarization; when the last one is
+    transcribed, the batch's transcripts are summarized together (sharing the
+    summarizer's input batches) and written with one bulk write.
+
+    Progress events from the pipeline travel over one shared queue (a manager
+    queue when workers are processes) and are pumped into ``progress_hub``;
+    the queue's own events (queued, processing, done, failed) go through the
+    same queue so subscribers see them in order.
+    """
+
+    def __init__(self, workers: int, concurrency: int, max_depth: int, history_limit: int):
+        self.workers = workers
+        self.concurrency = max(1, concurrency or workers or 1)
+        self.max_depth = max_depth
+        self.history_limit = history_limit
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[Executor] = None
+        self._consumers: list[asyncio.Task] = []
+        self._manager = None
+        self._progress = None
+        self._pump: Optional[asyncio.Task] = None
+        self._warmup: Optional[asyncio.Task] = None
+        # Worker processes started and PRELOAD_MODELS loaded
+        self.ready = False
+        self._jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self._batches: dict[str, dict] = {}
+        # Recent job run times, for Retry-After estimates
+        self._durations: deque = deque(maxlen=50)
+        self.rejected = 0
+        self._started = False
+        # Latest model registry stats reported by each worker process, by pid
+        self._worker_models: dict[str, dict] = {}
+
+    async def start(self, consume: bool = True) -> None:
+        """Start the worker pool and consumers; with ``consume=False`` jobs are only submitted
+        (JOB_STORE=mongo, processed by ``python -m app.worker`` elsewhere)."""
+        self._queue = asyncio.Queue(maxsize=self.max_depth)
+        self._started = True
+        if not consume:
+            self._progress = queue.Queue()
+            self._pump = asyncio.create_task(progress_hub.pump(self._progress, self._on_progress))
+            self.ready = True
+            logger.info("Job queue started (submit only)")
+            return
+        if self.workers > 0:
+            context = multiprocessing.get_context("spawn")
+            self._manager = context.Manager()
+            self._progress = self._manager.Queue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=init_worker,
+                initargs=(self._progress,),
+            )
+        else:
+            self._progress = queue.Queue()
+            report_model_loads(self._progress)
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="pipeline")
+        # Workers start (and load models) in the background so the API serves requests meanwhile
+        self._warmup = asyncio.create_task(self._warm_up())
+        self._pump = asyncio.create_task(progress_hub.pump(self._progress, self._on_progress))
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+        logger.info(
+            f"Job queue started ({self.workers or 'in-process'} workers, "
+            f"concurrency {self.concurrency}, depth {self.max_depth})"
+        )
+
+    async def _warm_up(self) -> None:
+        """Spawn worker processes and load PRELOAD_MODELS before the first job needs them."""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            if self.workers > 0:
+                await asyncio.gather(*(loop.run_in_executor(self._executor, warmup) for _ in range(self.workers)))
+            elif PRELOAD_MODELS and not USE_STUB:
+                await loop.run_in_executor(self._executor, registry.preload, PRELOAD_MODELS)
+        except Exception as e:
+            logger.warning(f"Worker warm-up failed: {e}")
+            return
+        self.ready = True
+        logger.info(f"Pipeline workers ready in {time.perf_counter() - started:.2f}s")
+
+    async def stop(self) -> None:
+        tasks = self._consumers + [task for task in (self._pump, self._warmup) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._consumers, self._pump, self._warmup = [], None, None
+        self.ready = False
+        self._started = False
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def _new_job(
+        self,
+        job_id: str,
+        file_path: str,
+        filename: str,
+        meeting_id: Optional[str] = None,
+        sha256: Optional[str] = None,
+        batch_id: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> dict:
+        if not self._started:
+            raise RuntimeError("Job queue is not running")
+        return {
+            "id": job_id,
+            "meeting_id": meeting_id,
+            "filename": filename,
+            "file_path": file_path,
+            "sha256": sha256,
+            "batch_id": batch_id,
+            "model": model,
+            "status": "queued",
+            "error": None,
+            "enqueuedAt": datetime.utcnow(),
+            "startedAt": None,
+            "finishedAt": None,
+            "stage": None,
+            "percent": 0.0,
+            "timings": {},
+        }
+
+    def record_result(self, job_id: str, filename: str, result: dict, **fields) -> dict:
+        """Keep a result that needs no processing (a result cache hit) as a finished job.
+
+        Used when the meeting document could not be written, so ``/summary/{job_id}``
+        still finds the result on the job record. ``fields`` are as for ``submit``.
+        """
+        job = self._new_job(job_id, None, filename, **fields)
+        job.update(status="done", startedAt=job["enqueuedAt"], finishedAt=job["enqueuedAt"], percent=100.0, result=result)
+        self._remember(job)
+        return job
+
+    async def submit(self, job_id: str, file_path: str, filename: str, **fields) -> dict:
+        """Queue a recording; ``fields`` are meeting_id, sha256, batch_id and model."""
+        job = self._new_job(job_id, file_path, filename, **fields)
+        self.check_room(1)
+        self._queue.put_nowait(job)
+        self._remember(job)
+        self._emit(job, "queued", position=self._queue.qsize())
+        logger.info(f"Queued job {job_id} for {filename} ({self._queue.qsize()} pending)")
+        return job
+
+    async def submit_batch(self, items: list[dict]) -> list[dict]:
+        """Queue several recordings as one batch.
+
+        Each is transcribed on its own; once the last one is, all transcripts are
+        summarized together and their meetings updated in one bulk write. ``items``
+        hold ``submit``'s keyword arguments. The whole batch is rejected when the
+        queue cannot take all of it.
+        """
+        if not self._started:
+            raise RuntimeError("Job queue is not running")
+        self.check_room(len(items))
+        batch_id = "batch_" + uuid.uuid4().hex[:12]
+        batch = {"id": batch_id, "jobs": [], "pending": len(items), "results": {}}
+        self._batches[batch_id] = batch
+        batch["jobs"] = [await self.submit(**item, batch_id=batch_id) for item in items]
+        logger.info(f"Queued batch {batch_id} of {len(items)} jobs")
+        return batch["jobs"]
+
+    def check_room(self, jobs: int) -> None:
+        """Raise QueueFullError, with a Retry-After estimate, unless ``jobs`` more jobs can be queued."""
+        free = self.free_slots()
+        if free >= jobs:
+            return
+        self.rejected += 1
+        rejected_requests.inc(reason="queue_full")
+        message = f"Job queue is full ({self.max_depth} pending)" if free == 0 else (
+            f"Job queue cannot take {jobs} jobs ({free} of {self.max_depth} slots free)"
+        )
+        raise QueueFullError(message, self.retry_after())
+
+    def retry_after(self) -> int:
+        """Seconds until queued work has likely drained enough to accept new jobs."""
+        mean = sum(self._durations) / len(self._durations) if self._durations else None
+        return retry_after_seconds(self.pending(), self.concurrency, mean)
+
+    def pending(self) -> int:
+        """Jobs waiting to be processed."""
+        return self._queue.qsize() if self._queue else 0
+
+    def is_full(self) -> bool:
+        return self.free_slots() == 0
+
+    def free_slots(self) -> int:
+        """Jobs that can be queued right now."""
+        if not self._started:
+            return 0
+        if self.max_depth <= 0:
+            return sys.maxsize
+        return max(0, self.max_depth - self.pending())
+
+    async def batch(self, batch_id: str) -> list[dict]:
+        """Jobs of a batch still in the job history."""
+        return [job for job in self._jobs.values() if job["batch_id"] == batch_id]
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Job record kept by this process (see ``find`` for jobs processed elsewhere)."""
+        return self._jobs.get(job_id)
+
+    async def find(self, job_id: str) -> Optional[dict]:
+        return self._jobs.get(job_id)
+
+    def subscribe(self, job_id: str) -> AsyncIterator[dict]:
+        """Progress events of a job until it is done or failed."""
+        return progress_hub.subscribe(job_id)
+
+    def stats(self) -> dict:
+        counts: dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        mean = sum(self._durations) / len(self._durations) if self._durations else None
+        return {
+            "workers": self.workers,
+            "ready": self.ready,
+            "concurrency": self.concurrency,
+            "queue_depth": self.pending(),
+            "max_queue_depth": self.max_depth,
+            "free_slots": min(self.free_slots(), self.max_depth) if self.max_depth > 0 else None,
+            "running": counts.get("processing", 0),
+            "batches_running": len(self._batches),
+            "rejected": self.rejected,
+            "mean_job_seconds": round(mean, 3) if mean is not None else None,
+            "retry_after": self.retry_after(),
+            "jobs": counts,
+        }
+
+    def model_stats(self) -> dict:
+        """Model registry stats of each worker process, as last reported (empty with in-process threads)."""
+        return dict(self._worker_models)
+
+    def _emit(self, job: dict, event_type: str, **fields) -> None:
+        self._progress.put({"job_id": job["id"], "time": time.time(), "type": event_type, **fields})
+
+    def update_metrics(self) -> None:
+        """Refresh queue gauges before metrics are scraped."""
+        queue_depth.set(self.pending())
+        jobs_running.set(sum(1 for job in self._jobs.values() if job["status"] == "processing"))
+
+    def _on_progress(self, event: dict) -> None:
+        """Record metrics and track the latest stage and percent on the job record as events are pumped."""
+        observe_event(event)
+        if event["type"] == "model_stats":
+            self._worker_models[str(event["worker"])] = event["stats"]
+            return
+        job = self._jobs.get(event["job_id"])
+        if job is None:
+            return
+        if event["type"] == "stage":
+            job["stage"] = event["stage"]
+            if "seconds" in event:
+                job["timings"][event["stage"]] = event["seconds"]
+        elif event["type"] == "progress":
+            job["stage"] = event["stage"]
+            job["percent"] = event["percent"]
+        elif event["type"] == "done":
+            job["percent"] = 100.0
+            event["timings"] = dict(job["timings"])
+
+    def _remember(self, job: dict) -> None:
+        self._jobs[job["id"]] = job
+        while len(self._jobs) > self.history_limit:
+            self._jobs.popitem(last=False)
+
+    async def _consume(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                job["status"] = "processing"
+                job["startedAt"] = datetime.utcnow()
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: dict) -> None:
+        queue_wait = (job["startedAt"] - job["enqueuedAt"]).total_seconds()
+        self._emit(job, "processing", queue_wait=round(queue_wait, 3), attempt=job.get("attempts", 1))
+        logger.info(f"Processing job {job['id']}")
+        result = None
+        try:
+            result = await self._process(job)
+        except asyncio.CancelledError:
+            await self._abandon(job)
+            raise
+        except Exception as e:
+            logger.error(f"Job {job['id']} failed: {e}", exc_info=True)
+            if await self._retry(job, str(e)):
+                return
+            await self._fail([job], str(e))
+        remove_upload(job["file_path"])
+        if job["batch_id"] is not None:
+            await self._batch_item_done(job, result)
+        elif result is not None:
+            await self._complete([job], [result])
+
+    async def _retry(self, job: dict, error: str) -> bool:
+        """Schedule another attempt of a failed job; the in-memory queue never retries."""
+        return False
+
+    async def _abandon(self, job: dict) -> None:
+        """A job interrupted by shutdown; in memory it is lost with the process."""
+        remove_upload(job["file_path"])
+
+    async def _process(self, job: dict) -> dict:
+        # An identical upload may have finished while this one was queued
+        result = await result_cache.get(job["sha256"], job["model"])
+        if result is not None:
+            self._emit(job, "cached")
+            return result
+        # Batch jobs stop before summarization; their batch is summarized together
+        with_summary = job["batch_id"] is None
+        result = await asyncio.get_running_loop().run_in_executor(
+            self._executor, run_pipeline, job["file_path"], job["id"], self._progress, with_summary, job["model"]
+        )
+        return result
+
+    async def _batch_item_done(self, job: dict, result: Optional[dict]) -> None:
+        """Collect a batch job's result; the last one summarizes and stores the whole batch."""
+        batch = self._batches[job["batch_id"]]
+        if result is not None:
+            batch["results"][job["id"]] = result
+        batch["pending"] -= 1
+        if batch["pending"] > 0:
+            return
+        del self._batches[batch["id"]]
+
+        jobs = [j for j in batch["jobs"] if j["id"] in batch["results"]]
+        results = [batch["results"][j["id"]] for j in jobs]
+        todo = [i for i, r in enumerate(results) if "summary" not in r]
+        if todo:
+            try:
+                summaries = await asyncio.get_running_loop().run_in_executor(
+                    self._executor,
+                    summarize_batch,
+                    [results[i]["transcript"] for i in todo],
+                    [jobs[i]["id"] for i in todo],
+                    self._progress,
+                )
+            except Exception as e:
+                logger.error(f"Summarization of batch {batch['id']} failed: {e}", exc_info=True)
+                await self._fail([jobs[i] for i in todo], str(e))
+                jobs = [j for i, j in enumerate(jobs) if i not in todo]
+                results = [r for i, r in enumerate(results) if i not in todo]
+            else:
+                for i, summary in zip(todo, summaries):
+                    results[i] = {**results[i], "summary": summary}
+        if jobs:
+            await self._complete(jobs, results)
+        logger.info(f"Batch {batch['id']} completed ({len(jobs)} of {len(batch['jobs'])} jobs done)")
+
+    async def _complete(self, jobs: list[dict], results: list[dict]) -> None:
+        written = await self._update_meetings(jobs, [{**result, "status": "done"} for result in results])
+        for job, result, stored in zip(jobs, results, written):
+            job["status"] = "done"
+            if stored:
+                # The cache refers to the transcript just stored with the meeting
+                await result_cache.put(job["sha256"], result, job["meeting_id"], job["model"])
+            else:
+                # No database document to hold the result; keep it on the job
+                job["result"] = result
+            logger.info(f"Job {job['id']} completed")
+            self._finish(job)
+
+    async def _fail(self, jobs: list[dict], error: str) -> None:
+        for job in jobs:
+            job["status"] = "failed"
+            job["error"] = error
+        await self._update_meetings(jobs, [{"status": "failed", "error": error}] * len(jobs))
+        for job in jobs:
+            self._finish(job)
+
+    def _finish(self, job: dict) -> None:
+        job["finishedAt"] = datetime.utcnow()
+        elapsed = round((job["finishedAt"] - job["startedAt"]).total_seconds(), 3)
+        self._durations.append(elapsed)
+        if job["status"] == "done":
+            self._emit(job, "done", meeting_id=job["meeting_id"], seconds=elapsed)
+        else:
+            self._emit(job, "failed", error=job["error"], seconds=elapsed)
+
+    async def _update_meetings(self, jobs: list[dict], updates: list[dict]) -> list[bool]:
+        """Set fields on the jobs' meeting documents in one bulk write.
+
+        Returns, per job, whether its meeting document was updated.
+        """
+        written = [False] * len(jobs)
+        operations, positions = [], []
+        try:
+            db = await get_db()
+            for i, (job, fields) in enumerate(zip(jobs, updates)):
+                if job["meeting_id"] is None:
+                    continue
+                if any(field in fields for field in STORED_FIELDS):
+                    # Transcript and segments go to side storage, not the meeting document
+                    fields = await store_result(job["meeting_id"], fields)
+                operations.append(UpdateOne({"_id": ObjectId(job["meeting_id"])}, {"$set": fields}))
+                positions.append(i)
+            if operations:
+                with stage_seconds.time(stage="db_update"):
+                    await db.meetings.bulk_write(operations, ordered=False)
+            for i in positions:
+                written[i] = True
+        except Exception as e:
+            stage_errors.inc(stage="db_update")
+            logger.warning(f"Failed to update meetings for jobs {', '.join(job['id'] for job in jobs)}: {e}")
+        return written
+
+
+class JobStoreUnavailableError(AdmissionError):
+    """Raised when a job cannot be written to the jobs collection (JOB_STORE=mongo)."""
+
+
+class DistributedJobQueue(JobQueue):
+    """Job queue backed by the MongoDB ``jobs`` collection (JOB_STORE=mongo).
+
+    Submitting inserts job documents. Consumers in every process running the
+    queue (API processes with API_RUNS_JOBS, ``python -m app.worker``) lease
+    them through ``JobStore``, renew the lease with heartbeats that also
+    record stage and percent, and retry failed attempts with backoff, so jobs
+    survive restarts and any number of nodes can share the work.
+
+    A batch's jobs may run on different nodes: each stores its transcript and
+    counts down the batch in ``job_batches``, and whoever finishes the last
+    one summarizes the whole batch from transcript storage. Progress streams
+    (``subscribe``) follow the job document, wherever the job runs.
+    """
+
+    def __init__(self, *args, store: JobStore, poll_seconds: float, heartbeat_seconds: float, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.store = store
+        self.poll_seconds = poll_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        # Unfinished jobs per status across all nodes, refreshed every poll_seconds
+        self._counts: dict[str, int] = {}
+        self._submitted = 0
+        self._refresher: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        # Jobs whose last event has not been through the progress pump yet
+        self._unpumped: dict[str, asyncio.Future] = {}
+
+    async def start(self, consume: bool = True) -> None:
+        self._refresher = asyncio.create_task(self._refresh_counts())
+        await super().start(consume)
+
+    async def stop(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            await asyncio.gather(self._refresher, return_exceptions=True)
+            self._refresher = None
+        await super().stop()
+
+    async def _refresh_counts(self) -> None:
+        while True:
+            try:
+                self._counts = await self.store.counts()
+                self._submitted = 0
+            except Exception as e:
+                logger.debug(f"Refreshing job counts failed: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+    def pending(self) -> int:
+        return self._counts.get("queued", 0) + self._submitted
+
+    async def _enqueue(self, jobs: list[dict]) -> None:
+        try:
+            await self.store.enqueue(jobs)
+        except PyMongoError as e:
+            raise JobStoreUnavailableError(f"Job store unavailable: {e}", self.retry_after())
+        self._submitted += len(jobs)
+        for job in jobs:
+            self._remember(job)
+            self._emit(job, "queued", position=self.pending())
+        self._wakeup.set()
+        logger.info(f"Queued {len(jobs)} jobs in the job store ({self.pending()} pending)")
+
+    async def submit(self, job_id: str, file_path: str, filename: str, **fields) -> dict:
+        job = self._new_job(job_id, file_path, filename, **fields)
+        self.check_room(1)
+        await self._enqueue([job])
+        return job
+
+    async def submit_batch(self, items: list[dict]) -> list[dict]:
+        if not self._started:
+            raise RuntimeError("Job queue is not running")
+        self.check_room(len(items))
+        batch_id = "batch_" + uuid.uuid4().hex[:12]
+        jobs = [self._new_job(**item, batch_id=batch_id) for item in items]
+        try:
+            await self.store.create_batch(batch_id, [job["id"] for job in jobs])
+        except PyMongoError as e:
+            raise JobStoreUnavailableError(f"Job store unavailable: {e}", self.retry_after())
+        await self._enqueue(jobs)
+        return jobs
+
+    async def find(self, job_id: str) -> Optional[dict]:
+        try:
+            return await self.store.get(job_id) or self._jobs.get(job_id)
+        except PyMongoError:
+            return self._jobs.get(job_id)
+
+    async def batch(self, batch_id: str) -> list[dict]:
+        return await self.store.batch(batch_id)
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[dict]:
+        """Progress events derived from changes of the job document, polled every poll_seconds."""
+        last: dict = {}
+        while True:
+            try:
+                job = await self.store.get(job_id)
+            except PyMongoError as e:
+                logger.debug(f"Polling job {job_id} failed: {e}")
+                job = last or None
+            if job is None:
+                return
+            for event in _job_changes(last, job):
+                yield {"job_id": job_id, "time": time.time(), **event}
+            if job["status"] in FINAL_STATUSES:
+                return
+            last = job
+            await asyncio.sleep(self.poll_seconds)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update(store="mongo", owner=self.owner, store_jobs=dict(self._counts))
+        return stats
+
+    async def _consume(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                job = await self.store.lease(self.owner)
+            except Exception as e:
+                logger.warning(f"Leasing a job failed: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._remember(job)
+            if job["attempts"] > self.store.max_attempts:
+                # Every worker that leased it stopped heartbeating (crashed or was killed)
+                await self._fail([job], job["error"] or f"Worker lost {self.store.max_attempts} times")
+                remove_upload(job["file_path"])
+                if job["batch_id"] is not None:
+                    await self._batch_item_done(job, None)
+                continue
+            heartbeat = asyncio.create_task(self._heartbeat(job))
+            try:
+                await self._run(job)
+            finally:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+
+    async def _heartbeat(self, job: dict) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                if not await self.store.heartbeat(job, self.owner):
+                    logger.warning(f"Lost the lease on job {job['id']}; another worker may run it again")
+                    return
+            except Exception as e:
+                logger.warning(f"Heartbeat of job {job['id']} failed: {e}")
+
+    async def _retry(self, job: dict, error: str) -> bool:
+        try:
+            available_at = await self.store.retry(job, self.owner, error)
+        except LeaseLostError:
+            # Another worker took the job over (and needs its upload); its attempt decides the outcome
+            logger.warning(f"Lost the lease on failed job {job['id']}; leaving it to its new owner")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not schedule a retry of job {job['id']}: {e}")
+            return False
+        if available_at is None:
+            return False
+        job["status"] = "queued"
+        job["error"] = error
+        self._emit(job, "retry", attempt=job["attempts"], error=error, available_at=available_at.isoformat())
+        logger.info(f"Job {job['id']} will be retried at {available_at:%H:%M:%S} (attempt {job['attempts']} failed)")
+        return True
+
+    async def _abandon(self, job: dict) -> None:
+        # The upload stays for whichever worker takes the job next
+        try:
+            await self.store.release(job, self.owner)
+        except Exception as e:
+            logger.warning(f"Could not release job {job['id']}; it is retried when its lease expires: {e}")
+
+    async def _complete(self, jobs: list[dict], results: list[dict]) -> None:
+        await super()._complete(jobs, results)
+        # Errors of earlier, retried attempts no longer apply
+        await self._store_status(jobs, "done", error=None)
+
+    async def _fail(self, jobs: list[dict], error: str) -> None:
+        await super()._fail(jobs, error)
+        await self._store_status(jobs, "failed", error=error)
+
+    def _finish(self, job: dict) -> None:
+        self._unpumped[job["id"]] = asyncio.get_running_loop().create_future()
+        super()._finish(job)
+
+    def _on_progress(self, event: dict) -> None:
+        super()._on_progress(event)
+        if event["type"] in TERMINAL_EVENTS:
+            waiter = self._unpumped.pop(event["job_id"], None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
+
+    async def _store_status(self, jobs: list[dict], status: str, **fields) -> None:
+        # Stage timings arrive through the progress pump; let it catch up with the jobs' last events
+        waiters = [self._unpumped[job["id"]] for job in jobs if job["id"] in self._unpumped]
+        if waiters:
+            await asyncio.wait(waiters, timeout=5)
+        for job in jobs:
+            self._unpumped.pop(job["id"], None)
+            try:
+                await self.store.set_status(
+                    [job["id"]], status, finishedAt=job["finishedAt"], timings=job["timings"], **fields
+                )
+            except Exception as e:
+                logger.warning(f"Failed to mark job {job['id']} {status}: {e}")
+
+    async def _batch_item_done(self, job: dict, result: Optional[dict]) -> None:
+        if result is not None:
+            try:
+                # The transcript goes to side storage now; the rest waits on the job for the batch summary
+                partial = await store_result(job["meeting_id"], result) if job["meeting_id"] else result
+                await self.store.set_status([job["id"]], "transcribed", partial=partial, timings=job["timings"])
+            except Exception as e:
+                logger.error(f"Storing the transcript of batch job {job['id']} failed: {e}", exc_info=True)
+                await self._fail([job], str(e))
+        if await self.store.batch_item_done(job["batch_id"]) > 0:
+            return
+
+        docs = [j for j in await self.store.batch(job["batch_id"]) if j["status"] == "transcribed"]
+        # Records of jobs transcribed here (or the documents, for jobs from other nodes) collect the timings
+        jobs = [self._jobs.get(doc["id"]) or doc for doc in docs]
+        for j in jobs:
+            self._remember(j)
+        results = []
+        for doc in docs:
+            partial = doc["partial"]
+            if "transcript" not in partial:
+                partial = {
+                    **partial,
+                    "transcript": await transcript_store.load_transcript(doc["meeting_id"]),
+                    "segments": await transcript_store.load_segments(doc["meeting_id"]),
+                }
+            results.append(partial)
+        if jobs:
+            try:
+                summaries = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, summarize_batch, [r["transcript"] for r in results], [j["id"] for j in jobs], self._progress
+                )
+            except Exception as e:
+                logger.error(f"Summarization of batch {job['batch_id']} failed: {e}", exc_info=True)
+                await self._fail(jobs, str(e))
+                return
+            for r, summary in zip(results, summaries):
+                r["summary"] = summary
+            # Meetings only need the summary and metadata; transcripts are already stored
+            await self._complete(jobs, [
+                {k: v for k, v in r.items() if k not in STORED_FIELDS or not j["meeting_id"]} for j, r in zip(jobs, results)
+            ])
+        logger.info(f"Batch {job['batch_id']} completed ({len(jobs)} jobs done)")
+
+
+def _job_changes(last: dict, job: dict) -> list[dict]:
+    """Progress events between two snapshots of a job document."""
+    events = []
+    status = job["status"]
+    if status != last.get("status") or job.get("attempts") != last.get("attempts"):
+        if status == "queued" and job.get("attempts"):
+            events.append({"type": "retry", "attempt": job["attempts"], "error": job["error"],
+                           "available_at": job["available_at"].isoformat()})
+        elif status == "processing":
+            events.append({"type": "processing", "attempt": job["attempts"]})
+        elif status not in FINAL_STATUSES:
+            events.append({"type": status})
+    seen = last.get("timings") or {}
+    for stage, seconds in (job.get("timings") or {}).items():
+        if stage not in seen:
+            events.append({"type": "stage", "stage": stage, "status": "done", "seconds": seconds})
+    if status == "processing" and job.get("stage") and (job["stage"], job["percent"]) != (last.get("stage"), last.get("percent")):
+        events.append({"type": "progress", "stage": job["stage"], "percent": job["percent"]})
+    if status == "done":
+        events.append({"type": "done", "meeting_id": job["meeting_id"], "timings": job.get("timings") or {}})
+    elif status == "failed":
+        events.append({"type": "failed", "error": job["error"]})
+    return events
+
+
+_queue_settings = dict(
+    workers=JOB_WORKERS,
+    concurrency=JOB_CONCURRENCY,
+    max_depth=JOB_QUEUE_DEPTH,
+    history_limit=JOB_HISTORY_LIMIT,
+)
+if JOB_STORE == "mongo":
+    job_queue: JobQueue = DistributedJobQueue(
+        **_queue_settings, store=JobStore(), poll_seconds=JOB_POLL_SECONDS, heartbeat_seconds=JOB_HEARTBEAT_SECONDS
+    )
+else:
+    job_queue = JobQueue(**_queue_settings)
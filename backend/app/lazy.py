@@ -0,0 +1,37 @@
+"""Deferred imports of the optional ML dependencies.
+
+torch, whisper, transformers and pyannote take seconds to import. Modules
+check whether they are installed with ``installed`` (no import) and call
+``optional_import`` when a model is first loaded, so the API process starts
+without them and only pipeline workers pay for the imports.
+"""
+from __future__ import annotations
+import importlib
+import importlib.util
+import logging
+import time
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def installed(module: str) -> bool:
+    """Whether ``module`` can be found, without importing it."""
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+@lru_cache(maxsize=None)
+def optional_import(module: str):
+    """Import ``module`` on first use; None (logged once) when it is missing or fails to import."""
+    started = time.perf_counter()
+    try:
+        imported = importlib.import_module(module)
+    except Exception as e:
+        logger.warning(f"{module} not available: {e}")
+        return None
+    logger.info(f"Imported {module} in {time.perf_counter() - started:.2f}s")
+    return imported
@@ -0,0 +1,173 @@
+"""Durable pipeline jobs in MongoDB, leased by any number of worker processes or nodes.
+
+A worker takes a job with one atomic ``find_one_and_update`` that moves it
+from ``queued`` to ``processing`` under its name until ``lease_expires``,
+and keeps extending the lease with heartbeats while the pipeline runs. A
+job whose worker died is leased again once its lease has expired. Failed
+attempts are retried with exponential backoff until JOB_MAX_ATTEMPTS.
+"""
+from __future__ import annotations
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import List, Optional
+from pymongo import ReturnDocument
+from .db import get_db
+from .config import JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOB_RETRY_BACKOFF_SECONDS, JOB_RETRY_BACKOFF_MAX_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Statuses of jobs no worker will touch again
+FINAL_STATUSES = ("done", "failed")
+
+
+def backoff_seconds(attempt: int, base: float = JOB_RETRY_BACKOFF_SECONDS, cap: float = JOB_RETRY_BACKOFF_MAX_SECONDS) -> float:
+    """Delay before retrying after the ``attempt``-th failure: doubling, capped, with jitter."""
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class LeaseLostError(Exception):
+    """Raised when a worker updates a job whose lease another worker has taken over."""
+
+
+def to_job(doc: Optional[dict]) -> Optional[dict]:
+    """A job document in the shape of the in-memory job records (``id`` instead of ``_id``)."""
+    if doc is None:
+        return None
+    job = {k: v for k, v in doc.items() if k != "_id"}
+    job["id"] = doc["_id"]
+    return job
+
+
+class JobStore:
+    """The ``jobs`` and ``job_batches`` collections."""
+
+    jobs = "jobs"
+    batches = "job_batches"
+
+    def __init__(self, lease_seconds: float = JOB_LEASE_SECONDS, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    async def enqueue(self, jobs: List[dict]) -> None:
+        now = datetime.utcnow()
+        docs = [
+            {
+                "_id": job["id"],
+                **{k: v for k, v in job.items() if k != "id"},
+                "attempts": 0,
+                "available_at": now,
+                "lease_owner": None,
+                "lease_expires": None,
+            }
+            for job in jobs
+        ]
+        db = await get_db()
+        await db[self.jobs].insert_many(docs, ordered=True)
+
+    async def create_batch(self, batch_id: str, job_ids: List[str]) -> None:
+        db = await get_db()
+        await db[self.batches].insert_one(
+            {"_id": batch_id, "jobs": job_ids, "pending": len(job_ids), "createdAt": datetime.utcnow()}
+        )
+
+    async def lease(self, owner: str) -> Optional[dict]:
+        """Take the oldest job that is due, or whose previous worker's lease expired."""
+        now = datetime.utcnow()
+        db = await get_db()
+        doc = await db[self.jobs].find_one_and_update(
+            {"$or": [
+                {"status": "queued", "available_at": {"$lte": now}},
+                {"status": "processing", "lease_expires": {"$lt": now}},
+            ]},
+            {
+                "$set": {
+                    "status": "processing",
+                    "lease_owner": owner,
+                    "lease_expires": now + timedelta(seconds=self.lease_seconds),
+                    "heartbeat_at": now,
+                    "startedAt": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("available_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return to_job(doc)
+
+    async def heartbeat(self, job: dict, owner: str) -> bool:
+        """Extend a lease and record the job's progress; False when the lease was lost."""
+        now = datetime.utcnow()
+        db = await get_db()
+        result = await db[self.jobs].update_one(
+            {"_id": job["id"], "lease_owner": owner, "status": "processing"},
+            {"$set": {
+                "lease_expires": now + timedelta(seconds=self.lease_seconds),
+                "heartbeat_at": now,
+                "stage": job["stage"],
+                "percent": job["percent"],
+                "timings": job["timings"],
+            }},
+        )
+        return result.matched_count == 1
+
+    async def release(self, job: dict, owner: str) -> None:
+        """Hand a job back without counting the attempt (worker shutting down)."""
+        db = await get_db()
+        await db[self.jobs].update_one(
+            {"_id": job["id"], "lease_owner": owner, "status": "processing"},
+            {"$set": {"status": "queued", "available_at": datetime.utcnow(), "lease_owner": None, "lease_expires": None},
+             "$inc": {"attempts": -1}},
+        )
+
+    async def retry(self, job: dict, owner: str, error: str) -> Optional[datetime]:
+        """Queue a failed attempt again after a backoff; None when it was the last attempt.
+
+        Raises LeaseLostError when ``owner`` no longer holds the lease: the job
+        is another worker's now, and this attempt must not reschedule it.
+        """
+        if job["attempts"] >= self.max_attempts:
+            return None
+        available_at = datetime.utcnow() + timedelta(seconds=backoff_seconds(job["attempts"]))
+        db = await get_db()
+        result = await db[self.jobs].update_one(
+            {"_id": job["id"], "lease_owner": owner, "status": "processing"},
+            {"$set": {"status": "queued", "available_at": available_at, "error": error,
+                      "lease_owner": None, "lease_expires": None, "stage": None, "percent": 0.0}},
+        )
+        if result.matched_count != 1:
+            raise LeaseLostError(f"Job {job['id']} is no longer leased by {owner}")
+        return available_at
+
+    async def set_status(self, job_ids: List[str], status: str, **fields) -> None:
+        db = await get_db()
+        await db[self.jobs].update_many(
+            {"_id": {"$in": job_ids}},
+            {"$set": {"status": status, "lease_owner": None, "lease_expires": None, **fields}},
+        )
+
+    async def batch_item_done(self, batch_id: str) -> int:
+        """Count one finished job of a batch; returns how many are still pending."""
+        db = await get_db()
+        batch = await db[self.batches].find_one_and_update(
+            {"_id": batch_id}, {"$inc": {"pending": -1}}, return_document=ReturnDocument.AFTER
+        )
+        return batch["pending"] if batch else 0
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        db = await get_db()
+        return to_job(await db[self.jobs].find_one({"_id": job_id}))
+
+    async def batch(self, batch_id: str) -> List[dict]:
+        db = await get_db()
+        return [to_job(doc) async for doc in db[self.jobs].find({"batch_id": batch_id}).sort("enqueuedAt", 1)]
+
+    async def counts(self) -> dict:
+        """Jobs per status, leaving out finished ones."""
+        db = await get_db()
+        pipeline = [
+            {"$match": {"status": {"$nin": list(FINAL_STATUSES)}}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+        ]
+        return {row["_id"]: row["count"] async for row in db[self.jobs].aggregate(pipeline)}
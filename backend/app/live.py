@@ -0,0 +1,162 @@
+"""Incremental transcription and summarization of live meeting audio."""
+from __future__ import annotations
+import logging
+import os
+import threading
+import uuid
+from typing import List, Optional
+import numpy as np
+from .ai import transcribe, diarize_transcript, summarize, summarize_chunk
+from .audio import SAMPLE_RATE
+from .diarization import diarize_audio
+from .segments import Transcript
+from .config import (
+    UPLOAD_DIR,
+    USE_STUB,
+    LIVE_STEP_SECONDS,
+    LIVE_WINDOW_SECONDS,
+    LIVE_STABLE_SECONDS,
+    LIVE_SUMMARY_CHARS,
+)
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"s16le": np.int16, "f32le": np.float32}
+
+
+class LiveSession:
+    """Sliding-window transcription over audio that is still being recorded.
+
+    Incoming 16 kHz mono PCM is appended to a float32 file in UPLOAD_DIR.
+    Every ``LIVE_STEP_SECONDS`` the audio after the last committed segment is
+    transcribed; segments ending more than ``LIVE_STABLE_SECONDS`` before the
+    live edge are committed, the rest are reported as partial and revisited
+    in the next window. Committed text is summarized every
+    ``LIVE_SUMMARY_CHARS`` characters, so the final summary only has to
+    reduce those partial summaries.
+    """
+
+    def __init__(self, fmt: str = "s16le", filename: Optional[str] = None, model: Optional[str] = None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported audio format '{fmt}', expected one of {', '.join(FORMATS)}")
+        self.id = uuid.uuid4().hex
+        self.dtype = FORMATS[fmt]
+        self.filename = filename or f"live-{self.id[:8]}.pcm"
+        # Transcription model size (None = WHISPER_MODEL)
+        self.model = model
+        self.path = os.path.join(UPLOAD_DIR, f"live_{self.id}.pcm")
+        self._file = open(self.path, "wb")
+        self._remainder = b""
+        # add_audio runs on the event loop while windows are read on an executor thread
+        self._lock = threading.Lock()
+        self.samples = 0
+        self.processed_samples = 0
+        self.committed = Transcript()
+        self.committed_until = 0.0
+        self.partial_summaries: List[str] = []
+        self._unsummarized: List[str] = []
+
+    @property
+    def seconds(self) -> float:
+        return self.samples / SAMPLE_RATE
+
+    def add_audio(self, data: bytes) -> None:
+        data = self._remainder + data
+        itemsize = np.dtype(self.dtype).itemsize
+        usable = len(data) - len(data) % itemsize
+        self._remainder = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype=self.dtype)
+        if self.dtype is np.int16:
+            samples = samples.astype(np.float32) / 32768.0
+        with self._lock:
+            self._file.write(samples.astype(np.float32, copy=False).tobytes())
+            self.samples += len(samples)
+
+    def due(self) -> bool:
+        return (self.samples - self.processed_samples) / SAMPLE_RATE >= LIVE_STEP_SECONDS
+
+    def _flushed_samples(self) -> int:
+        """Samples written so far, all of them flushed to the file."""
+        with self._lock:
+            self._file.flush()
+            return self.samples
+
+    def _audio(self, start: float = 0.0, samples: Optional[int] = None) -> np.ndarray:
+        """The recording from ``start`` seconds up to ``samples`` (default: everything flushed now)."""
+        if samples is None:
+            samples = self._flushed_samples()
+        if samples == 0:
+            return np.zeros(0, dtype=np.float32)
+        audio = np.memmap(self.path, dtype=np.float32, mode="r", shape=(samples,))
+        return audio[int(start * SAMPLE_RATE):]
+
+    def process_window(self, final: bool = False) -> dict:
+        """Transcribe from the last committed segment to the live edge (blocking)."""
+        # One snapshot bounds both the audio read and the live edge, however much arrives meanwhile
+        samples = self._flushed_samples()
+        self.processed_samples = samples
+        window_start = self.committed_until
+        window = self._audio(window_start, samples)
+        live_edge = samples / SAMPLE_RATE
+        if len(window) == 0:
+            return {"final": [], "partial": []}
+
+        prompt = " ".join(self.committed.texts[-3:]) or None
+        segments = transcribe(np.array(window), prompt=prompt, model=self.model)
+        segments.remap_times(lambda times: [t + window_start for t in times])
+
+        # Long windows are cut so the next one stays within Whisper's context
+        stable_before = live_edge if final else live_edge - LIVE_STABLE_SECONDS
+        if live_edge - window_start > LIVE_WINDOW_SECONDS:
+            stable_before = max(stable_before, live_edge - LIVE_WINDOW_SECONDS / 2)
+
+        committed, partial = [], []
+        for seg in segments:
+            if seg.end <= stable_before:
+                self.committed.append(seg.start, seg.end, seg.text)
+                self._unsummarized.append(seg.text)
+                self.committed_until = seg.end
+                committed.append(seg)
+            else:
+                partial.append(seg)
+        if not len(segments) and live_edge - window_start > LIVE_WINDOW_SECONDS:
+            # Nothing but silence; stop re-reading it
+            self.committed_until = stable_before
+        return {
+            "final": [_row(seg) for seg in committed],
+            "partial": [_row(seg) for seg in partial],
+        }
+
+    def maybe_summarize(self, force: bool = False) -> Optional[str]:
+        """Summarize committed text once enough has accumulated (blocking)."""
+        text = " ".join(self._unsummarized)
+        if not text or (len(text) < LIVE_SUMMARY_CHARS and not force):
+            return None
+        self._unsummarized = []
+        self.partial_summaries.append(summarize_chunk(text))
+        return self.partial_summaries[-1]
+
+    def finish(self) -> dict:
+        """Flush the tail, diarize the whole recording and reduce the partial summaries (blocking)."""
+        self.process_window(final=True)
+        self.maybe_summarize(force=True)
+        turns = None if USE_STUB else diarize_audio(self._audio())
+        tagged_transcript, speakers = diarize_transcript(self.committed, turns)
+        summary = summarize(tagged_transcript, partial_summaries=self.partial_summaries)
+        return {
+            "transcript": tagged_transcript,
+            "segments": self.committed.to_dict(),
+            "speakers": speakers,
+            "summary": summary,
+        }
+
+    def close(self) -> None:
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except OSError as e:
+            logger.warning(f"Failed to remove live audio {self.path}: {e}")
+
+
+def _row(seg) -> dict:
+    return {"start": round(seg.start, 2), "end": round(seg.end, 2), "text": seg.text}
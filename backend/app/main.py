@@ -1,14 +1,37 @@
 from __future__ import annotations
-import os
-import shutil
+import asyncio
+import base64
+import json
+import re
+import time
 from datetime import datetime
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from typing import List
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Response, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from bson import ObjectId
-from .db import get_db
-from .models import Meeting, MeetingCreate
-from .ai import transcribe, diarize_transcript, summarize
-from .config import UPLOAD_DIR, USE_STUB
+from bson.errors import InvalidId
+from pymongo.errors import OperationFailure
+from .db import get_db, ensure_indexes
+from .models import Meeting, MeetingCreate, UploadSessionCreate
+from .jobs import job_queue, new_job_id, QueueFullError
+from .executor import AdmissionError, live_executor
+from .search import search_meetings
+from .transcripts import STORED_FIELDS, store_result, transcript_store, with_transcript
+from .metrics import metrics, stage_seconds, stage_errors, bytes_processed, http_seconds, rejected_requests
+from .cache import result_cache
+from .segments import Transcript
+from .live import LiveSession
+from .asr import check_model
+from .storage import SavedUpload, save_upload, remove_upload, UploadTooLargeError, SUPPORTED_EXTENSIONS
+from .resumable import UploadSessionError, upload_sessions, session_status
+from .responses import etag_of, json_response, not_modified
+from .batch import ingest_batch
+from .config import (
+    UPLOAD_DIR, USE_STUB, PRELOAD_MODELS, MAX_UPLOAD_BYTES, BATCH_MAX_FILES, LIVE_MAX_SESSIONS, JOB_STORE, API_RUNS_JOBS,
+    SUMMARY_CACHE_SECONDS,
+)
+from .registry import registry
 import logging
 
 # Configure logging
@@ -19,12 +42,32 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Meeting AI API")
+_started = time.monotonic()
 
 @app.on_event("startup")
 async def startup_event():
     logger.info(f"Starting Meeting AI API")
     logger.info(f"USE_STUB mode: {USE_STUB}")
     logger.info(f"Upload directory: {UPLOAD_DIR}")
+    if PRELOAD_MODELS and not USE_STUB:
+        logger.info(f"Preloading models: {', '.join(PRELOAD_MODELS)}")
+    # Index builds wait for MongoDB; serving does not wait for them
+    app.state.indexes = asyncio.create_task(_create_indexes())
+    # With a shared job store, dedicated workers (python -m app.worker) may do all processing
+    await job_queue.start(consume=JOB_STORE != "mongo" or API_RUNS_JOBS)
+    logger.info(f"Ready to serve {time.monotonic() - _started:.2f}s after import")
+
+async def _create_indexes():
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Failed to create database indexes: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.indexes.cancel()
+    await job_queue.stop()
+    live_executor.shutdown()
 
 # CORS Configuration
 app.add_middleware(
@@ -50,7 +93,7 @@ async def add_cors_header(request, call_next):
     response.headers["Access-Control-Allow-Origin"] = "https://meetingsummariserr.netlify.app"
     response.headers["Access-Control-Allow-Credentials"] = "true"
     response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
-    response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, X-Requested-With"
+    response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, X-Requested-With, Content-Range, X-Chunk-SHA256"
     return response
 
 # Add OPTIONS handler for preflight requests
@@ -65,106 +108,637 @@ async def add_cors_header(request, call_next):
     response.headers["Access-Control-Allow-Origin"] = "https://meetingsummariserr.netlify.app"
     response.headers["Access-Control-Allow-Credentials"] = "true"
     response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
-    response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
+    response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, Content-Range, X-Chunk-SHA256"
     return response
 
-@app.post("/upload")
-async def upload(file: UploadFile = File(...)):
-    if not file.filename.lower().endswith((".mp3", ".wav", ".mp4")):
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template, not raw path, to keep the number of series bounded
+    route = request.scope.get("route")
+    http_seconds.observe(
+        time.perf_counter() - started,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code,
+    )
+    return response
+
+def _busy(e: AdmissionError) -> HTTPException:
+    """503 with a Retry-After estimated from the work queued ahead."""
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+def _transcription_model(model: str | None) -> str:
+    """Model size requested with ``?model=``, validated against TRANSCRIBE_MODELS."""
+    try:
+        return check_model(model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+PROCESSING_RESPONSES = {
+    202: {"description": "Recording queued; the meeting has status \"processing\" and a job_id to follow"},
+    200: {"description": "Result cache hit: the finished meeting, with \"cached\": true"},
+}
+
+@app.post("/upload", status_code=202, responses=PROCESSING_RESPONSES)
+async def upload(request: Request, response: Response, file: UploadFile = File(...), model: str | None = None):
+    if not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
         raise HTTPException(status_code=400, detail="Unsupported file format")
+    model = _transcription_model(model)
 
     logger.info(f"Received upload request for file: {file.filename}")
+    content_length = int(request.headers.get("content-length") or 0)
+    if MAX_UPLOAD_BYTES and content_length > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {MAX_UPLOAD_BYTES} byte limit")
+    try:
+        job_queue.check_room(1)
+    except QueueFullError as e:
+        raise _busy(e)
     
     try:
-        # Save temp file
-        dest_path = os.path.join(UPLOAD_DIR, file.filename)
-        logger.info(f"Saving file to: {dest_path}")
-        with open(dest_path, "wb") as out:
-            shutil.copyfileobj(file.file, out)
-        
-        file_size = os.path.getsize(dest_path)
-        logger.info(f"File saved successfully ({file_size} bytes)")
-
-        # AI pipeline
-        logger.info("Starting transcription...")
-        raw_transcript = transcribe(dest_path)
-        
-        logger.info("Starting diarization...")
-        tagged_transcript, speakers = diarize_transcript(raw_transcript)
-        
-        logger.info("Starting summarization...")
-        summary = summarize(tagged_transcript)
-
-        # Generate a temporary ID for immediate response
-        temp_id = "temp_" + str(abs(hash(file.filename + str(datetime.utcnow()))))[:12]
-        
-        # Prepare the document with temporary ID
-        doc = MeetingCreate(
-            filename=file.filename,
-            transcript=tagged_transcript,
-            speakers=speakers,
-            summary=summary,
-            temp_id=temp_id,  # Store the temp_id for later lookup
-            createdAt=datetime.utcnow(),
-            status="processing"
-        ).model_dump()
-
-        # Try to save to MongoDB
-        db = await get_db()
-        try:
-            res = await db.meetings.insert_one(doc)
-            doc["_id"] = str(res.inserted_id)  # Add string ID for response
-            doc["temp_id"] = temp_id  # Ensure temp_id is included in the response
-            logger.info(f"Successfully saved to database with ID: {doc['_id']}")
-            return doc
-        except Exception as e:
-            logger.warning(f"Failed to save to database: {e}")
-            # Return result with temp_id even if DB save fails
-            return {
-                "_id": temp_id,
-                "temp_id": temp_id,
-                "filename": file.filename,
-                "transcript": tagged_transcript,
-                "speakers": speakers,
-                "summary": summary,
-                "createdAt": datetime.utcnow().isoformat(),
-                "status": "temporary"
-            }
+        # Stream to a unique per-upload path, hashing as we go
+        with stage_seconds.time(stage="save"):
+            saved = await save_upload(file)
+        dest_path = saved.path
+        bytes_processed.inc(saved.size)
+        logger.info(f"File saved to {dest_path} ({saved.size} bytes, sha256 {saved.sha256[:12]})")
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
-        logger.error(f"Upload processing failed: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+        stage_errors.inc(stage="save")
+        logger.error(f"Saving upload failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Saving upload failed: {str(e)}")
 
-@app.get("/summary/{id}")
-async def get_summary(id: str):
+    return await _start_processing(file.filename, saved, model, response)
+
+async def _start_processing(filename: str, saved: SavedUpload, model: str, response: Response) -> dict:
+    """Create the meeting for a saved recording and queue its job (or answer from the result cache)."""
+    dest_path = saved.path
+    # Identical audio processed by the same pipeline version needs no new job
+    cached = await result_cache.get(saved.sha256, model)
+    if cached is not None:
+        logger.info(f"Result cache hit for {filename} (sha256 {saved.sha256[:12]})")
+        remove_upload(dest_path)
+
+    # Generate a temporary ID for immediate response; it doubles as the job ID
+    temp_id = new_job_id()
+
+    # Prepare the document with temporary ID; the worker fills in the results
+    doc = MeetingCreate(
+        **{"transcript": "", "speakers": [], "summary": {}, **(cached or {})},
+        filename=filename,
+        temp_id=temp_id,  # Store the temp_id for later lookup
+        file_size=saved.size,
+        sha256=saved.sha256,
+        createdAt=datetime.utcnow(),
+        status="done" if cached is not None else "processing"
+    ).model_dump()
+
+    # Try to save to MongoDB; transcripts live in side storage, the meeting keeps metadata and summary
+    db = await get_db()
+    meeting_id = None
+    stored_doc = {k: v for k, v in doc.items() if k not in STORED_FIELDS}
+    try:
+        with stage_seconds.time(stage="db_insert"):
+            oid = ObjectId()
+            if cached is not None:
+                stored_doc.update(await store_result(oid, cached))
+            await db.meetings.insert_one({"_id": oid, **stored_doc})
+        meeting_id = str(oid)
+        logger.info(f"Successfully saved to database with ID: {meeting_id}")
+    except Exception as e:
+        stage_errors.inc(stage="db_insert")
+        logger.warning(f"Failed to save to database: {e}")
+        # The job still runs; its result is served from the job record instead
+
+    if cached is not None:
+        response.status_code = 200
+        doc["_id"] = meeting_id or temp_id
+        doc["createdAt"] = doc["createdAt"].isoformat()
+        doc["cached"] = True
+        if meeting_id is None:
+            doc["status"] = "temporary"
+            # Nothing else holds the result; /summary/{temp_id} serves it from the job record
+            job_queue.record_result(temp_id, filename, cached, sha256=saved.sha256, model=model)
+        return doc
+
+    try:
+        await job_queue.submit(temp_id, dest_path, filename, meeting_id=meeting_id, sha256=saved.sha256, model=model)
+    except AdmissionError as e:
+        logger.warning(f"Rejecting upload {filename}: {e}")
+        remove_upload(dest_path, force=True)
+        if meeting_id is not None:
+            await db.meetings.update_one(
+                {"_id": ObjectId(meeting_id)}, {"$set": {"status": "failed", "error": str(e)}}
+            )
+        raise _busy(e)
+
+    doc["_id"] = meeting_id or temp_id
+    doc["temp_id"] = temp_id
+    doc["job_id"] = temp_id
+    doc["createdAt"] = doc["createdAt"].isoformat()
+    return doc
+
+@app.post("/upload/batch", status_code=202)
+async def upload_batch(files: List[UploadFile] = File(...), model: str | None = None):
+    """Several recordings in one request, processed as one batch.
+
+    Each file is transcribed by its own job on the worker pool; the batch's
+    transcripts are then summarized together and all meetings are written in
+    bulk. Follow each item's ``job_id`` or ``GET /batches/{batch_id}``.
+    """
+    if len(files) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_FILES} files per batch")
+    model = _transcription_model(model)
+    unsupported = [f.filename for f in files if not f.filename.lower().endswith(SUPPORTED_EXTENSIONS)]
+    if unsupported:
+        raise HTTPException(status_code=400, detail=f"Unsupported file format: {', '.join(unsupported)}")
+    try:
+        job_queue.check_room(1)
+    except QueueFullError as e:
+        raise _busy(e)
+
+    logger.info(f"Received batch upload of {len(files)} files")
+    saved = []
+    try:
+        for file in files:
+            with stage_seconds.time(stage="save"):
+                upload = await save_upload(file)
+            bytes_processed.inc(upload.size)
+            saved.append((file.filename, upload))
+    except Exception as e:
+        for _, upload in saved:
+            remove_upload(upload.path, force=True)
+        if isinstance(e, UploadTooLargeError):
+            raise HTTPException(status_code=413, detail=f"{file.filename}: {e}")
+        stage_errors.inc(stage="save")
+        logger.error(f"Saving batch upload failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Saving upload failed: {str(e)}")
+
+    try:
+        return await ingest_batch(saved, model)
+    except AdmissionError as e:
+        logger.warning(f"Rejecting batch of {len(saved)} files: {e}")
+        for _, upload in saved:
+            remove_upload(upload.path, force=True)
+        raise _busy(e)
+
+def _session_error(e: UploadSessionError) -> HTTPException:
+    return HTTPException(status_code=e.status, detail=str(e))
+
+@app.post("/uploads", status_code=201)
+async def create_upload_session(body: UploadSessionCreate, model: str | None = None):
+    """Start a resumable upload: ``PUT /uploads/{id}`` each chunk, then ``POST /uploads/{id}/complete``.
+
+    Chunks are ``chunk_size`` bytes at multiples of ``chunk_size`` (the last
+    one shorter), sent with ``Content-Range: bytes start-end/size`` and
+    optionally ``X-Chunk-SHA256``. ``GET /uploads/{id}`` lists the chunks
+    still missing after an interruption.
+    """
+    if not body.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Unsupported file format")
+    model = _transcription_model(model)
+    try:
+        session = await upload_sessions.create(body.filename, body.size, body.sha256, model)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadSessionError as e:
+        raise _session_error(e)
+    return session_status(session)
+
+@app.get("/uploads/{upload_id}")
+async def get_upload_session(upload_id: str):
+    try:
+        return session_status(await upload_sessions.get(upload_id))
+    except UploadSessionError as e:
+        raise _session_error(e)
+
+@app.put("/uploads/{upload_id}")
+async def put_upload_chunk(upload_id: str, request: Request):
+    """Write one chunk of a resumable upload; resending a chunk replaces it."""
+    try:
+        with stage_seconds.time(stage="save"):
+            status = await upload_sessions.write_chunk(
+                upload_id,
+                request.headers.get("content-range"),
+                request.stream(),
+                request.headers.get("x-chunk-sha256"),
+            )
+    except UploadSessionError as e:
+        raise _session_error(e)
+    bytes_processed.inc(status.pop("chunk_bytes"))
+    return status
+
+@app.post("/uploads/{upload_id}/complete", status_code=202, responses=PROCESSING_RESPONSES)
+async def complete_upload_session(upload_id: str, response: Response):
+    """Verify the whole file's SHA-256 and process it like ``/upload``."""
+    try:
+        job_queue.check_room(1)
+    except QueueFullError as e:
+        raise _busy(e)
+    try:
+        session, saved = await upload_sessions.complete(upload_id)
+    except UploadSessionError as e:
+        raise _session_error(e)
+    logger.info(f"File saved to {saved.path} ({saved.size} bytes, sha256 {saved.sha256[:12]}) by upload session {upload_id}")
+    return await _start_processing(session["filename"], saved, session["model"], response)
+
+@app.delete("/uploads/{upload_id}", status_code=204)
+async def cancel_upload_session(upload_id: str):
+    try:
+        await upload_sessions.cancel(upload_id)
+    except UploadSessionError as e:
+        raise _session_error(e)
+    return Response(status_code=204)
+
+async def _find_meeting(id: str, projection: dict | None = None) -> dict:
+    """Look up a meeting by ObjectId or temp_id, raising 404/400 like /summary."""
     db = await get_db()
     
     # First check if it's a temporary ID (starts with 'temp_')
     if id.startswith('temp_'):
         # Look for the document with this temp_id
-        doc = await db.meetings.find_one({"temp_id": id})
+        doc = await db.meetings.find_one({"temp_id": id}, projection)
+        if not doc:
+            doc = _job_document(id)
         if not doc:
             raise HTTPException(status_code=404, detail="Temporary summary not found. The summary may have expired or already been processed.")
     else:
         # Handle MongoDB ObjectId
         try:
             oid = ObjectId(id)
-            doc = await db.meetings.find_one({"_id": oid})
-            if not doc:
-                raise HTTPException(status_code=404, detail="Summary not found")
-        except Exception as e:
+        except InvalidId as e:
             logger.error(f"Error fetching summary: {str(e)}")
             raise HTTPException(status_code=400, detail="Invalid ID format")
+        doc = await db.meetings.find_one({"_id": oid}, projection)
+        if not doc:
+            raise HTTPException(status_code=404, detail="Summary not found")
     
     # Convert ObjectId to string for JSON serialization
     doc["_id"] = str(doc["_id"])
     return doc
 
+# Top-level meeting fields a client may pick with /summary?fields=
+_FIELD_NAME = re.compile(r"[A-Za-z_]\w*$")
+
+def _summary_cache_control(doc: dict) -> str:
+    # Finished results never change; anything else must be revalidated (cheap with the ETag)
+    if doc.get("status") == "done":
+        return f"private, max-age={SUMMARY_CACHE_SECONDS}, immutable"
+    return "no-cache"
+
+@app.get("/summary/{id}")
+async def get_summary(
+    request: Request,
+    id: str,
+    transcript: bool = True,
+    segments: bool = False,
+    fields: str | None = Query(None, description="Comma-separated top-level fields, e.g. summary,status (overrides transcript/segments)"),
+):
+    """Meeting metadata and summary; the transcript (and columnar segments) are loaded only when requested.
+
+    The ETag is computed from the meeting document (whose ``transcript_stored``
+    identifies the stored transcript), so revalidating a large result costs
+    one small lookup and never loads the transcript.
+    """
+    wanted = None
+    if fields is not None:
+        wanted = {name.strip() for name in fields.split(",") if name.strip()}
+        invalid = sorted(name for name in wanted if not _FIELD_NAME.match(name))
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid field names: {', '.join(invalid)}")
+        transcript, segments = "transcript" in wanted, "segments" in wanted
+        projection = {name: 1 for name in wanted | {"status", "transcript_stored"}}
+    else:
+        projection = {field: 0 for field, keep in (("transcript", transcript), ("segments", segments)) if not keep} or None
+    doc = await _find_meeting(id, projection)
+
+    etag = etag_of(doc, transcript, segments, sorted(wanted) if wanted is not None else None)
+    cache_control = _summary_cache_control(doc)
+    cached = not_modified(request, etag, cache_control)
+    if cached is not None:
+        return cached
+    doc = await with_transcript(doc, transcript, segments)
+    if wanted is not None:
+        doc = {key: value for key, value in doc.items() if key in wanted or key == "_id"}
+    return await json_response(request, doc, etag, cache_control)
+
+@app.get("/summary/{id}/transcript")
+async def get_transcript(id: str):
+    """The tagged transcript as plain text, streamed and decompressed chunk by chunk."""
+    doc = await _find_meeting(id, {"transcript": 1, "transcript_stored": 1})
+    if "transcript_stored" not in doc:
+        return PlainTextResponse(doc.get("transcript", ""))
+    return StreamingResponse(transcript_store.stream_text(doc["_id"]), media_type="text/plain; charset=utf-8")
+
+@app.get("/summary/{id}/segments")
+async def get_segments(id: str, start: float = 0.0, end: float | None = None):
+    """Timestamped segments of a meeting, optionally limited to [start, end) seconds."""
+    doc = await _find_meeting(id, {"segments": 1, "transcript_stored": 1})
+    doc = await with_transcript(doc, transcript=False, segments=True)
+    transcript = Transcript.from_dict(doc.get("segments"))
+    if start > 0 or end is not None:
+        transcript = transcript.range(start, end if end is not None else float("inf"))
+    return {"_id": doc["_id"], "segments": transcript.to_list()}
+
+# Fields needed by the history list view
+HISTORY_PROJECTION = {"filename": 1, "createdAt": 1, "status": 1}
+
+def _encode_cursor(doc: dict) -> str:
+    created = doc.get("createdAt")
+    raw = f"{created.isoformat() if created else ''}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str) -> tuple[datetime | None, ObjectId]:
+    try:
+        created, oid = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return (datetime.fromisoformat(created) if created else None), ObjectId(oid)
+    except (ValueError, InvalidId, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @app.get("/history")
-async def history():
+async def history(limit: int = Query(20, ge=1, le=100), cursor: str | None = None):
+    """Newest meetings first, paginated by keyset on (createdAt, _id)."""
     db = await get_db()
-    cursor = db.meetings.find({}, {"transcript": 0})  # omit large field for list
+    query: dict = {}
+    if cursor:
+        created, oid = _decode_cursor(cursor)
+        if created is None:
+            # Documents without createdAt sort last; continue within them by _id
+            query = {"createdAt": None, "_id": {"$lt": oid}}
+        else:
+            query = {"$or": [
+                {"createdAt": {"$lt": created}},
+                {"createdAt": created, "_id": {"$lt": oid}},
+                {"createdAt": None},
+            ]}
+
+    docs = await (
+        db.meetings.find(query, HISTORY_PROJECTION)
+        .sort([("createdAt", -1), ("_id", -1)])
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+    next_cursor = _encode_cursor(docs[limit - 1]) if len(docs) > limit else None
     items = []
-    async for d in cursor:
+    for d in docs[:limit]:
         d["_id"] = str(d["_id"])  # serialize
         items.append(d)
-    return {"items": items}
+    return {"items": items, "next_cursor": next_cursor}
+
+@app.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=1000),
+    hits: int = Query(5, ge=0, le=50),
+    speaker: str | None = None,
+):
+    """Meetings matching ``q`` (MongoDB text search syntax: words, "phrases", -excluded),
+    best first, with snippets from the summary and up to ``hits`` timestamped segment matches.
+    ``speaker`` restricts results to meetings with that speaker and hits to their turns."""
+    db = await get_db()
+    try:
+        return await search_meetings(db, q, limit, offset, hits, speaker)
+    except OperationFailure as e:
+        logger.error(f"Text search failed: {e}")
+        raise HTTPException(status_code=503, detail="Search index is not available")
+
+def _job_document(job_id: str) -> dict | None:
+    """Build a meeting-shaped response for a job whose result never reached the database."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return None
+    result = job.get("result", {})
+    return {
+        "_id": job_id,
+        "temp_id": job_id,
+        "filename": job["filename"],
+        "transcript": result.get("transcript", ""),
+        "segments": result.get("segments"),
+        "speakers": result.get("speakers", []),
+        "summary": result.get("summary", {}),
+        "createdAt": job["enqueuedAt"].isoformat(),
+        "status": "temporary" if job["status"] == "done" else job["status"],
+    }
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = await job_queue.find(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "id": job["id"],
+        "meeting_id": job["meeting_id"],
+        "filename": job["filename"],
+        "status": job["status"],
+        "error": job["error"],
+        "enqueuedAt": job["enqueuedAt"],
+        "startedAt": job["startedAt"],
+        "finishedAt": job["finishedAt"],
+        "stage": job["stage"],
+        "percent": job["percent"],
+        "timings": job["timings"],
+        "batch_id": job["batch_id"],
+        "attempts": job.get("attempts", 1 if job["startedAt"] else 0),
+    }
+
+@app.get("/batches/{batch_id}")
+async def batch_status(batch_id: str):
+    jobs = await job_queue.batch(batch_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    counts: dict[str, int] = {}
+    for job in jobs:
+        counts[job["status"]] = counts.get(job["status"], 0) + 1
+    return {
+        "id": batch_id,
+        "counts": counts,
+        "jobs": [
+            {"id": job["id"], "meeting_id": job["meeting_id"], "filename": job["filename"],
+             "status": job["status"], "stage": job["stage"], "error": job["error"]}
+            for job in jobs
+        ],
+    }
+
+# Comment line sent when a stream is idle so proxies keep the connection open
+SSE_KEEPALIVE_SECONDS = 15
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """Server-Sent Events stream of a job's stage transitions, percent done and stage times.
+
+    Earlier events are replayed first; the stream ends after the ``done`` or ``failed`` event.
+    """
+    job = await job_queue.find(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def stream():
+        events = job_queue.subscribe(job_id).__aiter__()
+        next_event = None
+        try:
+            while True:
+                if await request.is_disconnected():
+                    return
+                next_event = next_event or asyncio.ensure_future(events.__anext__())
+                done, _ = await asyncio.wait({next_event}, timeout=SSE_KEEPALIVE_SECONDS)
+                if not done:
+                    yield ": keepalive\n\n"
+                    continue
+                try:
+                    event = next_event.result()
+                except StopAsyncIteration:
+                    return
+                next_event = None
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            if next_event is not None:
+                # Cancelling the pending read also runs the generator's cleanup
+                next_event.cancel()
+                await asyncio.gather(next_event, return_exceptions=True)
+            await events.aclose()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Open /live connections, capped at LIVE_MAX_SESSIONS
+_live_connections = 0
+
+@app.websocket("/live")
+async def live(websocket: WebSocket):
+    """Live transcription.
+
+    Optionally send ``{"type": "start", "format": "s16le" | "f32le", "filename": ..., "model": ...}``
+    first, then binary frames of 16 kHz mono PCM, then ``{"type": "stop"}``.
+    The server pushes ``segments`` messages (final and partial), ``summary``
+    messages with each new rolling summary, ``busy`` (with ``retry_after``
+    seconds) when windows are skipped under load, and a ``final`` message with
+    the stored meeting. Connections beyond LIVE_MAX_SESSIONS are closed with 1013.
+    """
+    global _live_connections
+    await websocket.accept()
+    if _live_connections >= LIVE_MAX_SESSIONS:
+        rejected_requests.inc(reason="live_sessions")
+        await websocket.close(code=1013, reason="Too many live sessions, try again later")
+        return
+    _live_connections += 1
+    session: LiveSession | None = None
+    window: asyncio.Task | None = None
+    # No new windows are started before this time once the live executor has turned one away
+    busy_until = 0.0
+
+    async def run_window():
+        nonlocal busy_until
+        try:
+            result = await live_executor.run(session.process_window)
+            await websocket.send_json({"type": "segments", **result})
+            partial_summary = await live_executor.run(session.maybe_summarize)
+            if partial_summary:
+                await websocket.send_json({"type": "summary", "overview": partial_summary})
+        except AdmissionError as e:
+            # Audio keeps buffering; the next window picks it up
+            busy_until = time.monotonic() + e.retry_after
+            await websocket.send_json({"type": "busy", "retry_after": e.retry_after})
+        except Exception as e:
+            logger.error(f"Live window failed: {e}", exc_info=True)
+            await websocket.send_json({"type": "error", "detail": str(e)})
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("text"):
+                try:
+                    command = json.loads(message["text"])
+                except ValueError:
+                    await websocket.send_json({"type": "error", "detail": "Invalid JSON message"})
+                    continue
+                if command.get("type") == "start" and session is None:
+                    try:
+                        session = LiveSession(
+                            command.get("format", "s16le"), command.get("filename"), check_model(command.get("model"))
+                        )
+                    except ValueError as e:
+                        await websocket.send_json({"type": "error", "detail": str(e)})
+                        continue
+                    await websocket.send_json({"type": "started", "session_id": session.id})
+                elif command.get("type") == "stop":
+                    break
+                continue
+
+            if session is None:
+                session = LiveSession()
+                await websocket.send_json({"type": "started", "session_id": session.id})
+            session.add_audio(message.get("bytes") or b"")
+            # One window at a time; audio keeps buffering while it runs
+            if session.due() and (window is None or window.done()) and time.monotonic() >= busy_until:
+                window = asyncio.create_task(run_window())
+
+        if session is None:
+            await websocket.close()
+            return
+        if window is not None:
+            await window
+        # The recording is complete; its final pass is never turned away
+        result = await live_executor.run(session.finish, admit=False)
+        doc = MeetingCreate(**result, filename=session.filename, status="done").model_dump()
+        try:
+            db = await get_db()
+            oid = ObjectId()
+            stored_doc = {k: v for k, v in doc.items() if k not in STORED_FIELDS}
+            stored_doc.update(await store_result(oid, result))
+            await db.meetings.insert_one({"_id": oid, **stored_doc})
+            doc["_id"] = str(oid)
+        except Exception as e:
+            logger.warning(f"Failed to save live meeting to database: {e}")
+            doc["_id"] = None
+            doc["status"] = "temporary"
+        doc["createdAt"] = doc["createdAt"].isoformat()
+        await websocket.send_json({"type": "final", "meeting": doc})
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info("Live session disconnected")
+    finally:
+        _live_connections -= 1
+        if window is not None and not window.done():
+            window.cancel()
+        if session is not None:
+            session.close()
+
+@app.get("/health")
+async def health():
+    """Cheap liveness check for load balancers: touches neither MongoDB nor the models."""
+    return {
+        "status": "ok",
+        "uptime_seconds": round(time.monotonic() - _started, 1),
+        "workers_ready": job_queue.ready,
+        "stub": USE_STUB,
+    }
+
+@app.get("/stats")
+async def stats():
+    """Queue, cache and model statistics.
+
+    ``models`` is this API process's registry (live transcription and in-process
+    jobs); with worker processes (JOB_WORKERS > 0) their registries are under
+    ``worker_models`` by pid, as reported after warm-up and after each job.
+    """
+    return {
+        "models": registry.stats(),
+        "worker_models": job_queue.model_stats(),
+        "jobs": job_queue.stats(),
+        "live": {"connections": _live_connections, "max_sessions": LIVE_MAX_SESSIONS, **live_executor.stats()},
+        "cache": result_cache.stats(),
+    }
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus scrape endpoint: stage latencies, queue wait, model loads, bytes and errors."""
+    job_queue.update_metrics()
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,235 @@
+"""Prometheus-format metrics for the API and the pipeline.
+
+Pipeline stages run in worker processes, so their timings reach this module as
+progress events (see ``observe_event``); everything else is recorded directly.
+"""
+from __future__ import annotations
+import cProfile
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans quick DB writes up to multi-hour recordings
+DEFAULT_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [
+                f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in self._values.items()
+            ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Per label set: bucket counts (non-cumulative), sum, count
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.setdefault(key, [[0] * len(self.buckets), 0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    le = f'le="{_format_value(float(bound))}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+stage_seconds = metrics.histogram(
+    "meetingai_stage_seconds", "Time spent in each upload and pipeline stage", ("stage",)
+)
+stage_errors = metrics.counter(
+    "meetingai_errors_total", "Failures by stage", ("stage",)
+)
+job_seconds = metrics.histogram(
+    "meetingai_job_seconds", "Pipeline run time per job, from start to finish", ("status",)
+)
+queue_wait_seconds = metrics.histogram(
+    "meetingai_queue_wait_seconds", "Time jobs spent queued before a worker picked them up"
+)
+model_load_seconds = metrics.histogram(
+    "meetingai_model_load_seconds", "Model load time", ("model",)
+)
+bytes_processed = metrics.counter(
+    "meetingai_upload_bytes_total", "Bytes of uploaded recordings saved"
+)
+audio_seconds = metrics.counter(
+    "meetingai_audio_seconds_total", "Seconds of decoded audio processed"
+)
+http_seconds = metrics.histogram(
+    "meetingai_http_request_seconds", "HTTP request latency", ("method", "route", "status")
+)
+queue_depth = metrics.gauge("meetingai_queue_depth", "Jobs waiting for a worker")
+jobs_running = metrics.gauge("meetingai_jobs_running", "Jobs currently being processed")
+rejected_requests = metrics.counter(
+    "meetingai_rejected_total", "Work turned away because a queue or executor was full", ("reason",)
+)
+inference_in_flight = metrics.gauge(
+    "meetingai_inference_in_flight", "Blocking inference calls running or waiting per executor", ("executor",)
+)
+
+
+def observe_event(event: dict) -> None:
+    """Record metrics carried by a progress event (see progress.ProgressReporter)."""
+    kind = event["type"]
+    if kind == "stage" and "seconds" in event:
+        stage_seconds.observe(event["seconds"], stage=event["stage"])
+        if event["status"] == "failed":
+            stage_errors.inc(stage=event["stage"])
+        if "audio_seconds" in event:
+            audio_seconds.inc(event["audio_seconds"])
+    elif kind == "processing":
+        queue_wait_seconds.observe(event["queue_wait"])
+    elif kind in ("done", "failed"):
+        job_seconds.observe(event["seconds"], status=kind)
+        if kind == "failed":
+            stage_errors.inc(stage="job")
+    elif kind == "model_load":
+        model_load_seconds.observe(event["seconds"], model=event["model"])
+
+
+@contextmanager
+def profiled(path: Optional[str]) -> Iterator[None]:
+    """Profile the current thread with cProfile and dump stats to ``path`` (no-op when None).
+
+    From Python 3.12 cProfile is built on sys.monitoring, which allows one
+    profiler per process (and it then sees every thread). When another one is
+    already active, e.g. the whole run's while a stage thread starts, or a
+    concurrently sampled job's, this profile is skipped instead of failing.
+    """
+    if path is None:
+        yield
+        return
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError as e:
+        logger.info(f"Not profiling {path}: {e}")
+        yield
+        return
+    try:
+        yield
+    finally:
+        profile.disable()
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            profile.dump_stats(path)
+            logger.info(f"Profile written to {path}")
+        except OSError as e:
+            logger.warning(f"Failed to write profile {path}: {e}")
@@ -18,9 +18,11 @@ class Meeting(BaseModel):
     id: Optional[PyObjectId] = Field(default=None, alias="_id")
     filename: str
     transcript: str
+    segments: Optional[dict] = None
     speakers: List[str] = []
     summary: dict
     createdAt: datetime = Field(default_factory=datetime.utcnow)
+    status: str = "done"
 
     class Config:
         arbitrary_types_allowed = True
@@ -30,8 +32,23 @@ class Meeting(BaseModel):
 class MeetingCreate(BaseModel):
     filename: str
     transcript: str
+    # Columnar segments (see segments.Transcript.to_dict): start, end, speaker, speakers, text
+    segments: Optional[dict] = None
     speakers: List[str] = []
     summary: dict
+    temp_id: Optional[str] = None
+    file_size: Optional[int] = None
+    sha256: Optional[str] = None
+    createdAt: datetime = Field(default_factory=datetime.utcnow)
+    # processing -> done / failed, updated by the job queue
+    status: str = "done"
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    # Total size of the recording in bytes
+    size: int
+    # Hex SHA-256 of the whole recording, verified when the upload is completed
+    sha256: Optional[str] = None
 
 class MeetingOut(BaseModel):
     id: str = Field(alias="_id")
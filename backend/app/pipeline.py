@@ -0,0 +1,143 @@
+from __future__ import annotations
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import List, Optional
+from .ai import transcribe, diarize_transcript, summarize, summarize_many
+from .audio import open_audio, SAMPLE_RATE
+from .diarization import diarize_audio
+from .config import USE_STUB, PRELOAD_MODELS, PROFILE_SAMPLE_RATE, PROFILE_DIR
+from .registry import registry
+from .progress import ProgressReporter
+from .metrics import profiled
+
+logger = logging.getLogger(__name__)
+
+
+def report_model_loads(progress_sink) -> None:
+    """Put a ``model_load`` event on ``progress_sink`` whenever this process loads a model."""
+    def on_load(name: str, seconds: float, size_mb: float) -> None:
+        progress_sink.put({
+            "job_id": None, "time": time.time(), "type": "model_load",
+            "model": name, "seconds": round(seconds, 3), "size_mb": round(size_mb, 1),
+        })
+    registry.add_listener(on_load)
+
+
+# Where a worker process reports its model registry stats (set by init_worker)
+_stats_sink = None
+
+
+def report_model_stats() -> None:
+    """Put a ``model_stats`` snapshot of this worker process's registry on its progress queue.
+
+    Models live in the worker processes, so the API process's own registry
+    never sees their loads or hits; it keeps the latest snapshot of each worker.
+    """
+    if _stats_sink is not None:
+        _stats_sink.put({
+            "job_id": None, "time": time.time(), "type": "model_stats",
+            "worker": os.getpid(), "stats": registry.stats(),
+        })
+
+
+def init_worker(progress_sink=None) -> None:
+    """Process-pool initializer: load configured models before the first job arrives."""
+    global _stats_sink
+    if progress_sink is not None:
+        report_model_loads(progress_sink)
+        _stats_sink = progress_sink
+    if PRELOAD_MODELS and not USE_STUB:
+        registry.preload(PRELOAD_MODELS)
+    report_model_stats()
+
+
+def warmup() -> bool:
+    """No-op task used to force worker processes (and their initializer) to start."""
+    return True
+
+
+def run_pipeline(
+    file_path: str,
+    job_id: Optional[str] = None,
+    progress_sink=None,
+    with_summary: bool = True,
+    model: Optional[str] = None,
+) -> dict:
+    """Run transcription, diarization and summarization for one recording.
+
+    The audio is decoded once into a memory-mapped buffer; Whisper and the diarization backend then run
+    concurrently on it, so wall-clock time is close to the slower of the two. Stage transitions,
+    percent done and stage times are put on ``progress_sink`` (see progress.ProgressReporter).
+    A ``PROFILE_SAMPLE_RATE`` fraction of runs is profiled with cProfile into ``PROFILE_DIR``.
+    Without ``with_summary`` the result has no ``summary``; batches summarize with ``summarize_batch``.
+    ``model`` picks the transcription model size (default WHISPER_MODEL).
+    """
+    progress = ProgressReporter(job_id, progress_sink)
+    profile_name = None
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        profile_name = os.path.join(PROFILE_DIR, f"{job_id or os.path.basename(file_path)}-{int(time.time())}")
+    try:
+        with profiled(profile_name and f"{profile_name}.prof"):
+            return _run_stages(file_path, progress, profile_name, with_summary, model)
+    finally:
+        report_model_stats()
+
+
+def summarize_batch(transcripts: List[str], job_ids: List[Optional[str]], progress_sink=None) -> List[dict]:
+    """Summarization stage for the transcripts of several jobs, sharing summarizer batches."""
+    reporters = [ProgressReporter(job_id, progress_sink) for job_id in job_ids]
+    with ExitStack() as stack:
+        for reporter in reporters:
+            stack.enter_context(reporter.stage("summarization"))
+        logger.info(f"Starting batch summarization of {len(transcripts)} transcripts...")
+        try:
+            return summarize_many(transcripts, progress=reporters)
+        finally:
+            report_model_stats()
+
+
+def _run_stages(
+    file_path: str, progress: ProgressReporter, profile_name: Optional[str], with_summary: bool, model: Optional[str]
+) -> dict:
+    if USE_STUB:
+        with progress.stage("transcription"):
+            segments, turns = transcribe(file_path, model=model), None
+    else:
+        with ExitStack() as stack:
+            with progress.stage("decode") as info:
+                audio = stack.enter_context(open_audio(file_path))
+                info["audio_seconds"] = round(len(audio) / SAMPLE_RATE, 2)
+            # Both stages read the same memory-mapped waveform; nothing is decoded twice
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=2, thread_name_prefix="stage"))
+            logger.info("Starting transcription and diarization...")
+            transcription = executor.submit(
+                _run_stage, progress, profile_name, "transcription", transcribe, audio, progress=progress, model=model
+            )
+            diarization = executor.submit(_run_stage, progress, profile_name, "diarization", diarize_audio, audio)
+            segments = transcription.result()
+            turns = diarization.result()
+
+    logger.info("Aligning speakers...")
+    with progress.stage("alignment"):
+        tagged_transcript, speakers = diarize_transcript(segments, turns)
+
+    result = {
+        "transcript": tagged_transcript,
+        "segments": segments.to_dict(),
+        "speakers": speakers,
+    }
+    if with_summary:
+        logger.info("Starting summarization...")
+        with progress.stage("summarization"):
+            result["summary"] = summarize(tagged_transcript, progress=progress)
+    return result
+
+
+def _run_stage(progress: ProgressReporter, profile_name: Optional[str], name: str, fn, *args, **kwargs):
+    # Before Python 3.12 cProfile only sees its own thread, so concurrent stages get their own profile
+    with profiled(profile_name and f"{profile_name}-{name}.prof"), progress.stage(name):
+        return fn(*args, **kwargs)
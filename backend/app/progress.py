@@ -0,0 +1,133 @@
+"""Per-job progress events, reported by pipeline stages and streamed to clients."""
+from __future__ import annotations
+import asyncio
+import logging
+import queue
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+from .config import JOB_HISTORY_LIMIT
+
+logger = logging.getLogger(__name__)
+
+# Events after which nothing more is published for a job
+TERMINAL_EVENTS = ("done", "failed")
+
+
+class ProgressReporter:
+    """Emits progress events for one job from wherever the pipeline runs.
+
+    ``sink`` is anything with a ``put`` method: a ``queue.Queue`` when the
+    pipeline runs on threads, or a multiprocessing manager queue proxy when it
+    runs in a worker process. Without a sink the reporter only keeps timings.
+    Percent updates are throttled to one per ``min_interval`` seconds per stage.
+    """
+
+    def __init__(self, job_id: Optional[str] = None, sink=None, min_interval: float = 0.5):
+        self.job_id = job_id
+        self.sink = sink
+        self.min_interval = min_interval
+        self.timings: Dict[str, float] = {}
+        self._last_update: Dict[str, float] = {}
+
+    def emit(self, event: dict) -> None:
+        if self.sink is None:
+            return
+        try:
+            self.sink.put({"job_id": self.job_id, "time": time.time(), **event})
+        except Exception as e:
+            # Progress is best effort; never fail a job over it
+            logger.debug(f"Dropping progress event for job {self.job_id}: {e}")
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[dict]:
+        """Report the start and end of a pipeline stage and record how long it took.
+
+        Fields put into the yielded dict are added to the stage's ``done`` event.
+        """
+        self.emit({"type": "stage", "stage": name, "status": "started"})
+        started = time.perf_counter()
+        info: dict = {}
+        try:
+            yield info
+        except Exception as e:
+            self.timings[name] = round(time.perf_counter() - started, 3)
+            self.emit({"type": "stage", "stage": name, "status": "failed", "seconds": self.timings[name], "error": str(e)})
+            raise
+        self.timings[name] = round(time.perf_counter() - started, 3)
+        self.emit({"type": "stage", "stage": name, "status": "done", "seconds": self.timings[name], **info})
+
+    def update(self, stage: str, done: float, total: float, **extra) -> None:
+        """Report ``done`` out of ``total`` units of work (seconds of audio, batches...) for a stage."""
+        now = time.monotonic()
+        if done < total and now - self._last_update.get(stage, 0.0) < self.min_interval:
+            return
+        self._last_update[stage] = now
+        percent = round(100.0 * done / total, 1) if total else 100.0
+        self.emit({"type": "progress", "stage": stage, "percent": percent, "done": done, "total": total, **extra})
+
+
+class ProgressHub:
+    """Keeps recent events per job and fans them out to subscribers on the event loop.
+
+    Events arrive on a thread-safe queue (see ``pump``) and are replayed to
+    late subscribers, so a client connecting mid-job still sees earlier stages.
+    """
+
+    def __init__(self, history_limit: int):
+        self.history_limit = history_limit
+        self._events: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    def publish(self, event: dict) -> None:
+        job_id = event["job_id"]
+        self._events.setdefault(job_id, []).append(event)
+        self._events.move_to_end(job_id)
+        while len(self._events) > self.history_limit:
+            self._events.popitem(last=False)
+        for subscriber in self._subscribers.get(job_id, []):
+            subscriber.put_nowait(event)
+
+    def history(self, job_id: str) -> List[dict]:
+        return list(self._events.get(job_id, []))
+
+    async def subscribe(self, job_id: str) -> AsyncIterator[dict]:
+        """Past events for ``job_id``, then live ones until the job finishes."""
+        subscriber: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(subscriber)
+        try:
+            for event in self.history(job_id):
+                yield event
+                if event["type"] in TERMINAL_EVENTS:
+                    return
+            while True:
+                event = await subscriber.get()
+                yield event
+                if event["type"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            self._subscribers[job_id].remove(subscriber)
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+    async def pump(self, source, on_event=None) -> None:
+        """Move events from a thread/process queue onto the event loop until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                event = await loop.run_in_executor(None, source.get, True, 0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError) as e:
+                # Manager process went away (shutdown)
+                logger.debug(f"Progress source closed: {e}")
+                return
+            if on_event is not None:
+                on_event(event)
+            # Events without a job (e.g. model loads at worker start) only feed on_event
+            if event.get("job_id") is not None:
+                self.publish(event)
+
+
+progress_hub = ProgressHub(history_limit=JOB_HISTORY_LIMIT)
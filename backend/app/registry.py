@@ -0,0 +1,174 @@
+from __future__ import annotations
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from .config import MODEL_MEMORY_BUDGET_MB
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size_mb(model: Any) -> float:
+    """Best-effort resident size of a torch-backed model (or HF pipeline) in MB."""
+    module = getattr(model, "model", model)
+    params = getattr(module, "parameters", None)
+    if params is None:
+        return 0.0
+    try:
+        total = sum(p.numel() * p.element_size() for p in params())
+        total += sum(b.numel() * b.element_size() for b in module.buffers())
+    except Exception:
+        return 0.0
+    return total / (1024 * 1024)
+
+
+class _Entry:
+    __slots__ = ("loader", "size_hint_mb", "model", "size_mb", "lock",
+                 "hits", "misses", "loads", "evictions", "load_seconds", "last_load_seconds")
+
+    def __init__(self, loader: Callable[[], Any], size_hint_mb: Optional[float]):
+        self.loader = loader
+        self.size_hint_mb = size_hint_mb
+        self.model: Any = None
+        self.size_mb = 0.0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+        self.last_load_seconds = 0.0
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded models with lazy loading and LRU eviction.
+
+    Each model is registered under a name together with a zero-argument loader.
+    The first ``get`` loads it, later calls return the resident instance. When
+    ``budget_mb`` is positive, least recently used models are evicted until the
+    resident total fits the budget again.
+    """
+
+    def __init__(self, budget_mb: float = 0):
+        self.budget_mb = budget_mb
+        self._entries: Dict[str, _Entry] = {}
+        self._resident: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[[str, float, float], None]] = []
+
+    def add_listener(self, listener: Callable[[str, float, float], None]) -> None:
+        """Call ``listener(name, load_seconds, size_mb)`` after every model load."""
+        self._listeners.append(listener)
+
+    def register(self, name: str, loader: Callable[[], Any], size_mb: Optional[float] = None) -> None:
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _Entry(loader, size_mb)
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._entries
+
+    def get(self, name: str) -> Any:
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"Model '{name}' is not registered")
+
+        with self._lock:
+            if entry.model is not None:
+                entry.hits += 1
+                self._resident.move_to_end(name)
+                return entry.model
+
+        # Per-model lock so concurrent first requests share a single load
+        with entry.lock:
+            with self._lock:
+                if entry.model is not None:
+                    entry.hits += 1
+                    self._resident.move_to_end(name)
+                    return entry.model
+                entry.misses += 1
+
+            logger.info(f"Loading model '{name}'...")
+            started = time.perf_counter()
+            model = entry.loader()
+            elapsed = time.perf_counter() - started
+            size_mb = entry.size_hint_mb if entry.size_hint_mb is not None else estimate_size_mb(model)
+            logger.info(f"Model '{name}' loaded in {elapsed:.2f}s ({size_mb:.0f} MB)")
+
+            with self._lock:
+                entry.model = model
+                entry.size_mb = size_mb
+                entry.loads += 1
+                entry.load_seconds += elapsed
+                entry.last_load_seconds = elapsed
+                self._resident[name] = None
+                self._resident.move_to_end(name)
+                self._enforce_budget(keep=name)
+            for listener in self._listeners:
+                try:
+                    listener(name, elapsed, size_mb)
+                except Exception as e:
+                    logger.warning(f"Model load listener failed: {e}")
+            return model
+
+    def preload(self, names) -> None:
+        for name in names:
+            if not self.is_registered(name):
+                logger.warning(f"Cannot preload unknown model '{name}'")
+                continue
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.warning(f"Preloading model '{name}' failed: {e}")
+
+    def evict(self, name: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.model is None:
+                return False
+            entry.model = None
+            entry.size_mb = 0.0
+            entry.evictions += 1
+            self._resident.pop(name, None)
+        logger.info(f"Evicted model '{name}'")
+        return True
+
+    def resident_mb(self) -> float:
+        with self._lock:
+            return sum(self._entries[n].size_mb for n in self._resident)
+
+    def _enforce_budget(self, keep: str) -> None:
+        if self.budget_mb <= 0:
+            return
+        while self.resident_mb() > self.budget_mb:
+            victim = next((n for n in self._resident if n != keep), None)
+            if victim is None:
+                logger.warning(f"Model '{keep}' alone exceeds the {self.budget_mb} MB budget")
+                return
+            self.evict(victim)
+
+    def stats(self) -> dict:
+        with self._lock:
+            models = {}
+            for name, e in self._entries.items():
+                lookups = e.hits + e.misses
+                models[name] = {
+                    "loaded": e.model is not None,
+                    "size_mb": round(e.size_mb, 1),
+                    "hits": e.hits,
+                    "misses": e.misses,
+                    "hit_rate": round(e.hits / lookups, 4) if lookups else 0.0,
+                    "loads": e.loads,
+                    "evictions": e.evictions,
+                    "load_seconds_total": round(e.load_seconds, 3),
+                    "last_load_seconds": round(e.last_load_seconds, 3),
+                }
+            return {
+                "budget_mb": self.budget_mb,
+                "resident_mb": round(sum(self._entries[n].size_mb for n in self._resident), 1),
+                "models": models,
+            }
+
+
+registry = ModelRegistry(budget_mb=MODEL_MEMORY_BUDGET_MB)
@@ -0,0 +1,134 @@
+"""JSON responses for meeting documents: orjson, compression, ETags and Cache-Control.
+
+FastAPI's default path walks a returned document with ``jsonable_encoder``
+before ``json.dumps``, which is slow for megabytes of transcript and columnar
+segments. Here documents are serialized straight to bytes (orjson when
+installed), compressed with brotli or gzip when the client accepts it and the
+body is large enough, and tagged with a strong ETag so a client holding the
+current version gets a bodiless 304.
+"""
+from __future__ import annotations
+import gzip
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Optional
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from .config import RESPONSE_COMPRESS_MIN_BYTES
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+try:
+    import brotli  # type: ignore
+except Exception:
+    brotli = None
+
+# Bodies larger than this are compressed off the event loop
+_THREADPOOL_BYTES = 256 * 1024
+# Preferred first; brotli only when the package is installed
+_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "tolist"):  # NumPy scalars and arrays
+        return value.tolist()
+    return str(value)  # ObjectId and anything else Mongo hands back
+
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON bytes of ``content``; datetimes as ISO 8601, ObjectIds as strings."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def etag_of(*parts: Any) -> str:
+    """Strong ETag (quoted) derived from the JSON of ``parts``."""
+    return '"' + hashlib.blake2b(dumps(parts), digest_size=16).hexdigest() + '"'
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """The preferred content coding the client accepts (q > 0), or None for identity."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in _ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def _matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """The tag of If-None-Match naming any encoding of ``etag`` (RFC 9110 weak comparison), or None."""
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    base = etag.strip('"')
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        untagged = tag
+        for encoding in ("br", "gzip"):
+            untagged = untagged.removesuffix(f"-{encoding}")
+        if untagged == base:
+            return f'"{tag}"'
+    return None
+
+
+def not_modified(request: Request, etag: str, cache_control: Optional[str] = None) -> Optional[Response]:
+    """A 304 response when the client's If-None-Match already names ``etag``, else None.
+
+    Check this before loading anything expensive the body would need.
+    """
+    matched = _matching_etag(request.headers.get("if-none-match"), etag)
+    if matched is None:
+        return None
+    # The client's copy is current: confirm the tag of the representation it holds
+    headers = {"ETag": matched, "Vary": "Accept-Encoding"}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=304, headers=headers)
+
+
+async def json_response(
+    request: Request, content: Any, etag: Optional[str] = None, cache_control: Optional[str] = None
+) -> Response:
+    """Serialize ``content`` and compress it for the client when it is at least RESPONSE_COMPRESS_MIN_BYTES."""
+    headers = {"Vary": "Accept-Encoding"}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    body = dumps(content)
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding and len(body) >= RESPONSE_COMPRESS_MIN_BYTES:
+        if len(body) > _THREADPOOL_BYTES:
+            body = await run_in_threadpool(compress, body, encoding)
+        else:
+            body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    else:
+        encoding = None
+    if etag:
+        # Each encoding is a different representation, so it needs its own strong tag
+        headers["ETag"] = f'{etag[:-1]}-{encoding}"' if encoding else etag
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,253 @@
+"""Resumable uploads: a session per recording, filled chunk by chunk, then handed to the job queue.
+
+The recording's file is created at its final path in UPLOAD_DIR when the
+session starts, and every chunk is written straight to its offset, so
+chunks can arrive in any order, in parallel, and be retried after a dropped
+connection. Which chunks arrived (with their SHA-256) is tracked in the
+``upload_sessions`` collection, so a client can ask what is missing and
+resume, even after a server restart.
+"""
+from __future__ import annotations
+import hashlib
+import logging
+import os
+import re
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Optional
+from fastapi.concurrency import run_in_threadpool
+from .db import get_db
+from .config import MAX_UPLOAD_BYTES, UPLOAD_CHUNK_SIZE, UPLOAD_SESSION_CHUNK_BYTES, UPLOAD_SESSION_TTL_HOURS
+from .storage import SavedUpload, UploadTooLargeError, unique_upload_path, remove_upload
+
+logger = logging.getLogger(__name__)
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)$")
+_SHA256 = re.compile(r"[0-9a-f]{64}$")
+
+
+class UploadSessionError(Exception):
+    """Invalid request against an upload session; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def chunk_count(size: int, chunk_size: int) -> int:
+    return max(1, -(-size // chunk_size))
+
+
+def session_status(session: dict) -> dict:
+    """Public view of a session: progress and the chunks still missing."""
+    total = chunk_count(session["size"], session["chunk_size"])
+    received = sorted(int(i) for i in session.get("chunks", {}))
+    last = total - 1
+    received_bytes = sum(
+        session["size"] - last * session["chunk_size"] if i == last else session["chunk_size"] for i in received
+    )
+    return {
+        "upload_id": session["_id"],
+        "filename": session["filename"],
+        "size": session["size"],
+        "chunk_size": session["chunk_size"],
+        "chunks": total,
+        "received": received,
+        "missing": sorted(set(range(total)) - set(received)),
+        "received_bytes": received_bytes,
+        "status": session["status"],
+        "expires_at": session["expires_at"].isoformat(),
+    }
+
+
+def _check_sha256(value: Optional[str], what: str) -> Optional[str]:
+    if value is None:
+        return None
+    value = value.strip().lower()
+    if not _SHA256.match(value):
+        raise UploadSessionError(f"{what} must be a hex SHA-256 digest")
+    return value
+
+
+def _allocate(path: str, size: int) -> None:
+    # Sparse on most filesystems: disk blocks are only used as chunks arrive
+    with open(path, "wb") as out:
+        out.truncate(size)
+
+
+def _write_at(fd: int, offset: int, data: bytes) -> None:
+    while data:
+        written = os.pwrite(fd, data, offset)
+        offset += written
+        data = data[written:]
+
+
+def _file_sha256(path: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class UploadSessions:
+    """Upload sessions stored in MongoDB, their data in UPLOAD_DIR."""
+
+    collection = "upload_sessions"
+
+    async def create(self, filename: str, size: int, sha256: Optional[str] = None, model: Optional[str] = None) -> dict:
+        """Start a session for a recording of ``size`` bytes; ``sha256`` is checked on completion."""
+        if size <= 0:
+            raise UploadSessionError("size must be positive")
+        if MAX_UPLOAD_BYTES and size > MAX_UPLOAD_BYTES:
+            raise UploadTooLargeError(f"File exceeds the {MAX_UPLOAD_BYTES} byte limit")
+        sha256 = _check_sha256(sha256, "sha256")
+        await self.expire()
+
+        path = unique_upload_path(filename)
+        await run_in_threadpool(_allocate, path, size)
+        now = datetime.utcnow()
+        session = {
+            "_id": uuid.uuid4().hex,
+            "filename": filename,
+            "path": path,
+            "size": size,
+            "sha256": sha256,
+            "model": model,
+            "chunk_size": UPLOAD_SESSION_CHUNK_BYTES,
+            "chunks": {},
+            "status": "uploading",
+            "createdAt": now,
+            "expires_at": now + timedelta(hours=UPLOAD_SESSION_TTL_HOURS),
+        }
+        db = await get_db()
+        try:
+            await db[self.collection].insert_one(session)
+        except BaseException:
+            remove_upload(path, force=True)
+            raise
+        logger.info(f"Upload session {session['_id']} for {filename} ({size} bytes)")
+        return session
+
+    async def get(self, upload_id: str) -> dict:
+        db = await get_db()
+        session = await db[self.collection].find_one({"_id": upload_id})
+        if session is None or session["expires_at"] < datetime.utcnow():
+            raise UploadSessionError("Upload session not found or expired", status=404)
+        return session
+
+    async def write_chunk(
+        self,
+        upload_id: str,
+        content_range: Optional[str],
+        body: AsyncIterator[bytes],
+        chunk_sha256: Optional[str] = None,
+    ) -> dict:
+        """Write one chunk (``Content-Range: bytes start-end/size``) in place and record its hash.
+
+        Ranges must cover exactly one chunk of the session's grid; sending a
+        chunk again overwrites it. With ``chunk_sha256`` a corrupted chunk is
+        rejected (422) and not recorded, so the client simply resends it.
+        """
+        session = await self.get(upload_id)
+        if session["status"] != "uploading":
+            raise UploadSessionError(f"Upload session is {session['status']}", status=409)
+        chunk_sha256 = _check_sha256(chunk_sha256, "X-Chunk-SHA256")
+        match = _CONTENT_RANGE.match((content_range or "").strip())
+        if match is None:
+            raise UploadSessionError("Content-Range header 'bytes start-end/size' required")
+        start, end, total = map(int, match.groups())
+        size, chunk_size = session["size"], session["chunk_size"]
+        index = start // chunk_size
+        expected_end = min(start + chunk_size, size) - 1
+        if total != size or start >= size or start % chunk_size or end != expected_end:
+            raise UploadSessionError(
+                f"Content-Range must cover one {chunk_size}-byte chunk of {size} bytes", status=416
+            )
+
+        # Until the new data is verified the chunk counts as missing, whatever was there before
+        db = await get_db()
+        await db[self.collection].update_one({"_id": upload_id}, {"$unset": {f"chunks.{index}": ""}})
+        digest = hashlib.sha256()
+        length = end - start + 1
+        received = 0
+        fd = os.open(session["path"], os.O_WRONLY)
+        try:
+            async for data in body:
+                if not data:
+                    continue
+                received += len(data)
+                if received > length:
+                    raise UploadSessionError(f"Chunk body is longer than the {length} bytes of its range")
+                digest.update(data)
+                await run_in_threadpool(_write_at, fd, start + received - len(data), data)
+        finally:
+            os.close(fd)
+        if received != length:
+            raise UploadSessionError(f"Chunk body has {received} bytes, its range {length}")
+        actual = digest.hexdigest()
+        if chunk_sha256 is not None and actual != chunk_sha256:
+            raise UploadSessionError(f"Chunk {index} SHA-256 mismatch", status=422)
+
+        updated = await db[self.collection].find_one_and_update(
+            {"_id": upload_id, "status": "uploading"},
+            {"$set": {f"chunks.{index}": actual}},
+            return_document=True,
+        )
+        if updated is None:
+            raise UploadSessionError("Upload session was completed or cancelled", status=409)
+        return {**session_status(updated), "chunk": index, "chunk_bytes": length, "chunk_sha256": actual}
+
+    async def complete(self, upload_id: str) -> tuple:
+        """Verify a fully received session and hand over its file.
+
+        Returns ``(session, SavedUpload)``; the session is marked complete, so
+        the file now belongs to the caller.
+        """
+        session = await self.get(upload_id)
+        if session["status"] != "uploading":
+            raise UploadSessionError(f"Upload session is {session['status']}", status=409)
+        status = session_status(session)
+        if status["missing"]:
+            raise UploadSessionError(f"{len(status['missing'])} chunks missing", status=409)
+        sha256 = await run_in_threadpool(_file_sha256, session["path"])
+        if session["sha256"] and sha256 != session["sha256"]:
+            raise UploadSessionError("File SHA-256 mismatch; resend the chunks and complete again", status=422)
+
+        db = await get_db()
+        claimed = await db[self.collection].update_one(
+            {"_id": upload_id, "status": "uploading"},
+            {"$set": {"status": "complete", "completed_sha256": sha256}},
+        )
+        if not claimed.modified_count:
+            raise UploadSessionError("Upload session was completed or cancelled", status=409)
+        logger.info(f"Upload session {upload_id} complete ({session['size']} bytes, sha256 {sha256[:12]})")
+        return session, SavedUpload(path=session["path"], size=session["size"], sha256=sha256)
+
+    async def cancel(self, upload_id: str) -> None:
+        session = await self.get(upload_id)
+        db = await get_db()
+        result = await db[self.collection].delete_one({"_id": upload_id, "status": "uploading"})
+        if not result.deleted_count:
+            raise UploadSessionError(f"Upload session is {session['status']}", status=409)
+        remove_upload(session["path"], force=True)
+
+    async def expire(self) -> int:
+        """Delete expired sessions and their partial files (run whenever a session is created)."""
+        db = await get_db()
+        expired = 0
+        query = {"expires_at": {"$lt": datetime.utcnow()}}
+        async for session in db[self.collection].find(query, {"path": 1, "status": 1}):
+            if session["status"] == "uploading":
+                remove_upload(session["path"], force=True)
+            expired += 1
+        if expired:
+            await db[self.collection].delete_many(query)
+            logger.info(f"Removed {expired} expired upload sessions")
+        return expired
+
+
+upload_sessions = UploadSessions()
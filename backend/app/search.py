@@ -0,0 +1,222 @@
+"""Full-text search over meetings using MongoDB text indexes.
+
+Summaries are searched on the meeting documents themselves. Transcripts are
+stored compressed (see transcripts.py), so their text is indexed separately
+as blocks of consecutive segments in ``segment_blocks``; a matching block
+carries its segments' times and speakers, so hits need no transcript loads.
+"""
+from __future__ import annotations
+import re
+from typing import List, Optional
+from bson import ObjectId
+from .segments import Transcript
+
+# MongoDB allows one text index per collection
+TEXT_INDEX_NAME = "meetings_summary_text"
+TEXT_INDEX_FIELDS = [
+    ("summary.overview", "text"),
+    ("summary.decisions", "text"),
+    ("summary.action_items", "text"),
+    ("filename", "text"),
+]
+TEXT_INDEX_WEIGHTS = {
+    "summary.overview": 5,
+    "summary.decisions": 4,
+    "summary.action_items": 4,
+    "filename": 3,
+}
+# Replaced indexes, dropped at startup
+LEGACY_TEXT_INDEXES = ["meetings_text"]
+
+BLOCKS_COLLECTION = "segment_blocks"
+BLOCK_INDEX_NAME = "segment_blocks_text"
+# Segments per indexed block: enough context to rank, small enough to return as hits
+BLOCK_SEGMENTS = 40
+# Best-scoring blocks kept per meeting when collecting hits
+BLOCKS_PER_MEETING = 3
+
+META_PROJECTION = {
+    "filename": 1,
+    "createdAt": 1,
+    "status": 1,
+    "summary": 1,
+}
+
+SNIPPET_CHARS = 160
+
+_TOKEN = re.compile(r'-?"[^"]+"|-?\S+')
+
+
+def query_terms(query: str) -> List[str]:
+    """Words and quoted phrases of a ``$text`` query, without negated ones."""
+    terms = []
+    for token in _TOKEN.findall(query):
+        if token.startswith("-"):
+            continue
+        term = token.strip('"').strip()
+        if term:
+            terms.append(term)
+    return terms
+
+
+def term_pattern(terms: List[str]) -> Optional[re.Pattern]:
+    """Case-insensitive pattern matching any term as a word prefix (approximating stemming)."""
+    if not terms:
+        return None
+    alternatives = sorted((re.escape(t) for t in terms), key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(alternatives) + r")\w*", re.IGNORECASE)
+
+
+def snippet(text: str, pattern: re.Pattern, width: int = SNIPPET_CHARS) -> Optional[str]:
+    """About ``width`` characters of ``text`` around its first match, or None without one."""
+    match = pattern.search(text)
+    if match is None:
+        return None
+    if len(text) <= width:
+        return text
+    start = max(0, match.start() - width // 3)
+    end = min(len(text), start + width)
+    start = max(0, end - width)
+    # Avoid cutting words at either edge
+    if start > 0:
+        start = text.find(" ", start) + 1 or start
+    if end < len(text):
+        end = text.rfind(" ", start, end) if " " in text[start:end] else end
+    return ("…" if start > 0 else "") + text[start:end].strip() + ("…" if end < len(text) else "")
+
+
+def segment_blocks(meeting_id, segments: Optional[dict]) -> List[dict]:
+    """Search documents for a meeting's segments, ``BLOCK_SEGMENTS`` at a time."""
+    transcript = Transcript.from_dict(segments)
+    blocks = []
+    for seq, first in enumerate(range(0, len(transcript), BLOCK_SEGMENTS)):
+        last = min(first + BLOCK_SEGMENTS, len(transcript))
+        speakers = [transcript.speaker(i) for i in range(first, last)]
+        blocks.append({
+            "meeting_id": ObjectId(meeting_id),
+            "seq": seq,
+            "speakers": sorted({s for s in speakers if s is not None}),
+            "segments": {
+                "start": list(transcript.starts[first:last]),
+                "end": list(transcript.ends[first:last]),
+                "speaker": speakers,
+                "text": transcript.texts[first:last],
+            },
+        })
+    return blocks
+
+
+async def index_segments(db, meeting_id, segments: Optional[dict]) -> None:
+    """Replace the search blocks of a meeting."""
+    blocks = segment_blocks(meeting_id, segments)
+    await db[BLOCKS_COLLECTION].delete_many({"meeting_id": ObjectId(meeting_id)})
+    if blocks:
+        await db[BLOCKS_COLLECTION].insert_many(blocks, ordered=False)
+
+
+async def ensure_search_indexes(db) -> None:
+    for name in LEGACY_TEXT_INDEXES:
+        if name in await db.meetings.index_information():
+            await db.meetings.drop_index(name)
+    # Maintained by MongoDB on every insert/update, so new meetings are searchable immediately
+    await db.meetings.create_index(
+        TEXT_INDEX_FIELDS, name=TEXT_INDEX_NAME, weights=TEXT_INDEX_WEIGHTS, default_language="english"
+    )
+    await db[BLOCKS_COLLECTION].create_index(
+        [("segments.text", "text")], name=BLOCK_INDEX_NAME, default_language="english"
+    )
+    await db[BLOCKS_COLLECTION].create_index([("meeting_id", 1), ("seq", 1)], name="meeting_seq")
+
+
+def summary_hits(doc: dict, pattern: re.Pattern) -> List[dict]:
+    summary = doc.get("summary") or {}
+    hits = []
+    for field in ("overview", "decisions", "action_items"):
+        value = summary.get(field)
+        for text in ([value] if isinstance(value, str) else value or []):
+            found = snippet(text, pattern)
+            if found is not None:
+                hits.append({"field": field, "snippet": found})
+    return hits
+
+
+def segment_hits(blocks: List[dict], pattern: re.Pattern, max_hits: int, speaker: Optional[str] = None) -> List[dict]:
+    """Timestamped, speaker-labelled matches from a meeting's best blocks, in time order.
+
+    ``speaker`` limits them to one speaker's turns.
+    """
+    hits = []
+    for segments in blocks:
+        for start, end, who, text in zip(segments["start"], segments["end"], segments["speaker"], segments["text"]):
+            if (speaker is None or who == speaker) and pattern.search(text):
+                hits.append({"start": start, "end": end, "speaker": who, "snippet": snippet(text, pattern)})
+    hits.sort(key=lambda hit: hit["start"])
+    return hits[:max_hits]
+
+
+async def search_meetings(
+    db, query: str, limit: int, offset: int = 0, max_hits: int = 5, speaker: Optional[str] = None
+) -> dict:
+    """Meetings matching ``query`` in their summary or transcript, best first.
+
+    Both text indexes return their best ``offset + limit`` meetings; scores of a
+    meeting found in both are added. Raises pymongo's OperationFailure when an
+    index is missing.
+    """
+    window = offset + limit
+    text = {"$text": {"$search": query}}
+    meeting_filter = {**text, **({"speakers": speaker} if speaker is not None else {})}
+    meetings = await (
+        db.meetings.find(meeting_filter, {**META_PROJECTION, "score": {"$meta": "textScore"}})
+        .sort([("score", {"$meta": "textScore"})])
+        .limit(window)
+        .to_list(length=window)
+    )
+    block_filter = {**text, **({"speakers": speaker} if speaker is not None else {})}
+    transcript_matches = await db[BLOCKS_COLLECTION].aggregate([
+        {"$match": block_filter},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+        {"$sort": {"score": -1}},
+        {"$group": {
+            "_id": "$meeting_id",
+            "score": {"$max": "$score"},
+            "matched_blocks": {"$sum": 1},
+            "blocks": {"$push": "$segments"},
+        }},
+        {"$sort": {"score": -1}},
+        {"$limit": window},
+        {"$project": {"score": 1, "matched_blocks": 1, "blocks": {"$slice": ["$blocks", BLOCKS_PER_MEETING]}}},
+    ]).to_list(length=window)
+
+    docs = {doc["_id"]: doc for doc in meetings}
+    matches = {m["_id"]: m for m in transcript_matches}
+    missing = [meeting_id for meeting_id in matches if meeting_id not in docs]
+    if missing:
+        async for doc in db.meetings.find({"_id": {"$in": missing}}, META_PROJECTION):
+            docs[doc["_id"]] = doc
+
+    def score(meeting_id) -> float:
+        return docs.get(meeting_id, {}).get("score", 0.0) + matches.get(meeting_id, {}).get("score", 0.0)
+
+    ranked = sorted(docs, key=score, reverse=True)
+    pattern = term_pattern(query_terms(query))
+    items = []
+    for meeting_id in ranked[offset:offset + limit]:
+        doc = docs[meeting_id]
+        match = matches.get(meeting_id, {})
+        item = {
+            "_id": str(meeting_id),
+            "filename": doc.get("filename"),
+            "createdAt": doc.get("createdAt"),
+            "status": doc.get("status", "done"),
+            "score": round(score(meeting_id), 4),
+            "matched_blocks": match.get("matched_blocks", 0),
+        }
+        if pattern is not None:
+            item["hits"] = {
+                "summary": summary_hits(doc, pattern),
+                "segments": segment_hits(match.get("blocks", []), pattern, max_hits, speaker),
+            }
+        items.append(item)
+    more = len(meetings) == window or len(transcript_matches) == window
+    return {"query": query, "items": items, "next_offset": window if more else None}
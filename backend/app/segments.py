@@ -0,0 +1,171 @@
+"""Compact, timestamped transcript segments."""
+from __future__ import annotations
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, List, Optional
+
+
+class Segment:
+    __slots__ = ("start", "end", "speaker", "text")
+
+    def __init__(self, start: float, end: float, text: str, speaker: Optional[str] = None):
+        self.start = start
+        self.end = end
+        self.text = text
+        self.speaker = speaker
+
+    def __repr__(self) -> str:
+        return f"Segment({self.start:.2f}-{self.end:.2f}, {self.speaker!r}, {self.text[:30]!r})"
+
+
+class Transcript:
+    """Ordered transcript segments stored column-wise.
+
+    Start/end times live in float arrays and speakers as small integer codes,
+    so a multi-hour meeting costs a few bytes per segment plus its text instead
+    of one dict per segment. Segments must be appended in time order, which
+    lets ``range`` use binary search.
+    """
+
+    __slots__ = ("starts", "ends", "speaker_codes", "texts", "speaker_names")
+
+    NO_SPEAKER = 0xFFFF
+
+    def __init__(self):
+        self.starts = array("d")
+        self.ends = array("d")
+        self.speaker_codes = array("H")
+        self.texts: List[str] = []
+        self.speaker_names: List[str] = []
+
+    # Construction
+
+    def append(self, start: float, end: float, text: str, speaker: Optional[str] = None) -> None:
+        self.starts.append(start)
+        self.ends.append(end)
+        self.texts.append(text.strip())
+        self.speaker_codes.append(self._speaker_code(speaker))
+
+    def _speaker_code(self, speaker: Optional[str]) -> int:
+        if speaker is None:
+            return self.NO_SPEAKER
+        try:
+            return self.speaker_names.index(speaker)
+        except ValueError:
+            self.speaker_names.append(speaker)
+            return len(self.speaker_names) - 1
+
+    @classmethod
+    def from_whisper(cls, result: dict) -> "Transcript":
+        transcript = cls()
+        for seg in result.get("segments") or []:
+            if seg.get("text", "").strip():
+                transcript.append(float(seg["start"]), float(seg["end"]), seg["text"])
+        if not transcript and result.get("text", "").strip():
+            transcript.append(0.0, 0.0, result["text"])
+        return transcript
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Segment]) -> "Transcript":
+        transcript = cls()
+        for seg in segments:
+            transcript.append(seg.start, seg.end, seg.text, seg.speaker)
+        return transcript
+
+    def extend(self, other: "Transcript") -> None:
+        """Append all segments of ``other``, which must start after this transcript ends."""
+        for seg in other:
+            self.append(seg.start, seg.end, seg.text, seg.speaker)
+
+    def remap_times(self, mapper) -> None:
+        """Replace all timestamps with ``mapper(times)`` (e.g. back to the original timeline)."""
+        self.starts = array("d", mapper(self.starts))
+        self.ends = array("d", mapper(self.ends))
+
+    # Access
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __iter__(self) -> Iterator[Segment]:
+        for i in range(len(self.texts)):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> Segment:
+        return Segment(self.starts[i], self.ends[i], self.texts[i], self.speaker(i))
+
+    def speaker(self, i: int) -> Optional[str]:
+        code = self.speaker_codes[i]
+        return None if code == self.NO_SPEAKER else self.speaker_names[code]
+
+    def set_speaker(self, i: int, speaker: Optional[str]) -> None:
+        self.speaker_codes[i] = self._speaker_code(speaker)
+
+    @property
+    def speakers(self) -> List[str]:
+        """Speakers in order of first appearance."""
+        used = set(self.speaker_codes)
+        return [name for code, name in enumerate(self.speaker_names) if code in used]
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.texts)
+
+    @property
+    def duration(self) -> float:
+        return self.ends[-1] if self.texts else 0.0
+
+    def tagged(self) -> str:
+        """``Speaker N: ...`` lines, merging consecutive segments of the same speaker."""
+        # Texts are grouped per turn and joined once; appending to the line string
+        # would copy it again for every segment of a long monologue
+        turns = []
+        last_code = None
+        for code, text in zip(self.speaker_codes, self.texts):
+            if turns and code == last_code:
+                turns[-1].append(text)
+            else:
+                label = "Unknown" if code == self.NO_SPEAKER else self.speaker_names[code]
+                turns.append([f"{label}:", text])
+            last_code = code
+        return "\n".join(" ".join(parts) for parts in turns)
+
+    def range(self, start: float, end: float) -> "Transcript":
+        """Segments overlapping ``[start, end)`` seconds."""
+        lo = bisect_right(self.ends, start)
+        hi = bisect_left(self.starts, end)
+        part = Transcript()
+        for i in range(lo, max(lo, hi)):
+            part.append(self.starts[i], self.ends[i], self.texts[i], self.speaker(i))
+        return part
+
+    # Storage
+
+    def to_dict(self) -> dict:
+        """Columnar form stored on the meeting document."""
+        return {
+            "start": [round(t, 2) for t in self.starts],
+            "end": [round(t, 2) for t in self.ends],
+            "speaker": [-1 if c == self.NO_SPEAKER else c for c in self.speaker_codes],
+            "speakers": list(self.speaker_names),
+            "text": list(self.texts),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "Transcript":
+        transcript = cls()
+        if not data:
+            return transcript
+        transcript.starts = array("d", data.get("start", []))
+        transcript.ends = array("d", data.get("end", []))
+        transcript.speaker_codes = array("H", (cls.NO_SPEAKER if c < 0 else c for c in data.get("speaker", [])))
+        transcript.speaker_names = list(data.get("speakers", []))
+        transcript.texts = list(data.get("text", []))
+        return transcript
+
+    def to_list(self) -> List[dict]:
+        """Row form for API responses."""
+        return [
+            {"start": seg.start, "end": seg.end, "speaker": seg.speaker, "text": seg.text}
+            for seg in self
+        ]
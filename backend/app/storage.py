@@ -0,0 +1,97 @@
+from __future__ import annotations
+import hashlib
+import logging
+import os
+import uuid
+from typing import NamedTuple
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from .config import UPLOAD_DIR, MAX_UPLOAD_BYTES, UPLOAD_CHUNK_SIZE, KEEP_UPLOADS
+
+logger = logging.getLogger(__name__)
+
+# Recording formats accepted for upload
+SUPPORTED_EXTENSIONS = (".mp3", ".wav", ".mp4")
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES."""
+
+
+class SavedUpload(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+
+
+def unique_upload_path(filename: str) -> str:
+    """Per-upload path in UPLOAD_DIR that keeps the original extension."""
+    ext = os.path.splitext(filename)[1].lower()
+    return os.path.join(UPLOAD_DIR, f"{uuid.uuid4().hex}{ext}")
+
+
+def _write_chunk(out, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    out.write(chunk)
+
+
+async def save_upload(
+    file: UploadFile,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> SavedUpload:
+    """Stream an upload to a unique path, enforcing ``max_bytes`` and hashing on the way."""
+    path = unique_upload_path(file.filename)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, "wb") as out:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadTooLargeError(f"Upload exceeds the {max_bytes} byte limit")
+                await run_in_threadpool(_write_chunk, out, digest, chunk)
+    except BaseException:
+        remove_upload(path, force=True)
+        raise
+    return SavedUpload(path=path, size=size, sha256=digest.hexdigest())
+
+
+def copy_upload(
+    source: str,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> SavedUpload:
+    """Copy a local recording to a unique upload path, hashing it like ``save_upload`` (batch ingestion)."""
+    path = unique_upload_path(source)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(source, "rb") as src, open(path, "wb") as out:
+            while True:
+                chunk = src.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise UploadTooLargeError(f"{source} exceeds the {max_bytes} byte limit")
+                _write_chunk(out, digest, chunk)
+    except BaseException:
+        remove_upload(path, force=True)
+        raise
+    return SavedUpload(path=path, size=size, sha256=digest.hexdigest())
+
+
+def remove_upload(path: str, force: bool = False) -> None:
+    """Delete a processed upload unless KEEP_UPLOADS is set."""
+    if KEEP_UPLOADS and not force:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Failed to remove upload {path}: {e}")
@@ -0,0 +1,185 @@
+"""Compressed transcript and segment storage outside the meeting documents.
+
+Meeting documents only keep metadata and the summary. The tagged transcript
+and the columnar segments are compressed (zstd when ``zstandard`` is
+installed, gzip otherwise) and split into ``TRANSCRIPT_CHUNK_BYTES`` pieces in
+the ``transcript_chunks`` collection, so no meeting is limited by MongoDB's
+16 MB document size and list queries never page transcripts into memory.
+"""
+from __future__ import annotations
+import codecs
+import gzip
+import hashlib
+import json
+import logging
+import zlib
+from typing import AsyncIterator, List, Optional
+from bson import Binary, ObjectId
+from fastapi.concurrency import run_in_threadpool
+from .db import get_db
+from .config import TRANSCRIPT_CODEC, TRANSCRIPT_CHUNK_BYTES
+from .search import index_segments
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard  # type: ignore
+except Exception:
+    zstandard = None
+
+# Fields of a pipeline result that live in transcript_chunks instead of the meeting
+STORED_FIELDS = ("transcript", "segments")
+
+
+def _codec() -> str:
+    if TRANSCRIPT_CODEC == "zstd" and zstandard is None:
+        logger.warning("zstandard not installed; compressing transcripts with gzip")
+        return "gzip"
+    return TRANSCRIPT_CODEC
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompressor(codec: str):
+    """Incremental decompressor with a ``decompress(chunk) -> bytes`` method."""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Transcript was stored with zstd but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj(wbits=31)  # gzip container
+
+
+def _pack(blobs: dict, codec: str) -> tuple:
+    """Compressed blobs and the SHA-256 of their raw contents."""
+    digest = hashlib.sha256()
+    for raw in blobs.values():
+        digest.update(raw)
+    return {kind: compress(raw, codec) for kind, raw in blobs.items()}, digest.hexdigest()
+
+
+class TranscriptStore:
+    """Chunked, compressed blobs per meeting and kind ("transcript" or "segments")."""
+
+    collection = "transcript_chunks"
+
+    def __init__(self):
+        self.codec = _codec()
+
+    async def save(self, meeting_id, transcript: str, segments: Optional[dict]) -> dict:
+        """Store a meeting's transcript and segments, replacing earlier ones.
+
+        Returns the ``transcript_stored`` description kept on the meeting document.
+        """
+        meeting_id = ObjectId(meeting_id)
+        blobs = {"transcript": transcript.encode("utf-8")}
+        if segments:
+            blobs["segments"] = json.dumps(segments, separators=(",", ":")).encode("utf-8")
+        # Compression and hashing are CPU-bound; keep them off the event loop
+        compressed, sha256 = await run_in_threadpool(_pack, blobs, self.codec)
+
+        docs: List[dict] = []
+        for kind, data in compressed.items():
+            for seq, offset in enumerate(range(0, max(len(data), 1), TRANSCRIPT_CHUNK_BYTES)):
+                docs.append({
+                    "meeting_id": meeting_id,
+                    "kind": kind,
+                    "seq": seq,
+                    "codec": self.codec,
+                    "data": Binary(data[offset:offset + TRANSCRIPT_CHUNK_BYTES]),
+                })
+        db = await get_db()
+        await db[self.collection].delete_many({"meeting_id": meeting_id})
+        await db[self.collection].insert_many(docs, ordered=False)
+
+        stored = {
+            "codec": self.codec,
+            "chars": len(transcript),
+            "bytes": len(blobs["transcript"]),
+            "compressed_bytes": sum(len(d) for d in compressed.values()),
+            "segments": len(segments.get("text", [])) if segments else 0,
+            # Identifies the stored content, e.g. for the ETag of /summary
+            "sha256": sha256,
+        }
+        logger.info(
+            f"Stored transcript of meeting {meeting_id}: {stored['bytes']} -> "
+            f"{stored['compressed_bytes']} bytes ({self.codec})"
+        )
+        return stored
+
+    async def stream(self, meeting_id, kind: str = "transcript") -> AsyncIterator[bytes]:
+        """Decompressed bytes of one blob, chunk by chunk."""
+        db = await get_db()
+        cursor = db[self.collection].find(
+            {"meeting_id": ObjectId(meeting_id), "kind": kind}, {"data": 1, "codec": 1}
+        ).sort("seq", 1)
+        inflater = None
+        async for chunk in cursor:
+            inflater = inflater or decompressor(chunk["codec"])
+            data = inflater.decompress(bytes(chunk["data"]))
+            if data:
+                yield data
+
+    async def stream_text(self, meeting_id) -> AsyncIterator[str]:
+        """The transcript as text, decoded incrementally (chunks may split characters)."""
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        async for data in self.stream(meeting_id, "transcript"):
+            text = decoder.decode(data)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    async def load(self, meeting_id, kind: str) -> Optional[bytes]:
+        parts = [data async for data in self.stream(meeting_id, kind)]
+        return b"".join(parts) if parts else None
+
+    async def load_transcript(self, meeting_id) -> str:
+        data = await self.load(meeting_id, "transcript")
+        return data.decode("utf-8") if data else ""
+
+    async def load_segments(self, meeting_id) -> Optional[dict]:
+        data = await self.load(meeting_id, "segments")
+        return json.loads(data) if data else None
+
+    async def delete(self, meeting_id) -> None:
+        db = await get_db()
+        await db[self.collection].delete_many({"meeting_id": ObjectId(meeting_id)})
+
+
+transcript_store = TranscriptStore()
+
+
+async def store_result(meeting_id, result: dict) -> dict:
+    """Move a pipeline result's transcript and segments aside (and into the search index).
+
+    Returns the fields to set on the meeting document.
+    """
+    segments = result.get("segments")
+    stored = await transcript_store.save(meeting_id, result.get("transcript", ""), segments)
+    await index_segments(await get_db(), meeting_id, segments)
+    fields = {k: v for k, v in result.items() if k not in STORED_FIELDS}
+    fields["transcript_stored"] = stored
+    return fields
+
+
+async def with_transcript(doc: dict, transcript: bool = True, segments: bool = False) -> dict:
+    """Fill in ``transcript``/``segments`` of a meeting document from side storage when requested.
+
+    Documents written before transcripts were stored separately carry them inline.
+    """
+    if "transcript_stored" not in doc:
+        if not transcript:
+            doc.pop("transcript", None)
+        if not segments:
+            doc.pop("segments", None)
+        return doc
+    if transcript:
+        doc["transcript"] = await transcript_store.load_transcript(doc["_id"])
+    if segments:
+        doc["segments"] = await transcript_store.load_segments(doc["_id"])
+    return doc
@@ -0,0 +1,88 @@
+"""Energy-based voice activity detection used to skip silence before transcription."""
+from __future__ import annotations
+import logging
+from typing import List, Tuple
+import numpy as np
+from .audio import SAMPLE_RATE
+from .config import VAD_MIN_SILENCE, VAD_MIN_SPEECH, VAD_PADDING
+
+logger = logging.getLogger(__name__)
+
+FRAME_SECONDS = 0.03
+# Silence inserted between joined regions so Whisper still sees a pause
+JOIN_GAP_SECONDS = 0.2
+
+
+def detect_speech(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    min_silence: float = VAD_MIN_SILENCE,
+    min_speech: float = VAD_MIN_SPEECH,
+    padding: float = VAD_PADDING,
+) -> List[Tuple[int, int]]:
+    """Speech regions as ``(start_sample, end_sample)`` pairs in time order.
+
+    Frames louder than an adaptive threshold between the noise floor and the
+    speech level count as speech. Regions are padded, pauses shorter than
+    ``min_silence`` are bridged and blips shorter than ``min_speech`` dropped.
+    """
+    frame = int(FRAME_SECONDS * sample_rate)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return []
+
+    # Frame energies in blocks so a long recording never needs a squared copy
+    db = np.empty(n_frames, dtype=np.float32)
+    block = 10000
+    for b in range(0, n_frames, block):
+        frames = np.asarray(audio[b * frame:min(b + block, n_frames) * frame], dtype=np.float32).reshape(-1, frame)
+        db[b:b + len(frames)] = 10 * np.log10(np.einsum("ij,ij->i", frames, frames) / frame + 1e-10)
+    floor = np.percentile(db, 10)
+    level = np.percentile(db, 99)
+    # Nothing but near-constant level: either all silence or all speech
+    if level - floor < 6:
+        return [(0, len(audio))] if level > -50 else []
+    speech = db > max(floor + 0.35 * (level - floor), -60)
+
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], speech.astype(np.int8), [0]])))
+    pad = int(padding / FRAME_SECONDS)
+    regions: List[Tuple[int, int]] = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        start, end = max(0, start - pad), min(n_frames, end + pad)
+        if regions and start - regions[-1][1] < min_silence / FRAME_SECONDS:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return [
+        (start * frame, min(len(audio), end * frame))
+        for start, end in regions
+        if (end - start) * FRAME_SECONDS >= min_speech
+    ]
+
+
+def compact(audio: np.ndarray, regions: List[Tuple[int, int]], sample_rate: int = SAMPLE_RATE):
+    """Join speech regions into one buffer and return it with a time map back to the original.
+
+    The map is a pair of knot arrays ``(compact_times, original_times)`` for
+    ``np.interp``; silence removed between regions collapses to a short gap.
+    """
+    gap = np.zeros(int(JOIN_GAP_SECONDS * sample_rate), dtype=np.float32)
+    pieces, compact_knots, original_knots = [], [], []
+    position = 0
+    for i, (start, end) in enumerate(regions):
+        if i:
+            pieces.append(gap)
+            position += len(gap)
+        pieces.append(audio[start:end])
+        compact_knots += [position, position + end - start]
+        original_knots += [start, end]
+        position += end - start
+    joined = np.concatenate(pieces).astype(np.float32, copy=False) if pieces else np.zeros(0, np.float32)
+    time_map = (np.asarray(compact_knots, float) / sample_rate, np.asarray(original_knots, float) / sample_rate)
+    return joined, time_map
+
+
+def speech_ratio(regions: List[Tuple[int, int]], total_samples: int) -> float:
+    if not total_samples:
+        return 0.0
+    return sum(end - start for start, end in regions) / total_samples
@@ -0,0 +1,51 @@
+"""
+Standalone pipeline worker for JOB_STORE=mongo.
+
+Leases jobs from the MongoDB ``jobs`` collection and runs them on its own
+worker pool (JOB_WORKERS processes, JOB_CONCURRENCY jobs at once), next to
+or instead of the API processes (API_RUNS_JOBS=0). Start as many as the
+hardware allows, on any node that shares MONGODB_URI and UPLOAD_DIR with the
+API. On SIGINT/SIGTERM jobs in progress are handed back to the queue.
+
+Usage (from the backend directory):
+  JOB_STORE=mongo python -m app.worker
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import signal
+from .config import JOB_STORE
+from .db import ensure_indexes
+from .jobs import job_queue
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def run() -> None:
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Failed to create database indexes: {e}")
+    await job_queue.start()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    logger.info(f"Worker {job_queue.owner} waiting for jobs")
+    await stop.wait()
+    logger.info("Stopping worker; jobs in progress go back to the queue")
+    await job_queue.stop()
+
+
+def main() -> None:
+    if JOB_STORE != "mongo":
+        raise SystemExit("Standalone workers need the shared job store: set JOB_STORE=mongo")
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compare the compiled extractor with the previous per-pattern implementation.
+
+Before timing, each transcript is checked for parity: both implementations
+must find the same candidate items. Only the order (ranking instead of
+match order) and therefore the top five may differ.
+
+Run from the project root:
+  python backend/benchmarks/bench_extract.py [--json results.json]
+"""
+import argparse
+import re
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.extract import ACTION_PATTERNS, DECISION_PATTERNS, extract_highlights, extractor  # noqa: E402
+from benchmarks.report import best_of, write_json  # noqa: E402
+from benchmarks.synthetic import make_transcript  # noqa: E402
+
+# Roughly 850 characters per spoken minute
+SIZES = {"10 min": 8_500, "1 h": 51_000, "3 h": 153_000, "8 h": 408_000}
+
+
+def legacy_extract(transcript: str, patterns, limit: int = 5) -> list:
+    """The original implementation: one finditer per pattern, list-based dedupe."""
+    items = []
+    for pattern in patterns:
+        for match in re.finditer(pattern, transcript, re.IGNORECASE):
+            item = match.group(0).strip()
+            if len(item) > 20 and len(item) < 150:
+                item = item.capitalize()
+                if not item.endswith('.'):
+                    item += '.'
+                if item not in items:
+                    items.append(item)
+    return items[:limit]
+
+
+def legacy_both(transcript: str):
+    return legacy_extract(transcript, ACTION_PATTERNS), legacy_extract(transcript, DECISION_PATTERNS)
+
+
+def check_parity(transcript: str) -> None:
+    """Fail unless both implementations find the same candidates."""
+    found = extractor.candidates(transcript)
+    for name, patterns in (("action_items", ACTION_PATTERNS), ("decisions", DECISION_PATTERNS)):
+        legacy = set(legacy_extract(transcript, patterns, limit=None))
+        compiled = set(found[name])
+        if legacy != compiled:
+            raise SystemExit(
+                f"{name}: {len(legacy - compiled)} candidates only in the legacy output, "
+                f"{len(compiled - legacy)} only in the compiled one, e.g. {sorted(legacy ^ compiled)[:3]}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'length':>8} {'chars':>9} {'legacy (s)':>11} {'compiled (s)':>13} {'speedup':>8}")
+    for label, n_chars in SIZES.items():
+        transcript = make_transcript(n_chars)
+        check_parity(transcript)
+        legacy = best_of(legacy_both, transcript, repeat=args.repeat)
+        compiled = best_of(extract_highlights, transcript, repeat=args.repeat)
+        results.append({"length": label, "chars": n_chars, "legacy_s": legacy, "compiled_s": compiled,
+                        "speedup": legacy / compiled if compiled else None})
+        print(f"{label:>8} {n_chars:>9} {legacy:>11.4f} {compiled:>13.4f} {legacy / compiled:>7.1f}x")
+
+    if args.json:
+        write_json(args.json, "extract", results, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
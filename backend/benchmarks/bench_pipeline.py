@@ -0,0 +1,73 @@
+"""
+Time the CPU-side pipeline functions on synthetic transcripts of 1k to 1M characters.
+
+Covers extract_action_items, extract_decisions, extractive_summary (TextRank),
+summarize on its rule-based path (no transformers model) and diarize_transcript with and without speaker
+turns. Models are never loaded, so results reflect our own code only.
+
+Run from the project root:
+  python backend/benchmarks/bench_pipeline.py [--repeat 3] [--json results.json]
+"""
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+# Real code paths, not the canned stub results
+os.environ["USE_STUB"] = "0"
+logging.basicConfig(level=logging.ERROR)
+
+from app import ai  # noqa: E402
+from app.textrank import extractive_summary  # noqa: E402
+from benchmarks.report import best_of, write_json  # noqa: E402
+from benchmarks.synthetic import make_transcript, make_segments  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="transcript sizes in characters")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    # Force the rule-based summary even where transformers is installed
+    ai.SUMMARIZER_AVAILABLE = False
+
+    results = []
+    print(f"{'function':>22} {'chars':>9} {'segments':>9} {'seconds':>9} {'chars/s':>12}")
+    for n_chars in args.sizes:
+        text = make_transcript(n_chars)
+        transcript, turns = make_segments(n_chars)
+        cases = {
+            "extract_action_items": (ai.extract_action_items, text),
+            "extract_decisions": (ai.extract_decisions, text),
+            "extractive_summary": (extractive_summary, text),
+            "summarize": (ai.summarize, text),
+            "diarize_transcript": (lambda: ai.diarize_transcript(transcript, turns),),
+            "diarize_transcript_single": (lambda: ai.diarize_transcript(transcript),),
+        }
+        for name, (fn, *fn_args) in cases.items():
+            seconds = best_of(fn, *fn_args, repeat=args.repeat)
+            row = {
+                "function": name,
+                "chars": n_chars,
+                "segments": len(transcript),
+                "seconds": seconds,
+                "chars_per_second": n_chars / seconds if seconds else None,
+            }
+            results.append(row)
+            print(f"{name:>22} {n_chars:>9} {len(transcript):>9} {seconds:>9.4f} {row['chars_per_second']:>12,.0f}")
+
+    if args.json:
+        write_json(args.json, "pipeline", results, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
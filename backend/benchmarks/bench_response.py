@@ -0,0 +1,81 @@
+"""
+Compare FastAPI's default JSON response path with the /summary response path on meeting documents.
+
+"default" is what returning a dict from an endpoint costs: jsonable_encoder
+plus JSONResponse rendering. "orjson" is responses.dumps, and "gzip"/"br" add
+compression on top of it (brotli only when installed). Documents carry a
+synthetic transcript of 10k to 1M characters and its columnar segments.
+
+Run from the project root:
+  python backend/benchmarks/bench_response.py [--repeat 5] [--json results.json]
+"""
+import argparse
+import logging
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+logging.basicConfig(level=logging.ERROR)
+
+from bson import ObjectId  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from app import responses  # noqa: E402
+from benchmarks.report import best_of, write_json  # noqa: E402
+from benchmarks.synthetic import make_segments, make_transcript  # noqa: E402
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def meeting(n_chars: int) -> dict:
+    transcript, _ = make_segments(n_chars)
+    return {
+        "_id": str(ObjectId()),
+        "filename": "meeting.wav",
+        "transcript": make_transcript(n_chars),
+        "segments": transcript.to_dict(),
+        "speakers": ["Speaker 1", "Speaker 2", "Speaker 3"],
+        "summary": {"overview": "Budget review.", "decisions": [], "action_items": []},
+        "createdAt": datetime(2024, 1, 1),
+        "status": "done",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="transcript sizes in characters")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'path':>8} {'chars':>9} {'seconds':>9} {'bytes':>10} {'speedup':>8}")
+    for n_chars in args.sizes:
+        doc = meeting(n_chars)
+        body = responses.dumps(doc)
+        cases = {
+            "default": (lambda: JSONResponse(jsonable_encoder(doc)).body, None),
+            "orjson": (lambda: responses.dumps(doc), None),
+            "gzip": (lambda: responses.compress(responses.dumps(doc), "gzip"), "gzip"),
+        }
+        if responses.brotli is not None:
+            cases["br"] = (lambda: responses.compress(responses.dumps(doc), "br"), "br")
+        baseline = None
+        for name, (fn, encoding) in cases.items():
+            seconds = best_of(fn, repeat=args.repeat)
+            size = len(responses.compress(body, encoding)) if encoding else len(fn())
+            baseline = baseline or seconds
+            results.append({"path": name, "chars": n_chars, "seconds": seconds, "bytes": size,
+                            "speedup": baseline / seconds if seconds else None})
+            print(f"{name:>8} {n_chars:>9} {seconds:>9.4f} {size:>10} {baseline / seconds:>7.1f}x")
+
+    if args.json:
+        write_json(args.json, "response", results, repeat=args.repeat, orjson=responses.orjson is not None)
+
+
+if __name__ == "__main__":
+    main()
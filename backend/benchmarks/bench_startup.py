@@ -0,0 +1,141 @@
+"""
+Measure API cold start: import time and time until /health answers.
+
+Every measurement runs in a fresh interpreter. Runs "with" the ML stack use
+whatever is installed (torch, whisper, faster-whisper, transformers,
+pyannote); runs "without" hide those packages with an import hook, as on
+an instance that only serves the API. Reported per mode (median of --repeat runs):
+  import        seconds to `import app.main`
+  ml_import     seconds to import the installed ML stack afterwards, i.e. what
+                the first inference (or a worker process) pays
+  first_health  seconds from process start until GET /health returns 200
+
+Run from the project root:
+  python backend/benchmarks/bench_startup.py [--repeat 5] [--workers 0] [--json results.json]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from benchmarks.report import write_json  # noqa: E402
+
+ML_MODULES = ["torch", "whisper", "faster_whisper", "transformers", "pyannote.audio"]
+
+# Makes the ML packages look uninstalled to the child interpreter
+HIDE_ML = f"""
+import importlib.abc, sys
+class _HideML(importlib.abc.MetaPathFinder):
+    def find_spec(self, name, path, target=None):
+        if name.split(".")[0] in {[m.split(".")[0] for m in ML_MODULES]!r}:
+            raise ModuleNotFoundError(name)
+        return None
+sys.meta_path.insert(0, _HideML())
+"""
+
+IMPORT_TIMES = """
+import time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from app.lazy import installed, optional_import
+for module in {modules!r}:
+    if installed(module):
+        optional_import(module)
+print(imported - started, time.perf_counter() - imported)
+"""
+
+SERVE = """
+import uvicorn
+uvicorn.run("app.main:app", host="127.0.0.1", port={port}, log_level="error")
+"""
+
+
+def child_env(workers: int) -> dict:
+    env = dict(os.environ)
+    env.setdefault("USE_STUB", "1")
+    env["JOB_WORKERS"] = str(workers)
+    env["PYTHONPATH"] = str(backend_dir)
+    return env
+
+
+def import_times(hide: bool, env: dict) -> tuple:
+    code = (HIDE_ML if hide else "") + IMPORT_TIMES.format(modules=ML_MODULES)
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=backend_dir, env=env, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(out[-2]), float(out[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def first_health(hide: bool, env: dict, timeout: float = 120) -> float:
+    port = free_port()
+    code = (HIDE_ML if hide else "") + SERVE.format(port=port)
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", code], cwd=backend_dir, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError(f"/health did not answer within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=0, help="JOB_WORKERS for the /health runs")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    env = child_env(args.workers)
+    installed = [m for m in ML_MODULES if subprocess.run(
+        [sys.executable, "-c", f"import importlib.util, sys; sys.exit(importlib.util.find_spec({m!r}) is None)"],
+        env=env, capture_output=True,
+    ).returncode == 0]
+    print(f"ML stack installed: {', '.join(installed) or 'none'}")
+
+    results = []
+    print(f"{'ml stack':>9} {'import (s)':>11} {'ml import (s)':>14} {'first /health (s)':>18}")
+    for hide in (False, True):
+        imports = [import_times(hide, env) for _ in range(args.repeat)]
+        health = [first_health(hide, env) for _ in range(args.repeat)]
+        row = {
+            "ml_stack": "hidden" if hide else "installed",
+            "modules": [] if hide else installed,
+            "import_s": statistics.median(i[0] for i in imports),
+            "ml_import_s": statistics.median(i[1] for i in imports),
+            "first_health_s": statistics.median(health),
+        }
+        results.append(row)
+        print(f"{row['ml_stack']:>9} {row['import_s']:>11.3f} {row['ml_import_s']:>14.3f} {row['first_health_s']:>18.3f}")
+
+    if args.json:
+        write_json(args.json, "startup", results, repeat=args.repeat, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
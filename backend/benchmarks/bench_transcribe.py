@@ -0,0 +1,119 @@
+"""
+Compare transcription backends on a fixed recording: speed and accuracy.
+
+Each backend/model pair transcribes the same decoded audio (VAD and
+chunking as in the pipeline). The script reports the real-time factor
+(transcription seconds per second of audio; below 1 is faster than real
+time), the model load time and the word error rate against --reference. Without a
+reference transcript the first pair's output is the reference, so WER is
+the difference from that baseline. The WER delta column is always relative
+to the first pair.
+
+Run from the project root:
+  python backend/benchmarks/bench_transcribe.py sample.wav [--reference sample.txt]
+      [--backends whisper whisper-int8 faster-whisper] [--models base] [--json results.json]
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import numpy as np  # noqa: E402
+from benchmarks.report import write_json  # noqa: E402
+
+
+def words(text: str) -> list:
+    """Lower-case words without punctuation or speaker tags, for WER."""
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def word_error_rate(reference: list, hypothesis: list) -> float:
+    """(substitutions + deletions + insertions) / reference words, by edit distance over words."""
+    if not reference:
+        return float(bool(hypothesis))
+    previous = np.arange(len(hypothesis) + 1)
+    for i, ref_word in enumerate(reference, 1):
+        current = np.empty_like(previous)
+        current[0] = i
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return float(previous[-1]) / len(reference)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio", help="recording to transcribe (any format ffmpeg decodes)")
+    parser.add_argument("--reference", help="text file with the correct transcript")
+    parser.add_argument("--backends", nargs="+", default=["whisper", "whisper-int8", "faster-whisper"])
+    parser.add_argument("--models", nargs="+", default=["base"], help="model sizes to try with every backend")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    from app.ai import transcribe
+    from app.asr import get_transcriber
+    from app.audio import open_audio, SAMPLE_RATE
+    from app.registry import registry
+    import app.ai as ai
+
+    # Real engines, whatever USE_STUB says in .env
+    ai.USE_STUB = False
+    reference = words(Path(args.reference).read_text()) if args.reference else None
+
+    results = []
+    print(f"{'backend':>15} {'model':>8} {'load (s)':>9} {'seconds':>9} {'RTF':>7} {'WER':>7} {'WER delta':>10}")
+    with open_audio(args.audio) as audio:
+        duration = len(audio) / SAMPLE_RATE
+        for backend_name in args.backends:
+            for model in args.models:
+                try:
+                    backend = get_transcriber(model, backend_name)
+                    started = time.perf_counter()
+                    registry.get(backend.key)
+                    load_seconds = time.perf_counter() - started
+                except Exception as e:
+                    print(f"{backend_name:>15} {model:>8}  skipped: {e}")
+                    continue
+                if backend.name != backend_name:
+                    print(f"{backend_name:>15} {model:>8}  skipped: not installed")
+                    continue
+                # Same code path as the pipeline, pinned to this backend
+                ai.get_transcriber = lambda size, _backend=backend: _backend
+                started = time.perf_counter()
+                text = transcribe(np.asarray(audio), model=model).text
+                seconds = time.perf_counter() - started
+                registry.evict(backend.key)
+
+                hypothesis = words(text)
+                if reference is None:
+                    reference = hypothesis
+                wer = word_error_rate(reference, hypothesis)
+                if not results:
+                    baseline_wer = wer
+                row = {
+                    "backend": backend.name,
+                    "model": model,
+                    "audio_seconds": round(duration, 2),
+                    "load_seconds": round(load_seconds, 3),
+                    "seconds": round(seconds, 3),
+                    "rtf": round(seconds / duration, 4) if duration else None,
+                    "wer": round(wer, 4),
+                    "wer_delta": round(wer - baseline_wer, 4),
+                    "words": len(hypothesis),
+                }
+                results.append(row)
+                print(f"{row['backend']:>15} {model:>8} {row['load_seconds']:>9.2f} {row['seconds']:>9.2f} "
+                      f"{row['rtf']:>7.3f} {row['wer']:>7.3f} {row['wer_delta']:>+10.3f}")
+
+    if args.json:
+        write_json(args.json, "transcribe", results, audio=Path(args.audio).name, reference=bool(args.reference),
+                   audio_seconds=round(duration, 2))
+
+
+if __name__ == "__main__":
+    main()
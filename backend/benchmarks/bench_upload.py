@@ -0,0 +1,135 @@
+"""
+End-to-end /upload throughput and latency under concurrent clients.
+
+The FastAPI app runs in-process behind httpx's ASGI transport, with its
+startup hooks (indexes, job queue). MongoDB is mongomock-motor by default or a
+real server with --mongo URI. Each request uploads a distinct synthetic WAV,
+so the result cache never short-circuits a job; completion is awaited on the
+job's progress stream. The pipeline runs in stub mode unless --real is given.
+
+Reports, per concurrency level, upload (202) latency and upload-to-done
+latency p50/p99 in milliseconds, completed jobs per second and rejections.
+
+Run from the project root:
+  python backend/benchmarks/bench_upload.py [--requests 200] [--concurrency 1 8 32] [--json results.json]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from benchmarks.report import percentile, write_json  # noqa: E402
+from benchmarks.synthetic import make_wav  # noqa: E402
+
+
+async def one_request(client, body: bytes, index: int) -> dict:
+    started = time.perf_counter()
+    response = await client.post("/upload", files={"file": (f"bench-{index}.wav", body, "audio/wav")})
+    accepted = time.perf_counter()
+    if response.status_code != 202:
+        return {"status": response.status_code, "upload_s": accepted - started, "done_s": None}
+    job_id = response.json()["job_id"]
+    # The stream ends with the job's done/failed event
+    events = await client.get(f"/jobs/{job_id}/events")
+    failed = "event: failed" in events.text
+    return {
+        "status": "failed" if failed else 202,
+        "upload_s": accepted - started,
+        "done_s": None if failed else time.perf_counter() - started,
+    }
+
+
+async def run_level(client, bodies, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(i, body):
+        async with semaphore:
+            return await one_request(client, body, i)
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(bounded(i, body) for i, body in enumerate(bodies)))
+    elapsed = time.perf_counter() - started
+
+    uploads = [o["upload_s"] * 1000 for o in outcomes if o["status"] == 202]
+    done = [o["done_s"] * 1000 for o in outcomes if o["done_s"] is not None]
+    return {
+        "concurrency": concurrency,
+        "requests": len(bodies),
+        "completed": len(done),
+        "rejected": sum(1 for o in outcomes if o["status"] not in (202, "failed")),
+        "failed": sum(1 for o in outcomes if o["status"] == "failed"),
+        "wall_s": elapsed,
+        "jobs_per_second": len(done) / elapsed if elapsed else None,
+        "upload_p50_ms": percentile(uploads, 50),
+        "upload_p99_ms": percentile(uploads, 99),
+        "done_p50_ms": percentile(done, 50),
+        "done_p99_ms": percentile(done, 99),
+    }
+
+
+async def run(args) -> list:
+    import httpx
+    from app import db
+    from app.main import app
+
+    if args.mongo == "mock":
+        from mongomock_motor import AsyncMongoMockClient
+
+        db._client = AsyncMongoMockClient()
+        db._db = db._client["benchmark"]
+
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for level in args.concurrency:
+                # Fresh audio per level and request: identical uploads would hit the result cache
+                bodies = [make_wav(args.seconds, seed=level * 100_000 + i) for i in range(args.requests)]
+                row = await run_level(client, bodies, level)
+                results.append(row)
+                print(f"{level:>11} {row['completed']:>9} {row['rejected']:>8} {row['jobs_per_second']:>9.1f} "
+                      f"{row['upload_p50_ms']:>9.1f} {row['upload_p99_ms']:>9.1f} "
+                      f"{row['done_p50_ms']:>9.1f} {row['done_p99_ms']:>9.1f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="uploads per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--seconds", type=float, default=5, help="length of each synthetic recording")
+    parser.add_argument("--mongo", default="mock", help="'mock' for mongomock-motor, or a MongoDB URI")
+    parser.add_argument("--workers", type=int, default=0, help="JOB_WORKERS (0 = threads in-process)")
+    parser.add_argument("--real", action="store_true", help="run the real models instead of stub mode")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure the app before importing it
+    os.environ["USE_STUB"] = "0" if args.real else "1"
+    os.environ["JOB_WORKERS"] = str(args.workers)
+    os.environ.setdefault("JOB_QUEUE_DEPTH", str(max(args.requests, 16)))
+    os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp(prefix="bench-uploads-"))
+    if args.mongo != "mock":
+        os.environ["MONGODB_URI"] = args.mongo
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger().setLevel(logging.ERROR)
+
+    print(f"{'concurrency':>11} {'completed':>9} {'rejected':>8} {'jobs/s':>9} "
+          f"{'up p50':>9} {'up p99':>9} {'done p50':>9} {'done p99':>9}   (ms)")
+    results = asyncio.run(run(args))
+
+    if args.json:
+        write_json(args.json, "upload", results, requests=args.requests, seconds=args.seconds,
+                   mongo="mock" if args.mongo == "mock" else "mongodb", workers=args.workers, stub=not args.real)
+
+
+if __name__ == "__main__":
+    main()
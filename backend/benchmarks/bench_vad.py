@@ -0,0 +1,92 @@
+"""
+Measure how much audio the VAD pre-pass removes before Whisper.
+
+Synthetic recordings with known silence ratios are run through
+app.vad.detect_speech. The script reports detection quality against the
+generated ground truth, the VAD cost and the audio left for transcription.
+If Whisper is installed, it also times transcription with and without the
+pre-pass.
+
+Run from the project root:
+  python backend/benchmarks/bench_vad.py [--seconds 600] [--whisper tiny] [--json results.json]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import numpy as np  # noqa: E402
+from app.audio import SAMPLE_RATE  # noqa: E402
+from app.vad import detect_speech, compact, speech_ratio  # noqa: E402
+from benchmarks.report import write_json  # noqa: E402
+from benchmarks.synthetic import make_audio  # noqa: E402
+
+SILENCE_RATIOS = [0.0, 0.2, 0.4, 0.6, 0.8]
+
+
+def score(regions, mask):
+    detected = np.zeros(len(mask), dtype=bool)
+    for start, end in regions:
+        detected[start:end] = True
+    recall = (detected & mask).sum() / max(mask.sum(), 1)
+    precision = (detected & mask).sum() / max(detected.sum(), 1)
+    return float(recall), float(precision)
+
+
+def timed_transcribe(model, audio) -> float:
+    started = time.perf_counter()
+    model.transcribe(audio, language="en", fp16=False)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=600)
+    parser.add_argument("--whisper", help="Whisper model to time end to end (e.g. tiny)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    model = None
+    if args.whisper:
+        import whisper  # type: ignore
+
+        model = whisper.load_model(args.whisper)
+
+    results = []
+    print(f"{'silence':>8} {'kept':>6} {'recall':>7} {'precision':>9} {'vad (s)':>8} {'to whisper (s)':>15}"
+          + (f" {'whisper (s)':>12} {'with vad (s)':>13}" if model else ""))
+    for silence in SILENCE_RATIOS:
+        audio, mask = make_audio(args.seconds, silence)
+        started = time.perf_counter()
+        regions = detect_speech(audio)
+        joined, _ = compact(audio, regions)
+        vad_seconds = time.perf_counter() - started
+        recall, precision = score(regions, mask)
+        row = {
+            "silence_ratio": silence,
+            "audio_seconds": args.seconds,
+            "kept_ratio": speech_ratio(regions, len(audio)),
+            "recall": recall,
+            "precision": precision,
+            "vad_seconds": vad_seconds,
+            "transcribed_seconds": len(joined) / SAMPLE_RATE,
+        }
+        line = (f"{silence:>8.0%} {row['kept_ratio']:>6.0%} {recall:>7.3f} {precision:>9.3f} "
+                f"{vad_seconds:>8.3f} {row['transcribed_seconds']:>15.1f}")
+        if model is not None:
+            row["whisper_seconds"] = timed_transcribe(model, audio)
+            row["whisper_vad_seconds"] = vad_seconds + timed_transcribe(model, joined)
+            line += f" {row['whisper_seconds']:>12.1f} {row['whisper_vad_seconds']:>13.1f}"
+        results.append(row)
+        print(line)
+
+    if args.json:
+        write_json(args.json, "vad", results, seconds=args.seconds, whisper=args.whisper)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Compare two JSON results of the same benchmark, e.g. before and after a change.
+
+Rows are matched on the benchmark's key columns and every numeric column
+present in both is shown with its relative change.
+
+Run from the project root:
+  python backend/benchmarks/compare.py baseline.json candidate.json [--only seconds upload_p99_ms]
+"""
+import argparse
+import json
+import sys
+
+# Columns identifying a row in each benchmark's results
+KEYS = {
+    "extract": ("length",),
+    "vad": ("silence_ratio",),
+    "pipeline": ("function", "chars"),
+    "upload": ("concurrency",),
+    "transcribe": ("backend", "model"),
+    "startup": ("ml_stack",),
+    "response": ("path", "chars"),
+}
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--only", nargs="+", help="columns to compare (default: all numeric ones)")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    if baseline["benchmark"] != candidate["benchmark"]:
+        sys.exit(f"Cannot compare '{baseline['benchmark']}' with '{candidate['benchmark']}' results")
+    keys = KEYS.get(baseline["benchmark"], ())
+    for label, run in (("baseline", baseline), ("candidate", candidate)):
+        env = run.get("environment", {})
+        print(f"{label:>9}: commit {env.get('commit')}, {env.get('timestamp')}, {env.get('cpus')} CPUs")
+
+    old_rows = {tuple(row.get(k) for k in keys): row for row in baseline["results"]}
+    for row in candidate["results"]:
+        key = tuple(row.get(k) for k in keys)
+        old = old_rows.get(key)
+        if old is None:
+            continue
+        print(" ".join(f"{k}={v}" for k, v in zip(keys, key)))
+        for column, value in row.items():
+            if column in keys or (args.only and column not in args.only):
+                continue
+            previous = old.get(column)
+            if not isinstance(value, (int, float)) or not isinstance(previous, (int, float)) or isinstance(value, bool):
+                continue
+            change = f"{(value - previous) / previous:+.1%}" if previous else "n/a"
+            print(f"  {column:>22} {previous:>14.4f} {value:>14.4f} {change:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Timing helpers and the JSON result format shared by the benchmarks."""
+from __future__ import annotations
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Callable, List, Sequence
+
+
+def best_of(fn: Callable, *args, repeat: int = 3) -> float:
+    """Fastest of ``repeat`` runs of ``fn(*args)`` in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """``q``-th percentile (0-100) with linear interpolation; 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def environment() -> dict:
+    """Where a result came from, so runs on different machines or commits are not confused."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def write_json(path: str, benchmark: str, results: List[dict], **params) -> None:
+    with open(path, "w") as f:
+        json.dump(
+            {"benchmark": benchmark, "environment": environment(), "params": params, "results": results},
+            f,
+            indent=2,
+        )
+    print(f"Results written to {path}")
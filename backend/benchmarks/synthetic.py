@@ -0,0 +1,105 @@
+"""Deterministic synthetic meeting data for the benchmarks."""
+from __future__ import annotations
+import random
+
+NAMES = ["Alice", "Bob", "Carol", "Dan", "Erin", "Frank"]
+TOPICS = ["the budget", "the Q4 roadmap", "marketing spend", "the hiring plan", "the release",
+          "customer feedback", "the onboarding flow", "infrastructure costs"]
+TEMPLATES = [
+    "I think {topic} looks reasonable overall.",
+    "Can we go over {topic} once more?",
+    "{name} will prepare a summary of {topic} for ticket {n} by Friday.",
+    "We decided to postpone {topic} until next quarter.",
+    "Action item: {name} needs to follow up on {topic}.",
+    "We agreed that {topic} is the top priority.",
+    "Maybe we should revisit {topic} later.",
+    "The numbers for {topic} are still coming in.",
+    "Let's not spend too long on {topic} today.",
+    "We will draft proposal {n} for {topic} next week.",
+]
+
+
+def make_transcript(n_chars: int, seed: int = 0, speakers: int = 3) -> str:
+    """Speaker-tagged transcript of roughly ``n_chars`` characters."""
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    while total < n_chars:
+        sentences = " ".join(
+            rng.choice(TEMPLATES).format(name=rng.choice(NAMES), topic=rng.choice(TOPICS), n=rng.randint(1, 99999))
+            for _ in range(rng.randint(1, 4))
+        )
+        line = f"Speaker {rng.randint(1, speakers)}: {sentences}"
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)[:n_chars]
+
+
+def make_audio(seconds: float, silence_ratio: float, sample_rate: int = 16000, seed: int = 0):
+    """Speech-like bursts separated by near-silence.
+
+    Returns ``(audio, speech_mask)`` where the mask marks the samples that
+    were generated as speech, so detectors can be scored against it.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    total = int(seconds * sample_rate)
+    audio = (10 ** (-65 / 20)) * rng.standard_normal(total).astype(np.float32)
+    mask = np.zeros(total, dtype=bool)
+    speech_target = int(total * (1 - silence_ratio))
+    position = 0
+    while mask.sum() < speech_target and position < total:
+        burst = int(rng.uniform(1.0, 6.0) * sample_rate)
+        gap_mean = (burst * silence_ratio / max(1 - silence_ratio, 1e-3))
+        position += int(rng.uniform(0.5, 1.5) * gap_mean)
+        end = min(total, position + burst, position + speech_target - int(mask.sum()))
+        if end <= position:
+            break
+        t = np.arange(end - position) / sample_rate
+        f0 = rng.uniform(100, 240)
+        voiced = sum(np.sin(2 * np.pi * f0 * h * t) / h for h in range(1, 6))
+        syllables = 0.6 + 0.4 * np.sin(2 * np.pi * rng.uniform(3, 5) * t)
+        audio[position:end] += (0.2 * voiced * syllables).astype(np.float32)
+        mask[position:end] = True
+        position = end
+    return audio, mask
+
+
+def make_segments(n_chars: int, seed: int = 0, speakers: int = 3, chars_per_second: float = 15.0):
+    """Timestamped transcript of roughly ``n_chars`` characters plus matching speaker turns.
+
+    Each speaker line becomes one segment lasting as long as it takes to say
+    at ``chars_per_second``; turns follow the lines with a little jitter, as a
+    diarization backend would report them. Returns ``(transcript, turns)``.
+    """
+    from app.segments import Transcript
+
+    rng = random.Random(seed)
+    transcript = Transcript()
+    turns = []
+    position = 0.0
+    for line in make_transcript(n_chars, seed, speakers).splitlines():
+        label, _, text = line.partition(": ")
+        duration = max(len(text), 1) / chars_per_second
+        transcript.append(position, position + duration, text)
+        jitter = rng.uniform(-0.3, 0.3)
+        turns.append((max(0.0, position + jitter), position + duration + jitter, label.replace(" ", "_").upper()))
+        position += duration + rng.uniform(0.1, 0.8)
+    return transcript, turns
+
+
+def make_wav(seconds: float, seed: int = 0, silence_ratio: float = 0.3, sample_rate: int = 16000) -> bytes:
+    """16-bit mono WAV file of synthetic speech (see ``make_audio``)."""
+    import io
+    import wave
+    import numpy as np
+
+    audio, _ = make_audio(seconds, silence_ratio, sample_rate, seed)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes((np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
@@ -10,7 +10,7 @@ backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
 try:
-    from app.config import USE_STUB, UPLOAD_DIR, MONGODB_URI
+    from app.config import USE_STUB, UPLOAD_DIR, MONGODB_URI, TRANSCRIBE_BACKEND, WHISPER_MODEL
     
     print("=" * 60)
     print("Current Backend Configuration")
@@ -18,6 +18,7 @@ try:
     print(f"\nUSE_STUB: {USE_STUB}")
     print(f"UPLOAD_DIR: {UPLOAD_DIR}")
     print(f"MONGODB_URI: {MONGODB_URI}")
+    print(f"TRANSCRIBE_BACKEND: {TRANSCRIBE_BACKEND} (model {WHISPER_MODEL})")
     
     print("\n" + "=" * 60)
     print("AI Dependencies Check")
@@ -33,6 +34,16 @@ try:
             print("  ⚠ WARNING: USE_STUB=0 but Whisper not installed!")
             print("  Install with: pip install openai-whisper torch")
     
+    # Check for faster-whisper (optional, CTranslate2 int8 transcription)
+    try:
+        import faster_whisper
+        print("✓ faster-whisper: INSTALLED")
+    except ImportError:
+        print("✗ faster-whisper: NOT INSTALLED (optional)")
+        if TRANSCRIBE_BACKEND == "faster-whisper":
+            print("  ⚠ WARNING: TRANSCRIBE_BACKEND=faster-whisper but it is not installed!")
+            print("  Install with: pip install faster-whisper")
+    
     # Check for transformers
     try:
         import transformers
@@ -0,0 +1,138 @@
+"""
+Backfill archived recordings: queue many files as batches on a local worker pool.
+
+Runs the API's job queue in-process with the same settings (.env): files are
+copied into UPLOAD_DIR, queued in batches of --batch-size, transcribed on
+--workers processes and summarized batch by batch, and the meetings are
+written to MONGODB_URI. Recordings whose result is cached need no job.
+
+Usage (from the project root):
+  python backend/ingest.py recordings/ more/*.mp3 [--recursive] [--batch-size 16] [--workers 4] [--model small]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+
+def find_recordings(paths, recursive: bool, extensions) -> list:
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            found = path.rglob("*") if recursive else path.iterdir()
+            files.extend(sorted(p for p in found if p.is_file() and p.suffix.lower() in extensions))
+        elif path.is_file():
+            files.append(path)
+        else:
+            print(f"Skipping {path}: not found")
+    return files
+
+
+async def wait_for(job_id: str, filename: str) -> bool:
+    from app.jobs import job_queue
+    from app.progress import TERMINAL_EVENTS
+
+    async for event in job_queue.subscribe(job_id):
+        if event["type"] in TERMINAL_EVENTS:
+            if event["type"] == "done":
+                print(f"  done    {filename} -> meeting {event.get('meeting_id')} ({event.get('seconds')}s)")
+            else:
+                print(f"  failed  {filename}: {event.get('error')}")
+            return event["type"] == "done"
+    return False
+
+
+async def ingest(files: list, batch_size: int, model: str | None = None) -> int:
+    from app.db import ensure_indexes
+    from app.jobs import job_queue
+    from app.executor import AdmissionError
+    from app.batch import ingest_batch
+    from app.storage import copy_upload, remove_upload, UploadTooLargeError
+
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        print(f"Warning: failed to create database indexes: {e}")
+    await job_queue.start()
+    started = time.perf_counter()
+    waiters, cached, failed = [], 0, 0
+    try:
+        for first in range(0, len(files), batch_size):
+            batch = files[first:first + batch_size]
+            # The next batch is transcribed while the previous one is summarized
+            while job_queue.free_slots() < len(batch):
+                await asyncio.sleep(0.5)
+            saved = []
+            for path in batch:
+                try:
+                    saved.append((path.name, await asyncio.to_thread(copy_upload, str(path))))
+                except (UploadTooLargeError, OSError) as e:
+                    print(f"  skipped {path}: {e}")
+                    failed += 1
+            if not saved:
+                continue
+            try:
+                result = await ingest_batch(saved, model)
+            except AdmissionError as e:
+                for _, upload in saved:
+                    remove_upload(upload.path, force=True)
+                print(f"  batch rejected: {e}")
+                failed += len(saved)
+                continue
+            print(f"Queued batch {result['batch_id']} ({len(saved)} files, {first + len(batch)}/{len(files)})")
+            for item in result["items"]:
+                if item["cached"]:
+                    cached += 1
+                    print(f"  cached  {item['filename']} -> meeting {item['_id']}")
+                else:
+                    waiters.append(asyncio.create_task(wait_for(item["job_id"], item["filename"])))
+        outcomes = await asyncio.gather(*waiters)
+    finally:
+        await job_queue.stop()
+
+    done = sum(outcomes)
+    failed += len(outcomes) - done
+    elapsed = time.perf_counter() - started
+    print(f"\n{done} processed, {cached} cached, {failed} failed in {elapsed:.1f}s")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="recordings or directories of recordings")
+    parser.add_argument("--recursive", action="store_true", help="include subdirectories")
+    parser.add_argument("--batch-size", type=int, default=16, help="recordings summarized together")
+    parser.add_argument("--workers", type=int, help="worker processes (default: JOB_WORKERS)")
+    parser.add_argument("--model", help="transcription model size (default: WHISPER_MODEL)")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure the queue before importing the app
+    if args.workers is not None:
+        os.environ["JOB_WORKERS"] = str(args.workers)
+    # Room for two batches: one being transcribed while the previous one is summarized
+    os.environ["JOB_QUEUE_DEPTH"] = str(2 * args.batch_size)
+    from app.asr import check_model
+    from app.storage import SUPPORTED_EXTENSIONS
+
+    # Reject an unsupported size up front, like /upload?model= does, instead of failing every job
+    try:
+        check_model(args.model)
+    except ValueError as e:
+        sys.exit(str(e))
+
+    files = find_recordings(args.paths, args.recursive, SUPPORTED_EXTENSIONS)
+    if not files:
+        sys.exit("No recordings found")
+    print(f"Ingesting {len(files)} recordings in batches of {args.batch_size}")
+    failed = asyncio.run(ingest(files, args.batch_size, args.model))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
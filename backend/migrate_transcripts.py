@@ -0,0 +1,58 @@
+"""
+Move inline transcripts of existing meetings into compressed side storage.
+
+Meetings saved before transcripts were stored separately keep `transcript`
+and `segments` on the document; this copies them to `transcript_chunks`,
+indexes their segments for /search and unsets the inline fields.
+
+Usage (from the backend directory):
+  python migrate_transcripts.py [--dry-run] [--limit N]
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from app.db import get_db, ensure_indexes  # noqa: E402
+from app.transcripts import STORED_FIELDS, store_result  # noqa: E402
+
+
+async def migrate(dry_run: bool, limit: int) -> None:
+    await ensure_indexes()
+    db = await get_db()
+    query = {"transcript_stored": {"$exists": False}, "transcript": {"$exists": True}}
+    total = await db.meetings.count_documents(query)
+    print(f"{total} meetings with inline transcripts")
+    if dry_run or not total:
+        return
+
+    migrated = 0
+    cursor = db.meetings.find(query, {"transcript": 1, "segments": 1})
+    if limit:
+        cursor = cursor.limit(limit)
+    async for doc in cursor:
+        fields = await store_result(doc["_id"], {"transcript": doc.get("transcript") or "", "segments": doc.get("segments")})
+        await db.meetings.update_one(
+            {"_id": doc["_id"]},
+            {"$set": fields, "$unset": {field: "" for field in STORED_FIELDS}},
+        )
+        migrated += 1
+        if migrated % 100 == 0:
+            print(f"  {migrated}/{total}")
+    print(f"Migrated {migrated} meetings")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="only count meetings to migrate")
+    parser.add_argument("--limit", type=int, default=0, help="migrate at most this many meetings")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.dry_run, args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Test setup: stub pipeline, a temporary UPLOAD_DIR and an in-memory MongoDB (mongomock-motor).
+
+Settings are read when app.config is imported, so they are set here first.
+Run from backend/: ``pip install -r requirements-dev.txt && python -m pytest``
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+os.environ.update(
+    USE_STUB="1",
+    JOB_WORKERS="0",
+    JOB_STORE="memory",
+    UPLOAD_DIR=tempfile.mkdtemp(prefix="meetingai-tests-"),
+)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+import app.db as db  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def mongo():
+    """A fresh in-memory database per test, returned by app.db.get_db()."""
+    client = AsyncMongoMockClient()
+    db._client, db._db = client, client["meeting_ai_test"]
+    yield db._db
+    db._client, db._db = None, None
+
+
+@pytest.fixture
+def client(mongo):
+    """The API with its job queue running (in-process, stub pipeline)."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,121 @@
+"""ResultCache: pipeline fingerprint, keys, the in-memory LRU and transcripts loaded by reference."""
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from app import cache, diarization
+from app.cache import ResultCache, pipeline_version
+from app.config import WHISPER_MODEL
+from app.transcripts import transcript_store
+
+RESULT = {"transcript": "Speaker 1: Hello there.", "segments": None, "speakers": ["Speaker 1"],
+          "summary": {"overview": "A greeting.", "decisions": [], "action_items": []}}
+
+
+@pytest.mark.parametrize("setting, value", [
+    ("VAD_ENABLED", False),
+    ("VAD_MIN_SILENCE", 1.5),
+    ("VAD_MIN_SPEECH", 0.5),
+    ("VAD_PADDING", 0.4),
+    ("VAD_MAX_SPEECH_RATIO", 0.5),
+    ("TRANSCRIBE_CHUNK_SECONDS", 120.0),
+    ("DIARIZATION_NUM_SPEAKERS", 2),
+    ("DIARIZATION_MAX_SPEAKERS", 3),
+    ("WHISPER_MODEL", "large-v3"),
+    ("SUMMARY_MODE", "extractive"),
+    ("RESULT_CACHE_VERSION", "2"),
+])
+def test_settings_that_change_the_output_change_the_version(monkeypatch, setting, value):
+    before = pipeline_version()
+    monkeypatch.setattr(cache, setting, value)
+    assert pipeline_version() != before
+
+
+def test_the_resolved_diarization_backend_is_part_of_the_version(monkeypatch):
+    before = pipeline_version()
+    monkeypatch.setattr(diarization, "resolve_backend", lambda: "none")
+    assert pipeline_version() != before
+
+
+def test_auto_diarization_resolves_to_the_usable_backend(monkeypatch):
+    monkeypatch.setattr(diarization, "PYANNOTE_INSTALLED", True)
+    monkeypatch.setattr(diarization, "HUGGINGFACE_TOKEN", None)
+    assert diarization.resolve_backend("auto") == "energy"
+    monkeypatch.setattr(diarization, "HUGGINGFACE_TOKEN", "hf_token")
+    assert diarization.resolve_backend("auto") == "pyannote"
+    monkeypatch.setattr(diarization, "PYANNOTE_INSTALLED", False)
+    assert diarization.resolve_backend("pyannote") == "energy"
+    assert diarization.resolve_backend("none") == "none"
+
+
+def test_keys_separate_versions_and_non_default_models():
+    result_cache = ResultCache(max_entries=4)
+    assert result_cache.key("abc") == result_cache.key("abc", WHISPER_MODEL) == f"abc:{result_cache.version}"
+    assert result_cache.key("abc", "tiny" if WHISPER_MODEL != "tiny" else "small") != result_cache.key("abc")
+
+
+async def stored_meeting() -> str:
+    meeting_id = str(ObjectId())
+    await transcript_store.save(meeting_id, RESULT["transcript"], RESULT["segments"])
+    return meeting_id
+
+
+def test_entries_reference_the_stored_transcript(mongo):
+    async def scenario():
+        result_cache = ResultCache(max_entries=4)
+        meeting_id = await stored_meeting()
+        await result_cache.put("abc", RESULT, meeting_id)
+
+        doc = await mongo.result_cache.find_one({"_id": result_cache.key("abc")})
+        assert "transcript" not in doc["result"]
+        assert doc["result"]["meeting_id"] == meeting_id
+        cached = await result_cache.get("abc")
+        assert cached["transcript"] == RESULT["transcript"]
+        assert cached["summary"] == RESULT["summary"]
+        assert "meeting_id" not in cached
+
+    asyncio.run(scenario())
+
+
+def test_least_recently_used_entries_fall_back_to_mongo(mongo):
+    async def scenario():
+        result_cache = ResultCache(max_entries=2)
+        meeting_id = await stored_meeting()
+        for sha in ("a", "b", "c"):
+            await result_cache.put(sha, RESULT, meeting_id)
+        assert list(result_cache._memory) == [result_cache.key("b"), result_cache.key("c")]
+
+        assert await result_cache.get("b") is not None
+        assert await result_cache.get("a") is not None
+        assert await result_cache.get("missing") is None
+        stats = result_cache.stats()
+        assert (stats["memory_hits"], stats["db_hits"], stats["misses"]) == (1, 1, 1)
+        # "a" came back from MongoDB and pushed out "c", the least recently used
+        assert list(result_cache._memory) == [result_cache.key("b"), result_cache.key("a")]
+
+    asyncio.run(scenario())
+
+
+def test_an_entry_without_its_transcript_is_a_miss(mongo):
+    async def scenario():
+        result_cache = ResultCache(max_entries=2)
+        meeting_id = await stored_meeting()
+        await result_cache.put("abc", RESULT, meeting_id)
+        await transcript_store.delete(meeting_id)
+
+        assert await result_cache.get("abc") is None
+        assert result_cache.stats()["misses"] == 1
+        assert not result_cache._memory
+
+    asyncio.run(scenario())
+
+
+def test_results_without_a_meeting_are_not_cached(mongo):
+    async def scenario():
+        result_cache = ResultCache(max_entries=2)
+        await result_cache.put("abc", RESULT, None)
+        assert await result_cache.get("abc") is None
+        assert await mongo.result_cache.count_documents({}) == 0
+
+    asyncio.run(scenario())
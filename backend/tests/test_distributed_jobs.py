@@ -0,0 +1,258 @@
+"""DistributedJobQueue against a shared JobStore: retries, lost workers and batch summaries."""
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app import jobs, leases
+from app.config import UPLOAD_DIR
+from app.leases import JobStore
+
+
+def make_queue(concurrency: int = 1, heartbeat_seconds: float = 0.05, **store_options) -> jobs.DistributedJobQueue:
+    return jobs.DistributedJobQueue(
+        workers=0, concurrency=concurrency, max_depth=16, history_limit=100,
+        store=JobStore(**store_options), poll_seconds=0.02, heartbeat_seconds=heartbeat_seconds,
+    )
+
+
+def upload(name: str) -> str:
+    path = os.path.join(UPLOAD_DIR, f"{name}-{ObjectId()}.wav")
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + os.urandom(256))
+    return path
+
+
+async def new_meeting(mongo) -> ObjectId:
+    meeting_id = ObjectId()
+    await mongo.meetings.insert_one({"_id": meeting_id, "status": "processing"})
+    return meeting_id
+
+
+async def wait_for(check, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = await check()
+        if value:
+            return value
+        await asyncio.sleep(0.02)
+    raise AssertionError("timed out")
+
+
+async def finished(queue, job_id: str):
+    async def check():
+        job = await queue.find(job_id)
+        return job if job["status"] in leases.FINAL_STATUSES else None
+    return await wait_for(check)
+
+
+@pytest.fixture
+def flaky_pipeline(monkeypatch):
+    """run_pipeline failing its first ``calls["fail"]`` calls; retries are due right away."""
+    calls = {"n": 0, "fail": 0}
+    real = jobs.run_pipeline
+
+    def run_pipeline(path, job_id, sink, with_summary=True, model=None):
+        calls["n"] += 1
+        if calls["n"] <= calls["fail"]:
+            raise RuntimeError(f"boom {calls['n']}")
+        return real(path, job_id, sink, with_summary, model)
+
+    monkeypatch.setattr(jobs, "run_pipeline", run_pipeline)
+    monkeypatch.setattr(leases, "backoff_seconds", lambda attempt: 0.01)
+    return calls
+
+
+def test_failed_attempts_are_retried_until_the_job_succeeds(mongo, flaky_pipeline):
+    flaky_pipeline["fail"] = 2
+
+    async def scenario():
+        queue = make_queue(max_attempts=3)
+        await queue.start()
+        meeting_id = await new_meeting(mongo)
+        await queue.submit("j", upload("a"), "a.wav", meeting_id=str(meeting_id), sha256="a")
+        job = await finished(queue, "j")
+        await queue.stop()
+
+        assert job["status"] == "done"
+        assert job["attempts"] == 3
+        assert job["error"] is None
+        meeting = await mongo.meetings.find_one({"_id": meeting_id})
+        assert meeting["status"] == "done"
+        assert meeting["summary"]
+
+    asyncio.run(scenario())
+    assert flaky_pipeline["n"] == 3
+
+
+def test_retries_stop_at_max_attempts(mongo, flaky_pipeline):
+    flaky_pipeline["fail"] = 10
+
+    async def scenario():
+        queue = make_queue(max_attempts=3)
+        await queue.start()
+        meeting_id = await new_meeting(mongo)
+        await queue.submit("j", upload("a"), "a.wav", meeting_id=str(meeting_id), sha256="a")
+        job = await finished(queue, "j")
+        await asyncio.sleep(0.1)
+        await queue.stop()
+
+        assert job["status"] == "failed"
+        assert job["attempts"] == 3
+        assert "boom 3" in job["error"]
+        meeting = await mongo.meetings.find_one({"_id": meeting_id})
+        assert meeting["status"] == "failed"
+
+    asyncio.run(scenario())
+    assert flaky_pipeline["n"] == 3
+
+
+def test_a_crashed_workers_job_is_taken_over(mongo, monkeypatch):
+    real = jobs.run_pipeline
+
+    def slow_pipeline(path, job_id, sink, with_summary=True, model=None):
+        time.sleep(0.5)
+        return real(path, job_id, sink, with_summary, model)
+
+    monkeypatch.setattr(jobs, "run_pipeline", slow_pipeline)
+
+    async def scenario():
+        crashed = make_queue(lease_seconds=0.2)
+        await crashed.start()
+        await crashed.submit("j", upload("a"), "a.wav")
+        await wait_for(lambda: _leased_by(crashed, "j"))
+        # A hard crash: heartbeats stop and the lease is never released
+        crashed.store.release = lambda job, owner: asyncio.sleep(0)
+        for task in crashed._consumers:
+            task.cancel()
+
+        survivor = make_queue(lease_seconds=0.2)
+        await survivor.start()
+        job = await finished(survivor, "j")
+        await survivor.stop()
+        await crashed.stop()
+
+        assert job["status"] == "done"
+        assert job["attempts"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_a_failure_after_losing_the_lease_leaves_the_job_to_its_new_owner(mongo, monkeypatch):
+    real = jobs.run_pipeline
+    calls = []
+
+    def run_pipeline(path, job_id, sink, with_summary=True, model=None):
+        calls.append(path)
+        if len(calls) == 1:
+            # The first worker stalls past its lease, then fails while the second one runs the job
+            time.sleep(0.6)
+            raise RuntimeError("stalled worker")
+        time.sleep(0.5)
+        return real(path, job_id, sink, with_summary, model)
+
+    monkeypatch.setattr(jobs, "run_pipeline", run_pipeline)
+
+    async def scenario():
+        stalled = make_queue(heartbeat_seconds=10, lease_seconds=0.2)
+        emitted = []
+        emit = stalled._emit
+        stalled._emit = lambda job, event_type, **fields: (emitted.append(event_type), emit(job, event_type, **fields))
+        await stalled.start()
+        meeting_id = await new_meeting(mongo)
+        path = upload("a")
+        await stalled.submit("j", path, "a.wav", meeting_id=str(meeting_id), sha256="a")
+        await wait_for(lambda: _leased_by(stalled, "j"))
+
+        survivor = make_queue(lease_seconds=10)
+        await survivor.start()
+        job = await finished(survivor, "j")
+        await survivor.stop()
+        await stalled.stop()
+
+        assert job["status"] == "done"
+        # The stalled worker neither rescheduled nor failed the job
+        assert "retry" not in emitted and "failed" not in emitted
+        doc = await survivor.store.get("j")
+        assert doc["status"] == "done"
+        assert doc["error"] is None
+        meeting = await mongo.meetings.find_one({"_id": meeting_id})
+        assert meeting["status"] == "done"
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+async def _leased_by(queue, job_id: str) -> bool:
+    job = await queue.store.get(job_id)
+    return job["lease_owner"] == queue.owner
+
+
+def test_a_job_lost_by_every_worker_fails(mongo):
+    async def scenario():
+        queue = make_queue(max_attempts=2)
+        meeting_id = await new_meeting(mongo)
+        await queue.store.enqueue([{
+            "id": "j", "filename": "a.wav", "file_path": upload("a"), "status": "queued", "batch_id": None,
+            "meeting_id": str(meeting_id), "sha256": "a", "model": None, "error": None, "stage": None,
+            "percent": 0.0, "timings": {},
+        }])
+        # Two workers leased it and died; the lease has run out
+        past = datetime.utcnow() - timedelta(seconds=1)
+        await mongo.jobs.update_one(
+            {"_id": "j"}, {"$set": {"status": "processing", "attempts": 2, "lease_owner": "gone", "lease_expires": past}}
+        )
+        await queue.start()
+        job = await finished(queue, "j")
+        await queue.stop()
+
+        assert job["status"] == "failed"
+        assert "Worker lost" in job["error"]
+        meeting = await mongo.meetings.find_one({"_id": meeting_id})
+        assert meeting["status"] == "failed"
+
+    asyncio.run(scenario())
+
+
+def test_the_last_job_of_a_batch_summarizes_the_batch(mongo, monkeypatch):
+    summarized = []
+    real = jobs.summarize_batch
+
+    def summarize_batch(transcripts, job_ids, sink):
+        summarized.append(sorted(job_ids))
+        return real(transcripts, job_ids, sink)
+
+    monkeypatch.setattr(jobs, "summarize_batch", summarize_batch)
+
+    async def scenario():
+        api = make_queue()
+        worker = make_queue(concurrency=2)
+        await api.start(consume=False)
+        await worker.start()
+        meeting_ids = [await new_meeting(mongo) for _ in range(3)]
+        submitted = await api.submit_batch([
+            {"job_id": f"b{i}", "file_path": upload(f"b{i}"), "filename": f"b{i}.wav",
+             "meeting_id": str(meeting_id), "sha256": f"b{i}"}
+            for i, meeting_id in enumerate(meeting_ids)
+        ])
+        batch_id = submitted[0]["batch_id"]
+
+        async def batch_done():
+            items = await api.batch(batch_id)
+            return all(item["status"] == "done" for item in items)
+
+        await wait_for(batch_done)
+        await worker.stop()
+        await api.stop()
+
+        for meeting_id in meeting_ids:
+            meeting = await mongo.meetings.find_one({"_id": meeting_id})
+            assert meeting["status"] == "done"
+            assert meeting["summary"]
+        assert (await mongo.job_batches.find_one({"_id": batch_id}))["pending"] == 0
+
+    asyncio.run(scenario())
+    assert summarized == [["b0", "b1", "b2"]]
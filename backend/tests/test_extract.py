@@ -0,0 +1,74 @@
+"""Extractor: same candidates as the per-pattern implementation, ranking and single-category scans."""
+import pytest
+
+from app.extract import ACTION_PATTERNS, DECISION_PATTERNS, NONE_FOUND, extract_category, extract_highlights, extractor
+from benchmarks.bench_extract import legacy_extract
+from benchmarks.synthetic import make_transcript
+
+CATEGORIES = {"action_items": ACTION_PATTERNS, "decisions": DECISION_PATTERNS}
+
+TRICKY = [
+    # Overlapping hits of different patterns, and two of the same pattern in one sentence
+    "We will implement the new billing flow for enterprise accounts. Bob will draft it and Carol should review it",
+    # Triggers inside words: goodwill, multitask, redesign
+    "The goodwill gesture helps. Multitask: sort the incoming tickets by priority! Redesign the onboarding emails now",
+    # Case, owners split by a newline, and text without sentence punctuation at the end
+    "ALICE WILL SHIP THE RELEASE BEFORE FRIDAY. Dan\nneeds to call the vendor about pricing tiers",
+    # Non-ASCII text takes the case-insensitive path
+    "Zoë will finalize the café budget next week. ſhould the team approve the naïve plan? We'll reconsider the résumé flow",
+    "Decision: postpone the launch until the audit is complete. We decided that Erin owns the migration plan",
+    "",
+]
+
+
+def assert_same_candidates(transcript: str) -> None:
+    found = extractor.candidates(transcript)
+    for name, patterns in CATEGORIES.items():
+        assert set(found[name]) == set(legacy_extract(transcript, patterns, limit=None)), name
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_candidates_match_the_per_pattern_implementation(seed):
+    assert_same_candidates(make_transcript(20_000, seed=seed))
+
+
+@pytest.mark.parametrize("transcript", TRICKY)
+def test_candidates_match_on_edge_cases(transcript):
+    assert_same_candidates(transcript)
+
+
+def test_repeated_items_are_counted_once_with_their_mentions():
+    sentence = "Frank will send the revised contract to legal."
+    found = extractor.candidates(" ".join([sentence] * 3))
+    [entry] = [e for e in found["action_items"].values() if e[0] == sentence]
+    assert entry[3] == 3
+
+
+def test_ranking_prefers_explicit_owned_items_with_deadlines():
+    transcript = (
+        "Maybe we should look at the logo colours again sometime. "
+        "Action item: Erin will send the signed contract by Friday. "
+        "We might want to think about the office plants."
+    )
+    action_items, _ = extract_highlights(transcript)
+    assert action_items[0] == "Action item: erin will send the signed contract by friday."
+
+
+def test_at_most_five_items_per_category():
+    action_items, decisions = extract_highlights(make_transcript(50_000))
+    assert len(action_items) == 5
+    assert len(decisions) == 5
+
+
+def test_single_category_scan_agrees_with_the_combined_scan():
+    transcript = make_transcript(30_000, seed=3)
+    action_items, decisions = extract_highlights(transcript)
+    assert extract_category(transcript, "action_items") == action_items
+    assert extract_category(transcript, "decisions") == decisions
+    assert set(extractor.candidates(transcript, "decisions")) == {"decisions"}
+
+
+def test_nothing_found():
+    assert extract_highlights("Hello everyone. Thanks for joining.") == (
+        [NONE_FOUND["action_items"]], [NONE_FOUND["decisions"]]
+    )
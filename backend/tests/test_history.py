@@ -0,0 +1,53 @@
+"""/history: keyset pagination on (createdAt, _id), newest first."""
+import asyncio
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+
+def insert_meetings(mongo, docs):
+    asyncio.run(mongo.meetings.insert_many(docs))
+
+
+def expected_order(docs):
+    dated = sorted((d for d in docs if d.get("createdAt")), key=lambda d: (d["createdAt"], d["_id"]), reverse=True)
+    undated = sorted((d for d in docs if not d.get("createdAt")), key=lambda d: d["_id"], reverse=True)
+    return [str(d["_id"]) for d in dated + undated]
+
+
+def all_pages(client, limit):
+    ids, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/history", params=params).json()
+        ids.extend(item["_id"] for item in body["items"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return ids, pages
+
+
+def test_pages_cover_every_meeting_once_including_ties_and_undated(client, mongo):
+    start = datetime(2024, 1, 1)
+    docs = [{"_id": ObjectId(), "filename": f"m{i}.wav", "status": "done",
+             "createdAt": start + timedelta(minutes=i // 3)} for i in range(11)]
+    # Meetings from before createdAt was recorded sort last
+    docs += [{"_id": ObjectId(), "filename": f"old{i}.wav", "status": "done"} for i in range(3)]
+    insert_meetings(mongo, docs)
+
+    for limit in (1, 2, 3, 5, 14, 20):
+        ids, pages = all_pages(client, limit)
+        assert ids == expected_order(docs), limit
+        assert pages == max(1, -(-len(docs) // limit))
+
+
+def test_items_carry_list_view_fields_only(client, mongo):
+    insert_meetings(mongo, [{"_id": ObjectId(), "filename": "a.wav", "status": "done", "createdAt": datetime(2024, 1, 1),
+                             "summary": {"overview": "Budget."}, "transcript_stored": {"sha256": "x"}}])
+    [item] = client.get("/history").json()["items"]
+    assert item["filename"] == "a.wav"
+    assert "transcript_stored" not in item
+
+
+def test_an_invalid_cursor_is_rejected(client):
+    assert client.get("/history", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,33 @@
+"""JobQueue with worker processes: model registry stats reported back to the API process."""
+import asyncio
+import os
+import time
+
+from app import jobs
+from tests.test_distributed_jobs import upload, wait_for
+
+
+def test_worker_processes_report_their_model_stats(mongo):
+    async def scenario():
+        queue = jobs.JobQueue(workers=1, concurrency=1, max_depth=4, history_limit=10)
+        await queue.start()
+        try:
+            await queue.submit("j", upload("a"), "a.wav")
+
+            async def done():
+                return queue.get("j")["status"] in ("done", "failed")
+
+            await wait_for(done, timeout=60)
+            # The snapshot sent after the job travels through the same progress queue as "done"
+            deadline = time.monotonic() + 5
+            while not queue.model_stats() and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            return queue.get("j"), queue.model_stats()
+        finally:
+            await queue.stop()
+
+    job, worker_models = asyncio.run(scenario())
+    assert job["status"] == "done"
+    [(pid, stats)] = worker_models.items()
+    assert pid != str(os.getpid())
+    assert {"budget_mb", "resident_mb", "models"} <= set(stats)
@@ -0,0 +1,133 @@
+"""JobStore: leasing, lease expiry, heartbeats, retries with backoff and release."""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.config import JOB_RETRY_BACKOFF_SECONDS, JOB_RETRY_BACKOFF_MAX_SECONDS
+from app.leases import JobStore, LeaseLostError, backoff_seconds
+
+
+def job(job_id: str) -> dict:
+    return {"id": job_id, "filename": f"{job_id}.wav", "file_path": f"/uploads/{job_id}.wav", "status": "queued",
+            "batch_id": None, "error": None, "stage": None, "percent": 0.0, "timings": {}}
+
+
+def test_concurrent_workers_never_lease_the_same_job():
+    async def scenario():
+        store = JobStore(lease_seconds=60)
+        await store.enqueue([job(f"j{i}") for i in range(10)])
+        leased = await asyncio.gather(*(store.lease(f"worker{i % 4}") for i in range(16)))
+        ids = [j["id"] for j in leased if j is not None]
+        assert sorted(ids) == sorted(f"j{i}" for i in range(10))
+        assert all(j["status"] == "processing" and j["attempts"] == 1 for j in leased if j is not None)
+
+    asyncio.run(scenario())
+
+
+def test_expired_lease_is_taken_over():
+    async def scenario():
+        store = JobStore(lease_seconds=0.05)
+        await store.enqueue([job("j")])
+        first = await store.lease("a")
+        assert await store.lease("b") is None
+        await asyncio.sleep(0.1)
+
+        second = await store.lease("b")
+        assert second["id"] == "j"
+        assert second["lease_owner"] == "b"
+        assert second["attempts"] == 2
+        # The first worker finds out at its next heartbeat
+        assert not await store.heartbeat(first, "a")
+
+    asyncio.run(scenario())
+
+
+def test_heartbeats_renew_the_lease():
+    async def scenario():
+        store = JobStore(lease_seconds=0.3)
+        await store.enqueue([job("j")])
+        leased = await store.lease("a")
+        # Twice the lease time passes, but every heartbeat extends it
+        for percent in (20.0, 40.0, 60.0, 80.0):
+            await asyncio.sleep(0.15)
+            leased.update(stage="transcription", percent=percent)
+            assert await store.heartbeat(leased, "a")
+            assert await store.lease("b") is None
+
+        doc = await store.get("j")
+        assert doc["lease_owner"] == "a"
+        assert doc["stage"] == "transcription"
+        assert doc["percent"] == 80.0
+
+    asyncio.run(scenario())
+
+
+def test_retries_back_off_and_stop_at_max_attempts(mongo):
+    async def scenario():
+        store = JobStore(lease_seconds=60, max_attempts=3)
+        await store.enqueue([job("j")])
+        for attempt in (1, 2):
+            leased = await store.lease("a")
+            assert leased["attempts"] == attempt
+            before = datetime.utcnow()
+            available_at = await store.retry(leased, "a", f"boom {attempt}")
+            delay = min(JOB_RETRY_BACKOFF_MAX_SECONDS, JOB_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+            assert delay / 2 - 0.01 <= (available_at - before).total_seconds() <= delay + 0.01
+
+            doc = await store.get("j")
+            assert doc["status"] == "queued"
+            assert doc["error"] == f"boom {attempt}"
+            assert doc["lease_owner"] is None
+            # Not due before its backoff has passed
+            assert await store.lease("a") is None
+            await mongo.jobs.update_one({"_id": "j"}, {"$set": {"available_at": datetime.utcnow()}})
+
+        leased = await store.lease("a")
+        assert leased["attempts"] == 3
+        assert await store.retry(leased, "a", "boom 3") is None
+
+    asyncio.run(scenario())
+
+
+def test_a_worker_that_lost_its_lease_cannot_reschedule_the_job():
+    async def scenario():
+        store = JobStore(lease_seconds=0.05)
+        await store.enqueue([job("j")])
+        first = await store.lease("a")
+        await asyncio.sleep(0.1)
+        second = await store.lease("b")
+
+        with pytest.raises(LeaseLostError):
+            await store.retry(first, "a", "boom")
+        doc = await store.get("j")
+        assert doc["status"] == "processing"
+        assert doc["lease_owner"] == "b"
+        assert doc["attempts"] == second["attempts"] == 2
+        assert doc["error"] is None
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("attempt", range(1, 12))
+def test_backoff_doubles_up_to_the_cap(attempt):
+    delay = min(300, 10 * 2 ** (attempt - 1))
+    for _ in range(200):
+        assert delay / 2 <= backoff_seconds(attempt, base=10, cap=300) <= delay
+
+
+def test_release_hands_the_job_back_without_using_an_attempt():
+    async def scenario():
+        store = JobStore(lease_seconds=60)
+        await store.enqueue([job("j")])
+        leased = await store.lease("a")
+        await store.release(leased, "a")
+
+        doc = await store.get("j")
+        assert doc["status"] == "queued"
+        assert doc["attempts"] == 0
+        again = await store.lease("b")
+        assert again["lease_owner"] == "b"
+        assert again["attempts"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,113 @@
+"""/summary responses: content-coding negotiation, per-encoding ETags, 304s and Cache-Control."""
+import asyncio
+import gzip
+import json
+
+import pytest
+from bson import ObjectId
+
+from app.config import RESPONSE_COMPRESS_MIN_BYTES, SUMMARY_CACHE_SECONDS
+from app.responses import _matching_etag, negotiate_encoding
+
+TRANSCRIPT = "Speaker 1: " + "We will ship the release on Friday. " * (RESPONSE_COMPRESS_MIN_BYTES // 16)
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ("", None),
+    ("gzip", "gzip"),
+    ("GZIP", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("gzip;q=oops", None),
+    ("*", "gzip"),
+    ("*;q=0, gzip", "gzip"),
+    ("*, gzip;q=0", None),
+    ("identity", None),
+])
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    (None, None),
+    ('"abc"', '"abc"'),
+    ('W/"abc"', '"abc"'),
+    ('"abc-gzip"', '"abc-gzip"'),
+    ('"other", W/"abc-br"', '"abc-br"'),
+    ("*", '"abc"'),
+    ('"abcd"', None),
+    ('"abc-deflate"', None),
+])
+def test_if_none_match_names_any_encoding_of_the_tag(if_none_match, expected):
+    assert _matching_etag(if_none_match, '"abc"') == expected
+
+
+def meeting(mongo, status="done", transcript=TRANSCRIPT) -> str:
+    meeting_id = ObjectId()
+    asyncio.run(mongo.meetings.insert_one({
+        "_id": meeting_id, "filename": "a.wav", "status": status, "transcript": transcript,
+        "summary": {"overview": "Release planning.", "decisions": [], "action_items": []},
+    }))
+    return str(meeting_id)
+
+
+def test_large_bodies_are_gzipped_with_their_own_etag(client, mongo):
+    meeting_id = meeting(mongo)
+    plain = client.get(f"/summary/{meeting_id}", headers={"Accept-Encoding": "identity"})
+    zipped = client.get(f"/summary/{meeting_id}", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in plain.headers
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert plain.headers["vary"] == zipped.headers["vary"] == "Accept-Encoding"
+    assert zipped.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    # httpx decodes the body transparently; both representations carry the same document
+    assert zipped.json() == plain.json()
+    assert zipped.json()["transcript"] == TRANSCRIPT
+
+
+def test_small_bodies_are_not_compressed(client, mongo):
+    meeting_id = meeting(mongo, transcript="Speaker 1: Hi.")
+    response = client.get(f"/summary/{meeting_id}", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert not response.headers["etag"].endswith('-gzip"')
+
+
+def test_a_current_etag_gets_a_bodiless_304(client, mongo):
+    meeting_id = meeting(mongo)
+    for accept_encoding in ("identity", "gzip"):
+        headers = {"Accept-Encoding": accept_encoding}
+        etag = client.get(f"/summary/{meeting_id}", headers=headers).headers["etag"]
+        cached = client.get(f"/summary/{meeting_id}", headers={**headers, "If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["etag"] == etag
+        assert cached.headers["cache-control"].startswith("private")
+
+
+def test_the_etag_changes_with_the_document_and_the_view(client, mongo):
+    meeting_id = meeting(mongo)
+    headers = {"Accept-Encoding": "identity"}
+    etag = client.get(f"/summary/{meeting_id}", headers=headers).headers["etag"]
+    without_transcript = client.get(f"/summary/{meeting_id}", params={"transcript": "false"}, headers=headers)
+    assert without_transcript.headers["etag"] != etag
+    assert "transcript" not in without_transcript.json()
+
+    asyncio.run(mongo.meetings.update_one({"_id": ObjectId(meeting_id)}, {"$set": {"summary.overview": "Changed."}}))
+    stale = client.get(f"/summary/{meeting_id}", headers={**headers, "If-None-Match": etag})
+    assert stale.status_code == 200
+    assert stale.headers["etag"] != etag
+
+
+def test_finished_meetings_are_immutable_and_others_revalidate(client, mongo):
+    done = client.get(f"/summary/{meeting(mongo)}")
+    assert done.headers["cache-control"] == f"private, max-age={SUMMARY_CACHE_SECONDS}, immutable"
+    processing = client.get(f"/summary/{meeting(mongo, status='processing')}")
+    assert processing.headers["cache-control"] == "no-cache"
+
+
+def test_compressed_body_is_gzip_on_the_wire(client, mongo):
+    meeting_id = meeting(mongo)
+    with client.stream("GET", f"/summary/{meeting_id}", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert json.loads(gzip.decompress(raw))["transcript"] == TRANSCRIPT
@@ -0,0 +1,107 @@
+"""Resumable upload sessions: chunk ranges, chunk and file hashes, resuming and completion."""
+import hashlib
+import os
+
+import pytest
+
+from app import resumable
+
+CHUNK = 4096
+
+
+@pytest.fixture
+def data(monkeypatch):
+    monkeypatch.setattr(resumable, "UPLOAD_SESSION_CHUNK_BYTES", CHUNK)
+    return os.urandom(2 * CHUNK + 1000)
+
+
+def sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def create(client, data, **fields):
+    response = client.post("/uploads", json={"filename": "long.wav", "size": len(data), **fields})
+    assert response.status_code == 201
+    return response.json()
+
+
+def put(client, upload_id, data, index, body=None, chunk_sha=None, content_range=None):
+    piece = data[index * CHUNK:(index + 1) * CHUNK]
+    headers = {"Content-Range": content_range or f"bytes {index * CHUNK}-{index * CHUNK + len(piece) - 1}/{len(data)}"}
+    if chunk_sha is not False:
+        headers["X-Chunk-SHA256"] = chunk_sha or sha(piece)
+    return client.put(f"/uploads/{upload_id}", content=piece if body is None else body, headers=headers)
+
+
+def test_chunks_in_any_order_complete_into_the_whole_file(client, data):
+    session = create(client, data, sha256=sha(data))
+    assert session["chunk_size"] == CHUNK
+    assert session["missing"] == [0, 1, 2]
+
+    for index in (2, 0, 1):
+        assert put(client, session["upload_id"], data, index).status_code == 200
+    assert client.get(f"/uploads/{session['upload_id']}").json()["missing"] == []
+
+    response = client.post(f"/uploads/{session['upload_id']}/complete")
+    assert response.status_code == 202
+    assert response.json()["sha256"] == sha(data)
+
+
+def test_a_corrupted_chunk_is_rejected_and_stays_missing(client, data):
+    session = create(client, data)
+    upload_id = session["upload_id"]
+    assert put(client, upload_id, data, 0).status_code == 200
+    # Resending chunk 0 with bad data drops the good copy until it is resent
+    response = put(client, upload_id, data, 0, body=os.urandom(CHUNK), chunk_sha=sha(data[:CHUNK]))
+    assert response.status_code == 422
+    assert client.get(f"/uploads/{upload_id}").json()["missing"] == [0, 1, 2]
+
+
+@pytest.mark.parametrize("content_range", [
+    "bytes 1-4096/9192",        # not on a chunk boundary
+    "bytes 0-4095/9999",        # wrong total size
+    "bytes 0-100/9192",         # shorter than a chunk
+    "bytes 8192-9999/9192",     # past the end of the file
+])
+def test_ranges_must_cover_exactly_one_chunk(client, data, content_range):
+    session = create(client, data)
+    response = put(client, session["upload_id"], data, 0, content_range=content_range, chunk_sha=False)
+    assert response.status_code == 416
+
+
+def test_a_body_that_does_not_fill_its_range_is_rejected(client, data):
+    session = create(client, data)
+    assert put(client, session["upload_id"], data, 0, body=b"short", chunk_sha=False).status_code == 400
+    assert put(client, session["upload_id"], data, 2, body=data[-1000:] + b"x", chunk_sha=False).status_code == 400
+
+
+def test_missing_header_and_malformed_hash_are_rejected(client, data):
+    session = create(client, data)
+    upload_id = session["upload_id"]
+    assert client.put(f"/uploads/{upload_id}", content=data[:CHUNK]).status_code == 400
+    assert put(client, upload_id, data, 0, chunk_sha="not-a-digest").status_code == 400
+
+
+def test_completion_needs_every_chunk_and_the_announced_hash(client, data):
+    session = create(client, data, sha256=sha(b"something else"))
+    upload_id = session["upload_id"]
+    put(client, upload_id, data, 0)
+    assert client.post(f"/uploads/{upload_id}/complete").status_code == 409
+
+    put(client, upload_id, data, 1)
+    put(client, upload_id, data, 2)
+    assert client.post(f"/uploads/{upload_id}/complete").status_code == 422
+
+
+def test_completed_and_cancelled_sessions_take_no_more_chunks(client, data):
+    session = create(client, data)
+    upload_id = session["upload_id"]
+    for index in range(3):
+        put(client, upload_id, data, index)
+    assert client.post(f"/uploads/{upload_id}/complete").status_code == 202
+    assert put(client, upload_id, data, 0).status_code == 409
+    assert client.post(f"/uploads/{upload_id}/complete").status_code == 409
+
+    other = create(client, data)
+    assert client.delete(f"/uploads/{other['upload_id']}").status_code == 204
+    assert client.get(f"/uploads/{other['upload_id']}").status_code == 404
@@ -4,7 +4,14 @@ const baseURL = import.meta.env.VITE_API_BASE || 'http://localhost:8000'
 
 export const api = axios.create({ baseURL })
 
+// Recordings larger than this are sent in chunks through a resumable upload session
+const RESUMABLE_UPLOAD_BYTES = 32 * 1024 * 1024
+const CHUNK_RETRIES = 3
+
 export async function uploadFile(file) {
+  if (file.size > RESUMABLE_UPLOAD_BYTES) {
+    return uploadResumable(file)
+  }
   const form = new FormData()
   form.append('file', file)
   const { data } = await api.post('/upload', form, {
@@ -13,12 +20,65 @@ export async function uploadFile(file) {
   return data
 }
 
-export async function fetchSummary(id) {
-  const { data } = await api.get(`/summary/${id}`)
+async function sha256Hex(blob) {
+  // SubtleCrypto is only available in secure contexts (https, localhost)
+  if (!window.crypto?.subtle) return null
+  const digest = await window.crypto.subtle.digest('SHA-256', await blob.arrayBuffer())
+  return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, '0')).join('')
+}
+
+// Create (or resume) an upload session, send the missing chunks, then start processing
+async function uploadResumable(file) {
+  const key = `upload:${file.name}:${file.size}:${file.lastModified}`
+  let session = null
+  const previous = localStorage.getItem(key)
+  if (previous) {
+    session = await api.get(`/uploads/${previous}`).then(({ data }) => data, () => null)
+  }
+  if (!session || session.status !== 'uploading') {
+    session = (await api.post('/uploads', { filename: file.name, size: file.size })).data
+    localStorage.setItem(key, session.upload_id)
+  }
+
+  for (const index of session.missing) {
+    const start = index * session.chunk_size
+    const chunk = file.slice(start, Math.min(start + session.chunk_size, file.size))
+    const headers = {
+      'Content-Type': 'application/octet-stream',
+      'Content-Range': `bytes ${start}-${start + chunk.size - 1}/${file.size}`,
+    }
+    const digest = await sha256Hex(chunk)
+    if (digest) headers['X-Chunk-SHA256'] = digest
+    for (let attempt = 1; ; attempt++) {
+      try {
+        await api.put(`/uploads/${session.upload_id}`, chunk, { headers })
+        break
+      } catch (err) {
+        const status = err.response?.status
+        // Network errors, server errors and corrupted chunks are worth another try
+        if (attempt >= CHUNK_RETRIES || (status && status < 500 && status !== 422)) throw err
+        await new Promise((resolve) => setTimeout(resolve, 1000 * attempt))
+      }
+    }
+  }
+
+  const { data } = await api.post(`/uploads/${session.upload_id}/complete`)
+  localStorage.removeItem(key)
   return data
 }
 
-export async function fetchHistory() {
-  const { data } = await api.get('/history')
-  return data.items
+// fields: comma-separated top-level fields (e.g. 'status,summary'); all of them, transcript included, by default
+export async function fetchSummary(id, fields) {
+  const { data } = await api.get(`/summary/${id}`, { params: fields ? { fields } : undefined })
+  return data
+}
+
+// Server-Sent Events stream of a processing job's stages and progress
+export function jobEvents(jobId) {
+  return new EventSource(`${baseURL}/jobs/${jobId}/events`)
+}
+
+export async function fetchHistory(cursor) {
+  const { data } = await api.get('/history', { params: cursor ? { cursor } : {} })
+  return data
 }
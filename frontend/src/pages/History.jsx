@@ -4,14 +4,18 @@ import { fetchHistory } from '../api'
 
 export default function History() {
   const [items, setItems] = useState([])
+  const [cursor, setCursor] = useState(null)
   const [loading, setLoading] = useState(true)
 
+  const loadPage = async (next) => {
+    const res = await fetchHistory(next)
+    setItems(prev => next ? [...prev, ...res.items] : res.items)
+    setCursor(res.next_cursor)
+    setLoading(false)
+  }
+
   useEffect(() => {
-    (async () => {
-      const res = await fetchHistory()
-      setItems(res)
-      setLoading(false)
-    })()
+    loadPage(null)
   }, [])
 
   if (loading) return <p>Loading…</p>
@@ -30,6 +34,9 @@ export default function History() {
           </li>
         ))}
       </ul>
+      {cursor && (
+        <button className="mt-4 text-sm text-blue-600" onClick={() => loadPage(cursor)}>Load more</button>
+      )}
     </div>
   )
 }
@@ -1,35 +1,84 @@
 import { useEffect, useState } from 'react'
 import { useParams } from 'react-router-dom'
-import { fetchSummary } from '../api'
+import { fetchSummary, jobEvents } from '../api'
+
+// The summary renders first; the (possibly multi-megabyte) transcript is fetched on its own
+const SUMMARY_FIELDS = 'filename,status,error,summary,speakers,temp_id'
 
 export default function Results() {
   const { id } = useParams()
   const [data, setData] = useState(null)
+  const [transcript, setTranscript] = useState(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
+  const [progress, setProgress] = useState(null)
 
   useEffect(() => {
-    (async () => {
+    let timer
+    let events
+    let cancelled = false
+    setTranscript(null)
+    const load = async () => {
       try {
-        const res = await fetchSummary(id)
+        const res = await fetchSummary(id, SUMMARY_FIELDS)
+        if (cancelled) return
         setData(res)
+        if (res.status === 'processing') follow(res.temp_id)
+        else if (res.status !== 'failed') loadTranscript()
       } catch (e) {
-        setError('Failed to load results')
+        if (!cancelled) setError('Failed to load results')
       } finally {
-        setLoading(false)
+        if (!cancelled) setLoading(false)
+      }
+    }
+    const loadTranscript = async () => {
+      try {
+        const res = await fetchSummary(id, 'transcript')
+        if (!cancelled) setTranscript(res.transcript ?? '')
+      } catch (e) {
+        if (!cancelled) setTranscript('Failed to load the transcript')
+      }
+    }
+    // The pipeline runs in the background; follow its progress stream, or poll if that is unavailable
+    const follow = (jobId) => {
+      if (events || !jobId || typeof EventSource === 'undefined') {
+        timer = setTimeout(load, 3000)
+        return
+      }
+      events = jobEvents(jobId)
+      const onProgress = (e) => {
+        const ev = JSON.parse(e.data)
+        setProgress({ stage: ev.stage, percent: ev.type === 'progress' ? ev.percent : null })
       }
-    })()
+      events.addEventListener('stage', onProgress)
+      events.addEventListener('progress', onProgress)
+      const finish = () => { events.close(); if (!cancelled) load() }
+      events.addEventListener('done', finish)
+      events.addEventListener('failed', finish)
+      events.onerror = () => { events.close(); if (!cancelled) timer = setTimeout(load, 3000) }
+    }
+    load()
+    return () => { cancelled = true; clearTimeout(timer); events?.close() }
   }, [id])
 
   if (loading) return <p>Loading…</p>
   if (error) return <p className="text-red-600">{error}</p>
   if (!data) return null
+  if (data.status === 'processing') {
+    return (
+      <p>
+        Processing {data.filename}…
+        {progress?.stage && ` ${progress.stage}${progress.percent != null ? ` ${Math.round(progress.percent)}%` : ''}`}
+      </p>
+    )
+  }
+  if (data.status === 'failed') return <p className="text-red-600">Processing failed: {data.error}</p>
 
   return (
     <div className="space-y-6">
       <div className="card p-6">
         <h2 className="text-lg font-semibold mb-2">Transcript</h2>
-        <pre className="whitespace-pre-wrap text-sm leading-relaxed">{data.transcript}</pre>
+        <pre className="whitespace-pre-wrap text-sm leading-relaxed">{transcript ?? 'Loading transcript…'}</pre>
       </div>
       <div className="grid md:grid-cols-3 gap-4">
         <div className="card p-4">